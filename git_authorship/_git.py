@@ -0,0 +1,150 @@
+# Copyright (c) 2025 Joseph Hale
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+import asyncio
+from pathlib import Path
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+from git import GitCommandError
+from git import Repo
+from git.cmd import Git
+
+from . import telemetry
+
+
+class TreeEntry(NamedTuple):
+    path: Path
+    mode: str
+    type: str
+    """`blob` for files, `commit` for submodules"""
+    object: str
+    size: int
+    """In bytes (zero for submodules)"""
+
+
+class BlamedCommit(NamedTuple):
+    """The fields of a commit which `git blame --porcelain` reports"""
+
+    hexsha: str
+    author_name: str
+    author_email: str
+    authored_date: int
+    committed_date: int
+    boundary: bool = False
+    """Whether blame stopped at this commit (see `boundary`) rather than found it"""
+
+
+def ls_tree(
+    repo: Repo, rev: str = "HEAD", paths: Optional[Sequence[Path]] = None
+) -> List[TreeEntry]:
+    """
+    Every entry in the tree of `rev` (recursively), in git's own (deterministic)
+    path order. Limited to the given files/folders, if any.
+    """
+    output = repo.git.ls_tree("-r", "-l", "-z", rev, "--", *map(str, paths or []))
+    entries = []
+    for record in output.split("\0"):
+        if not record:
+            continue
+        meta, path = record.split("\t", 1)
+        mode, type, object, size = meta.split()
+        entries.append(
+            TreeEntry(Path(path), mode, type, object, int(size) if size != "-" else 0)
+        )
+    return entries
+
+
+def ls_files(
+    repo: Repo, rev: str = "HEAD", paths: Optional[Sequence[Path]] = None
+) -> List[Path]:
+    """Every file (blob) in the tree of `rev`, in git's path order."""
+    return [e.path for e in ls_tree(repo, rev, paths) if e.type == "blob"]
+
+
+def parse_blame(porcelain: bytes) -> List[Tuple[BlamedCommit, int]]:
+    """
+    Parses the output of `git blame --porcelain` into each hunk's commit and number
+    of lines, in the order of the file (like `Repo.blame`, without keeping the lines)
+    """
+    fields: Dict[str, Dict[str, str]] = {}
+    commits: Dict[str, BlamedCommit] = {}
+    hunks: List[Tuple[str, int]] = []
+    sha = ""
+    for line in porcelain.split(b"\n"):
+        if line.startswith(b"\t"):  # A line of the file, for the preceding header
+            if hunks and hunks[-1][0] == sha:
+                hunks[-1] = (sha, hunks[-1][1] + 1)
+            else:
+                hunks.append((sha, 1))
+        elif line:
+            key, _, value = line.decode("utf-8", "replace").partition(" ")
+            if len(key) in (40, 64) and value[:1].isdigit():  # `<sha> <line> ...`
+                sha = key
+                fields.setdefault(sha, {})
+            else:
+                fields[sha].setdefault(key, value)
+
+    for sha, info in fields.items():
+        commits[sha] = BlamedCommit(
+            hexsha=sha,
+            author_name=info.get("author", ""),
+            author_email=info.get("author-mail", "").strip("<>"),
+            authored_date=int(info.get("author-time", 0)),
+            committed_date=int(info.get("committer-time", 0)),
+            boundary="boundary" in info,
+        )
+    return [(commits[sha], lines) for sha, lines in hunks]
+
+
+async def git_async(repo: Repo, *args: str) -> bytes:
+    """
+    Runs a git command in an asyncio subprocess, returning its output. If the
+    awaiting task is cancelled, the subprocess is killed.
+    """
+    telemetry.add("git_subprocesses_total", 1)
+    process = await asyncio.create_subprocess_exec(
+        Git.GIT_PYTHON_GIT_EXECUTABLE or "git",
+        *args,
+        cwd=repo.working_dir,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        stdout, stderr = await process.communicate()
+    except asyncio.CancelledError:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        raise
+    if process.returncode != 0:
+        raise GitCommandError(["git", *args], process.returncode, stderr)
+    return stdout
+
+
+def is_within(path: Path, folders: Sequence[Path]) -> bool:
+    """Whether `path` is one of `folders` or inside one of them"""
+    return any(path == f or f == Path(".") or f in path.parents for f in folders)
+
+
+def path_order(path: Path) -> bytes:
+    """Sort key reproducing git's path order (i.e. the order of `ls_tree`)"""
+    return path.as_posix().encode()
+
+
+__all__ = [
+    "TreeEntry",
+    "BlamedCommit",
+    "ls_tree",
+    "ls_files",
+    "parse_blame",
+    "git_async",
+    "is_within",
+    "path_order",
+]
@@ -3,27 +3,109 @@
 # This Source Code Form is subject to the terms of the Mozilla Public
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
+import gzip
+import io
+import os
+import uuid
 from contextlib import contextmanager
 from os import PathLike
 from pathlib import Path
+from typing import Any
 from typing import IO
 from typing import List
 from typing import Union
 
 from git import Optional
 
+try:
+    import zstandard
+except ImportError:  # zstd compression is optional
+    zstandard = None
+
 Writeable = Union[PathLike, str, IO]
 
+COMPRESSIONS = {"gzip": ".gz", "zstd": ".zst"}
+"""Supported compressions, and the file extensions which select them"""
+
 
 @contextmanager
-def io_handle(path: Writeable):
+def io_handle(path: Writeable, mode: str = "w"):
+    """
+    Opens a path for reading or (atomically) writing, transparently (de)compressing
+    it if its extension is one of `COMPRESSIONS`. Handles are used as given.
+    """
     if isinstance(path, PathLike) or isinstance(path, str):
-        with open(path, "w") as io_handle:
-            yield io_handle
+        writing = "w" in mode
+        opener = atomic_open if writing else open
+        extension = Path(path).suffix
+        if extension in COMPRESSIONS.values():
+            with opener(path, "wb" if writing else "rb") as raw:
+                with _compressed(raw, extension, mode) as io_handle:
+                    yield io_handle
+        else:
+            with opener(path, mode) as io_handle:
+                yield io_handle
     else:
         yield path
 
 
+def compression_extension(compression: Optional[str]) -> str:
+    """The file extension for a compression (or none, if `None`)"""
+    if compression is None:
+        return ""
+    if compression not in COMPRESSIONS:
+        raise ValueError(
+            f"Unknown compression {compression}. Expected one of {list(COMPRESSIONS)}"
+        )
+    if compression == "zstd" and zstandard is None:
+        raise ValueError("zstd compression requires the `zstandard` package")
+    return COMPRESSIONS[compression]
+
+
+def _compressed(raw: IO[bytes], extension: str, mode: str) -> IO:
+    writing = "w" in mode
+    stream: Any
+    if extension == ".gz":
+        # No (temporary) filename or mtime, so compressed outputs are reproducible
+        stream = gzip.GzipFile(
+            filename="", fileobj=raw, mode="wb" if writing else "rb", mtime=0
+        )
+    elif zstandard is None:
+        raise ValueError(f"Reading/writing {extension} requires `zstandard`")
+    elif writing:
+        stream = zstandard.ZstdCompressor().stream_writer(raw, closefd=False)
+    else:
+        stream = zstandard.ZstdDecompressor().stream_reader(raw, closefd=False)
+    return stream if "b" in mode else io.TextIOWrapper(stream, encoding="utf-8")
+
+
+@contextmanager
+def atomic_open(path: Union[PathLike, str], mode: str = "w"):
+    """
+    Opens a temporary sibling of `path` for writing, which replaces `path` only once
+    fully written. Readers never observe a partially written file.
+    """
+    with atomic_path(path) as tmp:
+        with open(tmp, mode.replace("w", "x")) as f:
+            yield f
+
+
+@contextmanager
+def atomic_path(path: Union[PathLike, str]):
+    """
+    A temporary sibling of `path` to create (e.g. a database), which replaces `path`
+    only once complete. Readers never observe a partially written file.
+    """
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        yield tmp
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
 def iterfiles(dir: Path, exclude: Optional[List[Path]] = None):
     exclude = exclude or []
     for path in dir.iterdir():
@@ -43,4 +125,13 @@ def iterdirs(dir: Path, exclude: Optional[List[Path]] = None):
             yield from iterdirs(path)
 
 
-__all__ = ["Writeable", "io_handle", "iterfiles", "iterdirs"]
+__all__ = [
+    "Writeable",
+    "COMPRESSIONS",
+    "io_handle",
+    "compression_extension",
+    "atomic_open",
+    "atomic_path",
+    "iterfiles",
+    "iterdirs",
+]
@@ -6,7 +6,10 @@
 from pathlib import Path
 from typing import Dict
 from typing import Iterable
+from typing import List
+from typing import Set
 from typing import TypedDict
+from typing import Union
 
 from typing_extensions import NotRequired
 
@@ -28,14 +31,80 @@ class Config:
     Pseudonyms = Dict[Path, _Pseudonym]
     """Map of 'Path' -> 'Pseudonym'"""
     IgnoreExtensions = Iterable[str]
+    Aliases = Dict[Author, Author]
+    """Map of 'Alias' -> 'Canonical Author'"""
+
+
+Timestamp = int
+"""Seconds since the UNIX epoch"""
 
 
 class AuthorshipInfo(TypedDict):
     lines: LineCount
     license: NotRequired[License]
+    first_authored: NotRequired[Timestamp]
+    """When the oldest surviving line was authored (with `--metrics`)"""
+    last_authored: NotRequired[Timestamp]
+    """When the newest surviving line was authored (with `--metrics`)"""
+    last_committed: NotRequired[Timestamp]
+    """When surviving lines were last committed (with `--metrics`)"""
+    commits: NotRequired[Union[int, List[str], Set[str]]]
+    """The distinct commits of the surviving lines, counted once rolled up"""
+    ages: NotRequired[Dict[str, LineCount]]
+    """Surviving lines by age bucket (see `metrics.AGE_BUCKETS`)"""
 
 
 Authorship = Dict[Author, AuthorshipInfo]
 RepoAuthorship = Dict[FilePath, Authorship]
 
-__all__ = ["FilePath", "Author", "LineCount", "Config", "Authorship", "RepoAuthorship"]
+
+class LineChange(TypedDict):
+    before: LineCount
+    after: LineCount
+    delta: LineCount
+
+
+class AuthorshipDelta(TypedDict):
+    authors: Dict[Author, LineChange]
+    licenses: Dict[License, LineChange]
+
+
+RepoAuthorshipDelta = Dict[FilePath, AuthorshipDelta]
+
+
+class ShareEstimate(TypedDict):
+    lines: LineCount
+    """Estimated (i.e. extrapolated) lines"""
+    share: float
+    """Estimated fraction of all lines"""
+    low: float
+    """Lower bound of the confidence interval of `share`"""
+    high: float
+    """Upper bound of the confidence interval of `share`"""
+
+
+class AuthorshipEstimate(TypedDict):
+    files: int
+    sampled: int
+    """How many of the `files` were blamed"""
+    authors: Dict[Author, ShareEstimate]
+    licenses: Dict[License, ShareEstimate]
+
+
+RepoAuthorshipEstimate = Dict[FilePath, AuthorshipEstimate]
+
+__all__ = [
+    "FilePath",
+    "Author",
+    "LineCount",
+    "Timestamp",
+    "Config",
+    "Authorship",
+    "RepoAuthorship",
+    "LineChange",
+    "AuthorshipDelta",
+    "RepoAuthorshipDelta",
+    "ShareEstimate",
+    "AuthorshipEstimate",
+    "RepoAuthorshipEstimate",
+]
@@ -3,22 +3,77 @@
 # This Source Code Form is subject to the terms of the Mozilla Public
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
+import asyncio
+import functools
+import hashlib
 import json
 import logging
+import os
+import time
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from pathlib import Path
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
 from typing import Optional
+from typing import Set
+from typing import Tuple
 
+from git import GitCommandError
+from git import InvalidGitRepositoryError
+from git import NoSuchPathError
 from git import Repo
 
-from . import export
-from ._pathutils import iterfiles
+from . import boundary as boundaries
+from . import bundle
+from . import classify
+from . import delta
+from . import identity
+from . import index
+from . import metrics
+from . import plan
+from . import sample
+from . import shard as shards
+from . import spill
+from ._git import BlamedCommit
+from ._git import git_async
+from ._git import is_within
+from ._git import ls_files
+from ._git import ls_tree
+from ._git import parse_blame
+from ._git import TreeEntry
+from ._types import _Pseudonym
+from ._types import Author
 from ._types import Authorship
 from ._types import AuthorshipInfo
 from ._types import Config
+from ._types import FilePath
+from ._types import License
 from ._types import RepoAuthorship
+from ._types import RepoAuthorshipDelta
+from ._types import RepoAuthorshipEstimate
+from ._types import Timestamp
+from .boundary import Boundary
+from .cache import Cache
+from .classify import BlobCache
+from .classify import Classification
+from .identity import IdentityTable
+from .journal import Journal
+from .plan import Timings
+from .shard import Shard
 
-EXCLUDE_DIRS = [".git"]
+BLAME_CONFIG_FILES = [".mailmap"]
+BLAME_OPTIONS = ["-M", "-C", "-C", "-C"]
+DEFAULT_CONCURRENCY = os.cpu_count() or 4
+"""Concurrent `git blame` subprocesses of the async API"""
+
+Snapshot = Tuple[str, RepoAuthorship]
+"""A (raw) repo authorship along with the revision it was computed at"""
 
 log = logging.getLogger(__name__)
 
@@ -28,15 +83,50 @@ def for_repo(
     *,
     licenses: Optional[Config.AuthorLicenses] = None,
     pseudonyms: Optional[Config.Pseudonyms] = None,
+    aliases: Optional[Config.Aliases] = None,
     ignore_extensions: Optional[Config.IgnoreExtensions] = None,
     ignore_revs_file: str = ".git-blame-ignore-revs",
     cache_dir: Path = Path("build/cache"),
     use_cache: bool = True,
+    cache_compression: Optional[str] = None,
+    paths: Optional[List[Path]] = None,
+    use_notes: bool = False,
+    collect_metrics: bool = False,
+    submodules: bool = False,
+    classify_files: bool = False,
+    since: Optional[str] = None,
+    index_path: Optional[Path] = None,
 ) -> RepoAuthorship:
     """
     Calculates how many lines each author has contributed to the repo, with breakdowns
     by folder and file.
 
+    If `paths` are given, only the files within them are blamed, and only those files
+    (and their parent folders) are reported.
+
+    If `use_notes`, results stored in the repo's git notes (by another machine) are
+    used on a cache miss, and new results are stored there too.
+
+    If `collect_metrics`, each author's lines also come with when they were authored
+    and committed, how many distinct commits they come from, and a histogram of
+    their ages (see `for_file`).
+
+    If `submodules`, the files of each (checked out) submodule are included under
+    its path. Each submodule is blamed at the commit pinned by the repo, as a repo
+    of its own with its own cache entries, concurrently with the others.
+
+    If `classify_files`, binary and generated files are detected before blaming
+    (see `classify`) and aren't blamed: binary files have no authors, and every line
+    of a generated file is credited to the author of the last commit touching it.
+
+    If `since` (a revision or a date, see `boundary.resolve`) is given, blame stops
+    walking history there, and every older line is credited to a single
+    `before <since>` author. This makes blaming long-lived repos much cheaper.
+
+    If `index_path` is given, an inverted index of the result (from each author and
+    license to the files/folders they contributed to) is saved there, for
+    `index.top_paths` to query.
+
     e.g. For a repo with the following structure:
 
     ```
@@ -64,28 +154,576 @@ def for_repo(
     ```
 
     """
-    cache_key = cache_dir / f"{repo.head.commit.hexsha}.json"
+    boundary = boundaries.resolve(repo, since) if since is not None else None
+    data = _load_repo_authorship(
+        repo,
+        ignore_revs_file=ignore_revs_file,
+        cache_dir=cache_dir,
+        use_cache=use_cache,
+        cache_compression=cache_compression,
+        paths=paths,
+        use_notes=use_notes,
+        collect_metrics=collect_metrics,
+        classify_files=classify_files,
+        boundary=boundary,
+    )
+    if submodules:
+        data.update(
+            _load_submodules(
+                repo,
+                ignore_revs_file=ignore_revs_file,
+                cache_dir=cache_dir,
+                use_cache=use_cache,
+                cache_compression=cache_compression,
+                paths=paths,
+                collect_metrics=collect_metrics,
+                classify_files=classify_files,
+                boundary=boundary,
+            )
+        )
+    result = _augment(
+        repo,
+        data,
+        licenses=licenses,
+        pseudonyms=pseudonyms,
+        aliases=aliases,
+        ignore_extensions=ignore_extensions,
+    )
+    if index_path is not None:
+        index.build(result.items(), index_path)
+    return result
+
 
-    if use_cache and cache_key.exists():
-        with open(cache_key, "r") as f:
-            data = {Path(k): v for k, v in (json.load(f) or {}).items()}
+def for_repo_bounded(
+    repo: Repo,
+    *,
+    licenses: Optional[Config.AuthorLicenses] = None,
+    pseudonyms: Optional[Config.Pseudonyms] = None,
+    aliases: Optional[Config.Aliases] = None,
+    ignore_extensions: Optional[Config.IgnoreExtensions] = None,
+    ignore_revs_file: str = ".git-blame-ignore-revs",
+    cache_dir: Path = Path("build/cache"),
+    use_cache: bool = True,
+    cache_compression: Optional[str] = None,
+    max_memory: int = spill.DEFAULT_MAX_MEMORY,
+    collect_metrics: bool = False,
+) -> "SpilledRepoAuthorship":
+    """
+    Like `for_repo`, but for repos too large to hold in memory. Per-file results are
+    spilled to disk (as the cache) as soon as they are computed, and the result can
+    only be iterated, rolling up folders on the fly.
+    """
+    cache = Cache(cache_dir, cache_compression)
+    key = cache_key(
+        repo.head.commit.hexsha,
+        ignore_revs_file=ignore_revs_file,
+        collect_metrics=collect_metrics,
+    )
+    spill_path = cache.path(key, f".jsonl{cache.extension}")
+    if use_cache and spill_path.exists():
+        cache.touch(spill_path)
     else:
-        data = _compute_repo_authorship(repo, ignore_revs_file=ignore_revs_file)
-        cache_key.parent.mkdir(exist_ok=True, parents=True)
-        export.as_json(data, cache_key)
+        for _ in _blame_into_spill(
+            repo,
+            spill_path,
+            ignore_revs_file=ignore_revs_file,
+            max_memory=max_memory,
+            collect_metrics=collect_metrics,
+        ):
+            pass
 
-    data = _augment_ignore_extensions(data, ignore_extensions or [])
-    data = _augment_author_licenses(data, licenses or {})
-    data = _augment_pseudonyms(data, pseudonyms or {})
-    data = _augment_folder_authorships(data)
-    return data
+    authors = (a for _, authorship in spill.read(spill_path) for a in authorship)
+    return SpilledRepoAuthorship(
+        spill_path,
+        licenses=licenses or {},
+        pseudonyms=pseudonyms or {},
+        identities=identity.resolve(repo, authors, aliases or {}),
+        ignore_extensions=ignore_extensions or [],
+    )
+
+
+class SpilledRepoAuthorship:
+    """
+    A repo authorship which stays on disk. Each iteration streams the spilled files
+    (augmented one at a time) and their folders, with each folder following its
+    contents. Only the folders currently being rolled up are held in memory.
+    """
+
+    def __init__(
+        self,
+        spill_path: Path,
+        *,
+        licenses: Config.AuthorLicenses,
+        pseudonyms: Config.Pseudonyms,
+        identities: Dict[Author, Author],
+        ignore_extensions: Config.IgnoreExtensions,
+    ):
+        self.spill_path = spill_path
+        self.licenses = licenses
+        self.pseudonyms = pseudonyms
+        self.identities = identities
+        self.ignore_extensions = ignore_extensions
+
+    def __iter__(self) -> Iterator[Tuple[FilePath, Authorship]]:
+        for path, authorship in _iter_folder_authorships(self._files()):
+            yield path, metrics.finalize(authorship)
+
+    def folders(self) -> Iterator[Tuple[FilePath, Authorship]]:
+        for path, authorship in _iter_folder_authorships(
+            self._files(), include_files=False
+        ):
+            yield path, metrics.finalize(authorship)
+
+    def _files(self) -> Iterator[Tuple[FilePath, Authorship]]:
+        for path, authorship in spill.read(self.spill_path):
+            yield from _augment_file(
+                path,
+                authorship,
+                licenses=self.licenses,
+                pseudonyms=self.pseudonyms,
+                identities=self.identities,
+                ignore_extensions=self.ignore_extensions,
+            ).items()
+
+
+def iter_repo(
+    repo: Repo,
+    *,
+    licenses: Optional[Config.AuthorLicenses] = None,
+    pseudonyms: Optional[Config.Pseudonyms] = None,
+    aliases: Optional[Config.Aliases] = None,
+    ignore_extensions: Optional[Config.IgnoreExtensions] = None,
+    ignore_revs_file: str = ".git-blame-ignore-revs",
+    cache_dir: Path = Path("build/cache"),
+    use_cache: bool = True,
+    cache_compression: Optional[str] = None,
+    collect_metrics: bool = False,
+    roll_up: Optional["FolderRollUp"] = None,
+) -> Iterator[Tuple[FilePath, Authorship]]:
+    """
+    Like `for_repo`, but yields the authorship of each file as soon as it has been
+    blamed (and augmented on its own), in git's path order. Nothing but the file
+    being augmented is held in memory.
+
+    Folders are not yielded. To also get them, pass a `roll_up`, which accumulates
+    every yielded file into its folders.
+
+    Per-file results are cached as a spill (shared with `for_repo_bounded`), which
+    only appears once every file has been blamed. A result already cached by
+    `for_repo` is reused too (but is read into memory at once).
+    """
+    cache = Cache(cache_dir, cache_compression)
+    key = cache_key(
+        repo.head.commit.hexsha,
+        ignore_revs_file=ignore_revs_file,
+        collect_metrics=collect_metrics,
+    )
+    spill_path = cache.path(key, f".jsonl{cache.extension}")
+    files: Iterable[Tuple[FilePath, Authorship]]
+    blamed = False
+    if use_cache and spill_path.exists():
+        cache.touch(spill_path)
+        files = spill.read(spill_path)
+    elif use_cache and (data := cache.get(key)) is not None:
+        files = data.items()
+    else:
+        blamed = True
+        files = _blame_into_spill(
+            repo,
+            spill_path,
+            ignore_revs_file=ignore_revs_file,
+            collect_metrics=collect_metrics,
+        )
+
+    # Every author blame can report is a commit author, so once the first file has
+    # been blamed they are all resolved in one batch (instead of as each file
+    # introduces new ones). Cached results are resolved as they are read.
+    identities: Dict[Author, Author] = {}
+    for path, authorship in files:
+        if path.suffix.lower() in (ignore_extensions or []):
+            continue
+        if unresolved := [a for a in authorship if a not in identities]:
+            if blamed:
+                unresolved += _commit_authors(repo)
+                blamed = False
+            identities.update(identity.resolve(repo, unresolved, aliases or {}))
+        augmented = _augment_file(
+            path,
+            authorship,
+            licenses=licenses or {},
+            pseudonyms=pseudonyms or {},
+            identities=identities,
+        )
+        for path, authorship in augmented.items():
+            if roll_up is not None:
+                roll_up.add(path, authorship)
+            yield path, metrics.finalize(authorship)
+
+
+def _commit_authors(repo: Repo, rev: str = "HEAD") -> Set[Author]:
+    """The distinct (mailmapped, like blame's) authors of the commits up to `rev`"""
+    return set(repo.git.log("--format=%aN <%aE>", rev).splitlines())
+
+
+class FolderRollUp:
+    """
+    Accumulates the authorship of files (e.g. as `iter_repo` yields them) into all
+    of their folders. Only the folders are held in memory.
+    """
+
+    def __init__(self):
+        self._folders: RepoAuthorship = defaultdict(
+            lambda: defaultdict(_AuthorshipInfo)
+        )
+
+    def add(self, path: FilePath, authorship: Authorship):
+        for author, info in authorship.items():
+            for folder in list(_parents(path))[:-1]:
+                _merge_info(self._folders[folder][author], info)
+
+    def folders(self) -> RepoAuthorship:
+        """The authorship of every folder so far, each folder before its contents"""
+        return {
+            folder: metrics.finalize(
+                {author: info.copy() for author, info in authorship.items()}
+            )
+            for folder, authorship in self._folders.items()
+        }
+
+
+class EnrichedAuthorship:
+    """
+    A repo authorship augmented with licenses and pseudonyms (like `for_repo`'s)
+    which can be re-configured without augmenting everything again.
+
+    Licenses are resolved once per author and pseudonyms once per path. The paths
+    each author is credited in by blame (i.e. not through a pseudonym) are indexed,
+    so changing an author's license only touches those paths, and changing
+    pseudonyms only re-rolls the folders above the files whose pseudonym changed.
+    """
+
+    def __init__(
+        self,
+        files: RepoAuthorship,
+        *,
+        licenses: Optional[Config.AuthorLicenses] = None,
+        pseudonyms: Optional[Config.Pseudonyms] = None,
+    ):
+        self.files = files
+        """The authorship of each file, with identities resolved (never modified)"""
+        self.licenses = dict(licenses or {})
+        self.pseudonyms = dict(pseudonyms or {})
+        self.authorship: RepoAuthorship = {}
+        """The augmented authorship of every file and folder"""
+        self._pseudonym_of = _pseudonym_matcher(self.pseudonyms)
+        self._credited: Dict[Author, Set[FilePath]] = defaultdict(set)
+        self._roll_up(files)
+
+    def set_licenses(self, licenses: Config.AuthorLicenses) -> Set[FilePath]:
+        """Re-applies the licenses which changed. Returns the paths updated."""
+        changed = {
+            author
+            for author in {*self.licenses, *licenses}
+            if self.licenses.get(author) != licenses.get(author)
+        }
+        self.licenses = dict(licenses)
+        updated: Set[FilePath] = set()
+        for author in changed:
+            for path in self._credited.get(author, ()):
+                info = self.authorship[path][author]
+                if author in licenses:
+                    info["license"] = licenses[author]
+                else:
+                    info.pop("license", None)
+                updated.add(path)
+        return updated
+
+    def set_pseudonyms(self, pseudonyms: Config.Pseudonyms) -> Set[FilePath]:
+        """Re-applies the pseudonyms which changed. Returns the paths updated."""
+        pseudonym_of = _pseudonym_matcher(pseudonyms)
+        changed = [p for p in self.files if pseudonym_of(p) != self._pseudonym_of(p)]
+        self.pseudonyms = dict(pseudonyms)
+        self._pseudonym_of = pseudonym_of
+        return self._roll_up(changed) if changed else set()
+
+    def _roll_up(self, files: Iterable[FilePath]) -> Set[FilePath]:
+        """
+        Re-augments `files` and re-rolls up every folder above them, in one pass over
+        the files. Returns the paths recomputed.
+        """
+        stale = {path for file in files for path in _parents(file)}
+        for path in stale:
+            for author in self.authorship.get(path, {}):
+                self._credited[author].discard(path)
+
+        rolled: RepoAuthorship = defaultdict(lambda: defaultdict(_AuthorshipInfo))
+        for file, authorship in self.files.items():
+            if not (paths := [p for p in _parents(file) if p in stale]):
+                continue
+            if (pseudonym := self._pseudonym_of(file)) is not None:
+                authorship = _pseudonymized(authorship, pseudonym)
+            else:
+                authorship = _licensed(authorship, self.licenses)
+            for author, info in authorship.items():
+                for path in paths:
+                    _merge_info(rolled[path][author], info)
+                    if pseudonym is None:
+                        self._credited[author].add(path)
+
+        added = False
+        for path in stale - rolled.keys():  # e.g. a folder of empty files
+            self.authorship.pop(path, None)
+        for path, authorship in rolled.items():
+            added = added or path not in self.authorship
+            self.authorship[path] = metrics.finalize(authorship)
+        if added and len(rolled) < len(self.authorship):
+            # Keeps every folder before its contents, as if augmented from scratch
+            self.authorship = {
+                path: self.authorship[path]
+                for file in self.files
+                for path in _parents(file)
+                if path in self.authorship
+            }
+        return stale
+
+
+def update_subtrees(
+    existing: RepoAuthorship, fresh: RepoAuthorship, paths: List[Path]
+) -> RepoAuthorship:
+    """
+    Replaces the given files/folders of a previously computed (full) authorship with
+    a fresh result for just those `paths` (i.e. from `for_repo(..., paths=paths)`).
+
+    Only the parents of `paths` are re-rolled (like `FolderRollUp` does), each from
+    its direct children, so their lines, licenses, and metrics match a full run.
+    Distinct commit counts can't be merged, so a re-rolled folder counts at least
+    as many commits as the child with the most.
+    """
+    roots = [p for p in paths if not is_within(p, [q for q in paths if q != p])]
+    updated = {p: a for p, a in existing.items() if not is_within(p, roots)}
+    for path, authorship in fresh.items():
+        if is_within(path, roots):
+            updated[path] = authorship
+
+    ancestors = {parent for root in roots for parent in list(_parents(root))[:-1]}
+    children: Dict[FilePath, List[FilePath]] = defaultdict(list)
+    for path in updated:
+        if path.parent in ancestors and path != path.parent:
+            children[path.parent].append(path)
+
+    # (Deepest first, so each folder is re-rolled from already updated children)
+    for parent in sorted(ancestors, key=lambda p: len(p.parts), reverse=True):
+        rolled: Authorship = defaultdict(_AuthorshipInfo)
+        counts: Dict[Author, int] = {}
+        for child in children[parent]:
+            for author, info in updated[child].items():
+                if isinstance(commits := info.get("commits"), int):
+                    counts[author] = max(counts.get(author, 0), commits)
+                    info = {**info, "commits": []}
+                _merge_info(rolled[author], info)
+        for author, count in counts.items():
+            distinct = rolled[author].get("commits", set())
+            assert isinstance(distinct, set)
+            rolled[author]["commits"] = max(count, len(distinct))
+        if rolled:
+            updated[parent] = metrics.finalize(dict(rolled))
+        else:
+            updated.pop(parent, None)
+
+    return updated
+
+
+def for_revisions(
+    repo: Repo,
+    old_rev: str,
+    new_rev: str,
+    *,
+    licenses: Optional[Config.AuthorLicenses] = None,
+    pseudonyms: Optional[Config.Pseudonyms] = None,
+    aliases: Optional[Config.Aliases] = None,
+    ignore_extensions: Optional[Config.IgnoreExtensions] = None,
+    ignore_revs_file: str = ".git-blame-ignore-revs",
+    cache_dir: Path = Path("build/cache"),
+    use_cache: bool = True,
+    cache_compression: Optional[str] = None,
+) -> RepoAuthorshipDelta:
+    """
+    Calculates how the authorship (and licensing) of each file and folder changed
+    between two revisions. Only files changed between the revisions are blamed at
+    `new_rev`; the rest are taken from the result for `old_rev`.
+    """
+    old = _load_repo_authorship(
+        repo,
+        ignore_revs_file=ignore_revs_file,
+        cache_dir=cache_dir,
+        use_cache=use_cache,
+        cache_compression=cache_compression,
+        rev=old_rev,
+    )
+    new = _load_repo_authorship(
+        repo,
+        ignore_revs_file=ignore_revs_file,
+        cache_dir=cache_dir,
+        use_cache=use_cache,
+        cache_compression=cache_compression,
+        previous=(repo.commit(old_rev).hexsha, old),
+        rev=new_rev,
+    )
+    before, after = (
+        _augment(
+            repo,
+            dict(data),
+            licenses=licenses,
+            pseudonyms=pseudonyms,
+            aliases=aliases,
+            ignore_extensions=ignore_extensions,
+        )
+        for data in (old, new)
+    )
+    return delta.between(before, after)
+
+
+def for_repo_sample(
+    repo: Repo,
+    *,
+    sample_size: int,
+    seed: int = 0,
+    confidence: float = sample.DEFAULT_CONFIDENCE,
+    licenses: Optional[Config.AuthorLicenses] = None,
+    pseudonyms: Optional[Config.Pseudonyms] = None,
+    aliases: Optional[Config.Aliases] = None,
+    ignore_extensions: Optional[Config.IgnoreExtensions] = None,
+    ignore_revs_file: str = ".git-blame-ignore-revs",
+) -> RepoAuthorshipEstimate:
+    """
+    Estimates the author and license shares of every folder by only blaming a
+    stratified sample of (about) `sample_size` files. See `sample.estimate`.
+    """
+    ignored = tuple(ignore_extensions or [])
+    entries = [
+        e
+        for e in ls_tree(repo)
+        if e.type == "blob" and e.path.suffix.lower() not in ignored
+    ]
+    filepaths = sample.select(entries, sample_size, seed)
+    log.info(f"Blaming a sample of {len(filepaths)} of {len(entries)} files")
+    data = _compute_repo_authorship(
+        repo, ignore_revs_file=ignore_revs_file, filepaths=filepaths
+    )
+    data = _augment_files(
+        repo, data, licenses=licenses, pseudonyms=pseudonyms, aliases=aliases
+    )
+    return sample.estimate(entries, data, confidence)
+
+
+def for_shard(
+    repo: Repo,
+    shard: Shard,
+    *,
+    strategy: str = "hash",
+    ignore_revs_file: str = ".git-blame-ignore-revs",
+) -> RepoAuthorship:
+    """
+    Blames only the files assigned to `shard` (see `shard.select`). The result is
+    raw (i.e. not augmented), ready for `shard.write_partial`.
+    """
+    filepaths = shards.select(ls_tree(repo), shard, strategy)
+    log.info(f"Blaming {len(filepaths)} files of shard {shard} (by {strategy})")
+    return _compute_repo_authorship(
+        repo, ignore_revs_file=ignore_revs_file, filepaths=filepaths
+    )
+
+
+async def for_repo_async(
+    repo: Repo,
+    *,
+    licenses: Optional[Config.AuthorLicenses] = None,
+    pseudonyms: Optional[Config.Pseudonyms] = None,
+    aliases: Optional[Config.Aliases] = None,
+    ignore_extensions: Optional[Config.IgnoreExtensions] = None,
+    ignore_revs_file: str = ".git-blame-ignore-revs",
+    cache_dir: Path = Path("build/cache"),
+    use_cache: bool = True,
+    cache_compression: Optional[str] = None,
+    paths: Optional[List[Path]] = None,
+    collect_metrics: bool = False,
+    since: Optional[str] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> RepoAuthorship:
+    """
+    Like `for_repo`, for asyncio applications. Files are blamed by up to
+    `concurrency` git subprocesses at once, and `progress(blamed, total)` is called
+    as each file is done. Results are cached (and journaled) like `for_repo`'s.
+
+    Cancelling the task kills the running blames. Files blamed so far are kept in
+    the journal, so the next run resumes from them.
+    """
+    loop = asyncio.get_running_loop()
+    cache = Cache(cache_dir, cache_compression)
+    boundary = boundaries.resolve(repo, since) if since is not None else None
+    key = cache_key(
+        repo.head.commit.hexsha,
+        ignore_revs_file=ignore_revs_file,
+        collect_metrics=collect_metrics,
+        boundary=boundary,
+    )
+
+    data = await loop.run_in_executor(None, cache.get, key) if use_cache else None
+    if data is not None:
+        if paths is not None:
+            data = {p: a for p, a in data.items() if is_within(p, paths)}
+    else:
+        # Only a complete result is worth caching
+        journal = Journal(cache.path(key, ".journal"))
+        data = await _compute_repo_authorship_async(
+            repo,
+            ignore_revs_file=ignore_revs_file,
+            filepaths=ls_files(repo, paths=paths),
+            journal=journal if use_cache and paths is None else None,
+            collect_metrics=collect_metrics,
+            boundary=boundary,
+            concurrency=concurrency,
+            progress=progress,
+        )
+        if paths is None:
+            await loop.run_in_executor(None, cache.put, key, data)
+            journal.remove()
+
+    return await loop.run_in_executor(
+        None,
+        functools.partial(
+            _augment,
+            repo,
+            data,
+            licenses=licenses,
+            pseudonyms=pseudonyms,
+            aliases=aliases,
+            ignore_extensions=ignore_extensions,
+        ),
+    )
 
 
 def for_file(
-    repo: Repo, path: Path, *, ignore_revs_file: str = ".git-blame-ignore-revs"
+    repo: Repo,
+    path: Path,
+    *,
+    ignore_revs_file: str = ".git-blame-ignore-revs",
+    identities: Optional[IdentityTable] = None,
+    rev: str = "HEAD",
+    collect_metrics: bool = False,
+    as_of: Optional[Timestamp] = None,
+    boundary: Optional[Boundary] = None,
 ) -> Authorship:
     """
-    Calculates how many lines each author has contributed to a file
+    Calculates how many lines each author has contributed to a file (as of `rev`)
+
+    If `collect_metrics`, also collects when each author's lines were authored and
+    committed, their distinct commits, and their ages (relative to `as_of`, the
+    time of `rev` by default) from the same blame. See `metrics`.
+
+    If a `boundary` is given, blame doesn't walk history past it, and the lines
+    from before it are credited to `boundary.label`.
 
     e.g. For a file with the following contents:
 
@@ -106,45 +744,569 @@ def for_file(
     ```
     """
     log.info(f"Blaming {path}")
+    identities = identities if identities is not None else IdentityTable()
     try:
-        revs_file_args = (
-            ["--ignore-revs-file", ignore_revs_file]
-            if (Path(repo.working_dir) / ignore_revs_file).is_file()
-            else []
-        )
-        raw_blame = repo.blame(
-            "HEAD", str(path), rev_opts=["-M", "-C", "-C", "-C", *revs_file_args]
-        )
-        blame = [
-            (f"{commit.author.name} <{commit.author.email}>", len(lines))
-            for commit, lines in (raw_blame or [])
-        ]
+        if boundary is not None:
+            porcelain = repo.git.blame(
+                "-p",
+                *boundary.revisions(rev),
+                *_blame_options(repo, ignore_revs_file),
+                "--",
+                str(path),
+                stdout_as_string=False,
+            )
+            blame = _porcelain_blame(porcelain, identities, boundary)
+        else:
+            raw_blame = repo.blame(
+                rev, str(path), rev_opts=_blame_options(repo, ignore_revs_file)
+            )
+            blame = [
+                (
+                    identities.intern(commit.author.name, commit.author.email),
+                    commit,
+                    len(lines),
+                )
+                for commit, lines in (raw_blame or [])
+            ]
+    except FileNotFoundError as e:
+        log.warning(f"Failed to blame {path}: {e}")
+        return {}
 
-        authorship: Authorship = defaultdict(_AuthorshipInfo)
-        for author, lines in blame:
-            authorship[author]["lines"] += lines
+    if collect_metrics and as_of is None:
+        as_of = repo.commit(rev).committed_date
+    return _blamed_authorship(blame, as_of if collect_metrics else None)
+
+
+def for_unblamed_file(
+    repo: Repo,
+    path: Path,
+    classification: Classification,
+    *,
+    identities: Optional[IdentityTable] = None,
+    rev: str = "HEAD",
+    as_of: Optional[Timestamp] = None,
+    boundary: Optional[Boundary] = None,
+) -> Authorship:
+    """
+    The authorship of a file not worth blaming (see `classify`), without blaming it.
+    Binary files have no authors, and every line of a generated file is credited to
+    the last commit touching it (with its metrics, if `as_of` is given), or to
+    `boundary.label` if that commit is before the `boundary`.
+    """
+    if classification.kind == classify.BINARY or not classification.lines:
+        return {}
+    log.info(f"Crediting generated {path} to its last commit")
+    identities = identities if identities is not None else IdentityTable()
+    revisions = boundary.revisions(rev) if boundary is not None else [rev]
+    fields = repo.git.log(
+        "-1", "--format=%H%x00%aN%x00%aE%x00%at%x00%ct", *revisions, "--", str(path)
+    ).split("\0")
+    if boundary is not None and fields == [""]:  # Last touched before the boundary
+        return {boundary.label: {"lines": classification.lines}}
+    if len(fields) != 5:
+        log.warning(f"Failed to find the last commit of {path}")
+        return {}
+    sha, name, email, authored, committed = fields
+    commit = BlamedCommit(sha, name, email, int(authored), int(committed))
+    author = identities.intern(name, email)
+    return _blamed_authorship([(author, commit, classification.lines)], as_of)
+
+
+async def for_file_async(
+    repo: Repo,
+    path: Path,
+    *,
+    ignore_revs_file: str = ".git-blame-ignore-revs",
+    identities: Optional[IdentityTable] = None,
+    rev: str = "HEAD",
+    collect_metrics: bool = False,
+    as_of: Optional[Timestamp] = None,
+    boundary: Optional[Boundary] = None,
+    limit: Optional[asyncio.Semaphore] = None,
+) -> Authorship:
+    """
+    Like `for_file`, but blames the file in an asyncio subprocess (killed if the
+    task is cancelled), once the `limit` on concurrent blames allows it.
+    """
+    log.info(f"Blaming {path}")
+    identities = identities if identities is not None else IdentityTable()
+    try:
+        async with limit or asyncio.Semaphore():
+            porcelain = await git_async(
+                repo,
+                "blame",
+                "-p",
+                *(boundary.revisions(rev) if boundary is not None else [rev]),
+                *_blame_options(repo, ignore_revs_file),
+                "--",
+                str(path),
+            )
     except FileNotFoundError as e:
         log.warning(f"Failed to blame {path}: {e}")
-        authorship = {}
+        return {}
+    blame = _porcelain_blame(porcelain, identities, boundary)
 
+    if collect_metrics and as_of is None:
+        as_of = repo.commit(rev).committed_date
+    return _blamed_authorship(blame, as_of if collect_metrics else None)
+
+
+def _porcelain_blame(
+    porcelain: bytes, identities: IdentityTable, boundary: Optional[Boundary] = None
+) -> List[Tuple[Author, Any, int]]:
+    """The `(author, commit, lines)` hunks of a `git blame --porcelain` output"""
+    return [
+        (
+            (
+                boundary.label
+                if boundary is not None and commit.boundary
+                else identities.intern(commit.author_name, commit.author_email)
+            ),
+            commit,
+            lines,
+        )
+        for commit, lines in parse_blame(porcelain)
+    ]
+
+
+def _blame_options(repo: Repo, ignore_revs_file: str) -> List[str]:
+    revs_file_args = (
+        ["--ignore-revs-file", ignore_revs_file]
+        if (Path(repo.working_dir) / ignore_revs_file).is_file()
+        else []
+    )
+    return [*BLAME_OPTIONS, *revs_file_args]
+
+
+def _blamed_authorship(
+    blame: List[Tuple[Author, Any, int]], as_of: Optional[Timestamp] = None
+) -> Authorship:
+    """
+    Sums up the lines of each author from blamed `(author, commit, lines)` hunks,
+    along with their metrics if `as_of` is given
+    """
+    authorship: Authorship = defaultdict(_AuthorshipInfo)
+    if as_of is not None:
+        for author, commit, lines in blame:
+            _merge_info(authorship[author], metrics.for_hunk(commit, lines, as_of))
+        metrics.collect(authorship)
+    else:
+        for author, _, lines in blame:
+            authorship[author]["lines"] += lines
     return authorship
 
 
-def _compute_repo_authorship(
-    repo: Repo, *, ignore_revs_file: str = ".git-blame-ignore-revs"
+def _blame_into_spill(
+    repo: Repo,
+    spill_path: Path,
+    *,
+    ignore_revs_file: str = ".git-blame-ignore-revs",
+    max_memory: int = spill.DEFAULT_MAX_MEMORY,
+    collect_metrics: bool = False,
+) -> Iterator[Tuple[FilePath, Authorship]]:
+    """Blames every file, yielding each result as soon as it has been spilled"""
+    spill_path.parent.mkdir(exist_ok=True, parents=True)
+    identities = IdentityTable()
+    as_of = repo.head.commit.committed_date
+    with spill.writer(spill_path, max_memory) as spilled:
+        for path in ls_files(repo):
+            authorship = for_file(
+                repo,
+                path,
+                ignore_revs_file=ignore_revs_file,
+                identities=identities,
+                collect_metrics=collect_metrics,
+                as_of=as_of,
+            )
+            spilled.append(path, authorship)
+            yield path, authorship
+
+
+def _load_repo_authorship(
+    repo: Repo,
+    *,
+    ignore_revs_file: str = ".git-blame-ignore-revs",
+    cache_dir: Path = Path("build/cache"),
+    use_cache: bool = True,
+    cache_compression: Optional[str] = None,
+    previous: Optional[Snapshot] = None,
+    paths: Optional[List[Path]] = None,
+    use_notes: bool = False,
+    rev: str = "HEAD",
+    collect_metrics: bool = False,
+    record_timings: bool = True,
+    classify_files: bool = False,
+    boundary: Optional[Boundary] = None,
 ) -> RepoAuthorship:
-    root = Path(repo.working_dir)
-    filepaths = [
-        Path(str(f)[len(str(root)) + 1 :])
-        for f in iterfiles(root, exclude=[root / d for d in EXCLUDE_DIRS])
-    ]
-    repo_authorship = {
-        path: for_file(repo, path, ignore_revs_file=ignore_revs_file)
-        for path in filepaths
+    cache = Cache(cache_dir, cache_compression)
+    key = cache_key(
+        repo.commit(rev).hexsha,
+        ignore_revs_file=ignore_revs_file,
+        collect_metrics=collect_metrics,
+        classify_files=classify_files,
+        boundary=boundary,
+    )
+    timings = Timings(cache.directory / plan.TIMINGS_FILENAME)
+    blobs_path = cache.directory / classify.BLOBS_FILENAME
+    blobs = BlobCache(blobs_path).load() if classify_files else None
+
+    if use_cache and (data := _cached(repo, cache, key, use_notes)) is not None:
+        if paths is not None:
+            data = {p: a for p, a in data.items() if is_within(p, paths)}
+    elif paths is not None:
+        # Only a complete result is worth caching
+        data = _compute_repo_authorship(
+            repo,
+            ignore_revs_file=ignore_revs_file,
+            previous=previous,
+            filepaths=ls_files(repo, rev, paths),
+            rev=rev,
+            collect_metrics=collect_metrics,
+            timings=timings if record_timings else None,
+            blobs=blobs,
+            boundary=boundary,
+        )
+        timings.save()
+        if blobs is not None:
+            blobs.save()
+    else:
+        journal = Journal(cache.path(key, ".journal"))
+        data = _compute_repo_authorship(
+            repo,
+            ignore_revs_file=ignore_revs_file,
+            previous=previous,
+            rev=rev,
+            journal=journal if use_cache else None,
+            collect_metrics=collect_metrics,
+            timings=timings if record_timings else None,
+            blobs=blobs,
+            boundary=boundary,
+        )
+        cache.put(key, data)
+        journal.remove()
+        timings.save()
+        if blobs is not None:
+            blobs.save()
+        if use_notes:
+            bundle.write_note(repo, key, data)
+
+    return data
+
+
+def _load_submodules(
+    repo: Repo,
+    *,
+    ignore_revs_file: str = ".git-blame-ignore-revs",
+    cache_dir: Path = Path("build/cache"),
+    use_cache: bool = True,
+    cache_compression: Optional[str] = None,
+    paths: Optional[List[Path]] = None,
+    rev: str = "HEAD",
+    collect_metrics: bool = False,
+    classify_files: bool = False,
+    boundary: Optional[Boundary] = None,
+) -> RepoAuthorship:
+    """
+    The (raw) authorship of every submodule of `rev` (recursively), with paths
+    relative to `repo`. Each submodule is loaded concurrently, at its pinned commit,
+    like a repo of its own. Submodules which aren't checked out are skipped.
+
+    A `boundary` at a revision of `repo` doesn't exist in its submodules, so they
+    are bounded at the time that revision was committed instead.
+    """
+    if repo.working_tree_dir is None:
+        return {}
+    worktree = Path(repo.working_tree_dir)
+    if boundary is not None and boundary.revision is not None:
+        committed = repo.commit(boundary.revision).committed_date
+        boundary = Boundary(boundary.label, timestamp=committed)
+
+    def _load(submodule: TreeEntry) -> RepoAuthorship:
+        try:
+            subrepo = Repo(worktree / submodule.path)
+            subrepo.commit(submodule.object)
+        except (InvalidGitRepositoryError, NoSuchPathError, ValueError) as e:
+            log.warning(f"Skipping submodule {submodule.path} (not checked out): {e}")
+            return {}
+        options: Dict[str, Any] = dict(
+            ignore_revs_file=ignore_revs_file,
+            cache_dir=cache_dir,
+            use_cache=use_cache,
+            cache_compression=cache_compression,
+            rev=submodule.object,
+            collect_metrics=collect_metrics,
+            classify_files=classify_files,
+            boundary=boundary,
+        )
+        # (Timings are keyed by path, so only those of the top-level repo are kept)
+        data = _load_repo_authorship(subrepo, record_timings=False, **options)
+        data.update(_load_submodules(subrepo, **options))
+        return {submodule.path / path: a for path, a in data.items()}
+
+    submodules = [e for e in ls_tree(repo, rev, paths) if e.type == "commit"]
+    with ThreadPoolExecutor() as pool:
+        grafted = list(pool.map(_load, submodules))
+    return {path: a for data in grafted for path, a in data.items()}
+
+
+def _cached(
+    repo: Repo, cache: Cache, key: str, use_notes: bool
+) -> Optional[RepoAuthorship]:
+    if (data := cache.get(key)) is None and use_notes:
+        if (data := bundle.read_note(repo, key)) is not None:
+            log.info(f"Using authorship from git notes for {key}")
+            cache.put(key, data)
+    return data
+
+
+def cache_key(
+    revision: str,
+    *,
+    ignore_revs_file: str = ".git-blame-ignore-revs",
+    collect_metrics: bool = False,
+    classify_files: bool = False,
+    boundary: Optional[Boundary] = None,
+):
+    """
+    Identifies the (raw) authorship of a revision computed with the given blame
+    options, e.g. `<sha>-<digest of options>`
+    """
+    options: Dict[str, Any] = {
+        "blame": BLAME_OPTIONS,
+        "ignore_revs_file": ignore_revs_file,
     }
+    if collect_metrics:  # (Keeps the keys of results without metrics unchanged)
+        options["metrics"] = True
+    if classify_files:
+        options["classify"] = True
+    if boundary is not None:
+        options["since"] = list(boundary)
+    digest = hashlib.sha256(json.dumps(options, sort_keys=True).encode()).hexdigest()
+    return f"{revision}-{digest[:12]}"
+
+
+def _augment(
+    repo: Optional[Repo],
+    data: RepoAuthorship,
+    *,
+    licenses: Optional[Config.AuthorLicenses] = None,
+    pseudonyms: Optional[Config.Pseudonyms] = None,
+    aliases: Optional[Config.Aliases] = None,
+    ignore_extensions: Optional[Config.IgnoreExtensions] = None,
+) -> RepoAuthorship:
+    data = _augment_files(
+        repo,
+        data,
+        licenses=licenses,
+        pseudonyms=pseudonyms,
+        aliases=aliases,
+        ignore_extensions=ignore_extensions,
+    )
+    data = _augment_folder_authorships(data)
+    for authorship in data.values():
+        metrics.finalize(authorship)
+    return data
+
+
+def _augment_files(
+    repo: Optional[Repo],
+    data: RepoAuthorship,
+    *,
+    licenses: Optional[Config.AuthorLicenses] = None,
+    pseudonyms: Optional[Config.Pseudonyms] = None,
+    aliases: Optional[Config.Aliases] = None,
+    ignore_extensions: Optional[Config.IgnoreExtensions] = None,
+) -> RepoAuthorship:
+    data = _augment_ignore_extensions(data, ignore_extensions or [])
+    data = _augment_identities(data, _resolve_identities(repo, data, aliases or {}))
+    data = _augment_author_licenses(data, licenses or {})
+    data = _augment_pseudonyms(data, pseudonyms or {})
+    return data
+
+
+def _augment_file(
+    path: FilePath,
+    authorship: Authorship,
+    *,
+    licenses: Config.AuthorLicenses,
+    pseudonyms: Config.Pseudonyms,
+    identities: Dict[Author, Author],
+    ignore_extensions: Optional[Config.IgnoreExtensions] = None,
+) -> RepoAuthorship:
+    """Augments the authorship of a single file, given its authors' identities"""
+    data = _augment_ignore_extensions({path: authorship}, ignore_extensions or [])
+    data = _augment_identities(data, identities)
+    data = _augment_author_licenses(data, licenses)
+    return _augment_pseudonyms(data, pseudonyms)
+
+
+def _compute_repo_authorship(
+    repo: Repo,
+    *,
+    ignore_revs_file: str = ".git-blame-ignore-revs",
+    previous: Optional[Snapshot] = None,
+    filepaths: Optional[List[Path]] = None,
+    rev: str = "HEAD",
+    journal: Optional[Journal] = None,
+    collect_metrics: bool = False,
+    timings: Optional[Timings] = None,
+    blobs: Optional[BlobCache] = None,
+    boundary: Optional[Boundary] = None,
+) -> RepoAuthorship:
+    """
+    Blames every file (unless reusable from `previous`). If a `journal` is given,
+    results already journaled (by an interrupted run) are reused, and each new
+    result is journaled as soon as it is computed. The time taken to blame each
+    file is recorded in `timings` (if given), to calibrate later plans.
+
+    If `blobs` is given, files are classified first (reusing the stats of blobs seen
+    before), and binary and generated files aren't blamed (see `for_unblamed_file`).
+    """
+    filepaths = filepaths if filepaths is not None else ls_files(repo, rev)
+    reusable = _reusable_authorship(
+        repo, previous, ignore_revs_file=ignore_revs_file, rev=rev
+    )
+    if journal is not None and (journaled := journal.read()):
+        log.info(f"Resuming from {len(journaled)} already blamed files")
+        reusable.update(journaled)
+    classes: Dict[FilePath, Classification] = {}
+    if blobs is not None:
+        pending = {p for p in filepaths if p not in reusable}
+        entries = [e for e in ls_tree(repo, rev) if e.path in pending]
+        classes = classify.classify(repo, entries, blobs)
+    identities = IdentityTable()
+    as_of = repo.commit(rev).committed_date if collect_metrics else None
+    with journal.appender() if journal is not None else nullcontext() as appender:
+        repo_authorship = {}
+        for path in filepaths:
+            if path in reusable:
+                repo_authorship[path] = reusable[path]
+                continue
+            if path in classes and classes[path].kind != classify.TEXT:
+                repo_authorship[path] = for_unblamed_file(
+                    repo,
+                    path,
+                    classes[path],
+                    identities=identities,
+                    rev=rev,
+                    as_of=as_of,
+                    boundary=boundary,
+                )
+                if appender is not None:
+                    appender.append(path, repo_authorship[path])
+                continue
+            start = time.perf_counter()
+            repo_authorship[path] = for_file(
+                repo,
+                path,
+                ignore_revs_file=ignore_revs_file,
+                identities=identities,
+                rev=rev,
+                collect_metrics=collect_metrics,
+                as_of=as_of,
+                boundary=boundary,
+            )
+            if timings is not None:
+                timings.record(path, time.perf_counter() - start)
+            if appender is not None:
+                appender.append(path, repo_authorship[path])
     return repo_authorship
 
 
+async def _compute_repo_authorship_async(
+    repo: Repo,
+    *,
+    ignore_revs_file: str = ".git-blame-ignore-revs",
+    filepaths: List[Path],
+    journal: Optional[Journal] = None,
+    collect_metrics: bool = False,
+    boundary: Optional[Boundary] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> RepoAuthorship:
+    """
+    Blames the files concurrently (see `for_repo_async`). The result is in the
+    order of `filepaths` (not of completion), like `_compute_repo_authorship`'s.
+    """
+    journaled = journal.read() if journal is not None else {}
+    if journaled:
+        log.info(f"Resuming from {len(journaled)} already blamed files")
+    done = {p: journaled[p] for p in filepaths if p in journaled}
+    identities = IdentityTable()
+    as_of = repo.head.commit.committed_date if collect_metrics else None
+    limit = asyncio.Semaphore(concurrency)
+
+    with journal.appender() if journal is not None else nullcontext() as appender:
+
+        async def _blame(path: Path):
+            done[path] = await for_file_async(
+                repo,
+                path,
+                ignore_revs_file=ignore_revs_file,
+                identities=identities,
+                collect_metrics=collect_metrics,
+                as_of=as_of,
+                boundary=boundary,
+                limit=limit,
+            )
+            if appender is not None:
+                appender.append(path, done[path])
+            if progress is not None:
+                progress(len(done), len(filepaths))
+
+        tasks = [asyncio.ensure_future(_blame(p)) for p in filepaths if p not in done]
+        try:
+            await asyncio.gather(*tasks)
+        finally:  # e.g. cancelled, or a blame failed
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    return {path: done[path] for path in filepaths}
+
+
+def _reusable_authorship(
+    repo: Repo,
+    previous: Optional[Snapshot],
+    *,
+    ignore_revs_file: str = ".git-blame-ignore-revs",
+    rev: str = "HEAD",
+) -> RepoAuthorship:
+    """
+    The subset of a previously computed (raw) authorship which is still valid at `rev`,
+    i.e. every file untouched since the previous revision.
+    """
+    if previous is None:
+        return {}
+    revision, repo_authorship = previous
+    changed = _changed_paths(repo, revision, rev, ignore_revs_file=ignore_revs_file)
+    if changed is None:
+        return {}
+    return {p: a for p, a in repo_authorship.items() if p not in changed}
+
+
+def _changed_paths(
+    repo: Repo,
+    old_rev: str,
+    new_rev: str,
+    *,
+    ignore_revs_file: str = ".git-blame-ignore-revs",
+) -> Optional[Set[Path]]:
+    """
+    The paths whose blame may differ between two revisions, or `None` if a change
+    affects the blame of every file (e.g. an edited `.mailmap`).
+    """
+    try:
+        output = repo.git.diff("--name-only", "--no-renames", "-z", old_rev, new_rev)
+    except GitCommandError as e:
+        log.warning(f"Failed to diff {old_rev}..{new_rev}: {e}")
+        return None
+    changed = {Path(p) for p in output.split("\0") if p}
+    if changed & {Path(f) for f in [*BLAME_CONFIG_FILES, ignore_revs_file]}:
+        return None
+    return changed
+
+
 def _augment_ignore_extensions(
     repo_authorship: RepoAuthorship, ignore_extensions: Config.IgnoreExtensions
 ) -> RepoAuthorship:
@@ -155,30 +1317,105 @@ def _augment_ignore_extensions(
     }
 
 
+def _resolve_identities(
+    repo: Optional[Repo], repo_authorship: RepoAuthorship, aliases: Config.Aliases
+) -> Dict[Author, Author]:
+    authors = (author for a in repo_authorship.values() for author in a.keys())
+    return identity.resolve(repo, authors, aliases)
+
+
+def _augment_identities(
+    repo_authorship: RepoAuthorship, identities: Dict[Author, Author]
+) -> RepoAuthorship:
+    return {
+        path: _identified(authorship, identities)
+        for path, authorship in repo_authorship.items()
+    }
+
+
+def _identified(authorship: Authorship, identities: Dict[Author, Author]):
+    if all(identities.get(author, author) == author for author in authorship):
+        return authorship
+    merged: Authorship = defaultdict(_AuthorshipInfo)
+    for author, info in authorship.items():
+        _merge_info(merged[identities.get(author, author)], info)
+    return dict(merged)
+
+
 def _augment_author_licenses(
     repo_authorship: RepoAuthorship, licenses: Config.AuthorLicenses
 ) -> RepoAuthorship:
-    for path, authorship in repo_authorship.items():
-        for author in authorship.keys():
-            if author in licenses:
-                repo_authorship[path][author]["license"] = licenses[author]
+    return {
+        path: _licensed(authorship, licenses)
+        for path, authorship in repo_authorship.items()
+    }
 
-    return repo_authorship
+
+def _licensed(authorship: Authorship, licenses: Config.AuthorLicenses) -> Authorship:
+    # (Copies rather than modifies, since the authorship may be a cached result)
+    if not any(author in licenses for author in authorship):
+        return authorship
+    return {
+        author: _with_license(info, licenses[author]) if author in licenses else info
+        for author, info in authorship.items()
+    }
+
+
+def _with_license(info: AuthorshipInfo, license: License) -> AuthorshipInfo:
+    info = info.copy()
+    info["license"] = license
+    return info
 
 
 def _augment_pseudonyms(
     repo_authorship: RepoAuthorship, pseudonyms: Config.Pseudonyms
 ) -> RepoAuthorship:
-    for pseudo_path, pseudonym in pseudonyms.items():  # TODO - optimize out O(n^2)
-        for repo_path, authorship in repo_authorship.items():
-            if repo_path.name.startswith(pseudo_path.name):
-                repo_authorship[repo_path] = {
-                    pseudonym["author"]: {
-                        "lines": sum(a["lines"] for a in authorship.values()),
-                        "license": pseudonym["license"],
-                    }
-                }
-    return repo_authorship
+    if not pseudonyms:
+        return repo_authorship
+    pseudonym_of = _pseudonym_matcher(pseudonyms)
+    return {
+        path: (
+            _pseudonymized(authorship, pseudonym)
+            if (pseudonym := pseudonym_of(path)) is not None
+            else authorship
+        )
+        for path, authorship in repo_authorship.items()
+    }
+
+
+def _pseudonym_matcher(
+    pseudonyms: Config.Pseudonyms,
+) -> Callable[[FilePath], Optional[_Pseudonym]]:
+    """
+    Finds the pseudonym of a path, i.e. the last one whose name prefixes the path's
+    name (as if each was applied in turn), looking up each distinct prefix length
+    instead of every pseudonym
+    """
+    by_prefix: Dict[str, Tuple[int, _Pseudonym]] = {
+        pseudo_path.name: (rank, pseudonym)
+        for rank, (pseudo_path, pseudonym) in enumerate(pseudonyms.items())
+    }
+    lengths = sorted({len(prefix) for prefix in by_prefix})
+
+    def pseudonym_of(path: FilePath) -> Optional[_Pseudonym]:
+        found: Optional[Tuple[int, _Pseudonym]] = None
+        for length in lengths:
+            if length > len(path.name):
+                break
+            match = by_prefix.get(path.name[:length])
+            if match is not None and (found is None or match[0] > found[0]):
+                found = match
+        return found[1] if found is not None else None
+
+    return pseudonym_of
+
+
+def _pseudonymized(authorship: Authorship, pseudonym: _Pseudonym) -> Authorship:
+    merged = _AuthorshipInfo()
+    for info in authorship.values():
+        _merge_info(merged, info)
+    merged["license"] = pseudonym["license"]
+    return {pseudonym["author"]: merged}
 
 
 def _augment_folder_authorships(repo_authorship: RepoAuthorship) -> RepoAuthorship:
@@ -186,12 +1423,42 @@ def _augment_folder_authorships(repo_authorship: RepoAuthorship) -> RepoAuthorsh
     for file, authorship in repo_authorship.items():
         for author, info in authorship.items():
             for parent in _parents(file):
-                _authorship[parent][author]["lines"] += info["lines"]
-                if "license" in info:
-                    _authorship[parent][author]["license"] = info["license"]
+                _merge_info(_authorship[parent][author], info)
     return _authorship
 
 
+def _iter_folder_authorships(
+    files: Iterable[Tuple[FilePath, Authorship]], include_files: bool = True
+) -> Iterator[Tuple[FilePath, Authorship]]:
+    """
+    Streaming equivalent of `_augment_folder_authorships`, for files given in git's
+    path order (so each folder's contents are contiguous). Each folder is yielded as
+    soon as its last file has been seen.
+    """
+    open_folders: List[Tuple[FilePath, Authorship]] = []
+    for file, authorship in files:
+        folders = list(_parents(file))[:-1]
+        depth = 0
+        while (
+            depth < min(len(open_folders), len(folders))
+            and open_folders[depth][0] == folders[depth]
+        ):
+            depth += 1
+        while len(open_folders) > depth:
+            yield open_folders.pop()
+        for folder in folders[depth:]:
+            open_folders.append((folder, defaultdict(_AuthorshipInfo)))
+
+        for _, totals in open_folders:
+            for author, info in authorship.items():
+                _merge_info(totals[author], info)
+        if include_files:
+            yield file, authorship
+
+    while open_folders:
+        yield open_folders.pop()
+
+
 def _parents(file: Path):
     parts = f"./{file}".split("/")
     for i in range(len(parts)):
@@ -203,4 +1470,11 @@ def _AuthorshipInfo() -> AuthorshipInfo:
     return {"lines": 0}
 
 
+def _merge_info(into: AuthorshipInfo, info: AuthorshipInfo):
+    into["lines"] += info["lines"]
+    if "license" in info:
+        into["license"] = info["license"]
+    metrics.merge(into, info)
+
+
 __all__ = ["file", "repo"]
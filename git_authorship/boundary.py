@@ -0,0 +1,59 @@
+# Copyright (c) 2025 Joseph Hale
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+from datetime import datetime
+from datetime import timezone
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+
+from git import GitCommandError
+from git import Repo
+
+from ._types import Author
+from ._types import Timestamp
+
+DAY = 24 * 60 * 60
+
+
+class Boundary(NamedTuple):
+    """
+    Where a time-bounded blame stops walking history: either a revision (lines from
+    it or its ancestors are before the boundary) or a time (lines from commits
+    committed before it are).
+    """
+
+    label: Author
+    """The author every line from before the boundary is credited to"""
+    revision: Optional[str] = None
+    timestamp: Optional[Timestamp] = None
+
+    def revisions(self, rev: str = "HEAD") -> List[str]:
+        """The revision arguments of `git blame`/`git log` for history up to `rev`"""
+        if self.revision is not None:
+            return [f"{self.revision}..{rev}"]
+        return [f"--max-age={self.timestamp}", rev]
+
+
+def resolve(repo: Repo, since: str) -> Boundary:
+    """
+    Resolves `--since` (a revision, or any date git understands, e.g. `2023-01-01`
+    or `2 years ago`) to a boundary. Dates are rounded down to the (UTC) day, so a
+    relative date names the same boundary (and cache entries) all day.
+    """
+    try:
+        revision = repo.git.rev_parse("--verify", "--quiet", f"{since}^{{commit}}")
+        return Boundary(f"before {since}", revision=revision)
+    except GitCommandError:
+        pass
+    max_age = repo.git.rev_parse(f"--since={since}")  # e.g. `--max-age=1672531200`
+    if not max_age.startswith("--max-age="):
+        raise ValueError(f"{since} is neither a revision nor a date")
+    timestamp = int(max_age.partition("=")[2]) // DAY * DAY
+    day = datetime.fromtimestamp(timestamp, timezone.utc).date()
+    return Boundary(f"before {day.isoformat()}", timestamp=timestamp)
+
+
+__all__ = ["Boundary", "resolve"]
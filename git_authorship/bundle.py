@@ -0,0 +1,219 @@
+# Copyright (c) 2025 Joseph Hale
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+
+from git import GitCommandError
+from git import Repo
+
+from ._pathutils import atomic_open
+from ._types import RepoAuthorship
+from .cache import Cache
+from .exceptions import BundleException
+
+log = logging.getLogger(__name__)
+
+BUNDLE_FORMAT = 1
+NOTES_REF = "refs/notes/git-authorship"
+NOTES_AUTHOR = {
+    "GIT_AUTHOR_NAME": "git-authorship",
+    "GIT_AUTHOR_EMAIL": "git-authorship@localhost",
+    "GIT_COMMITTER_NAME": "git-authorship",
+    "GIT_COMMITTER_EMAIL": "git-authorship@localhost",
+}
+
+Entry = Dict[str, Any]
+
+
+def export_bundle(
+    cache: Cache, output: Path, revisions: Optional[List[str]] = None
+) -> List[str]:
+    """
+    Saves cache entries (all of them, unless `revisions` are given) to a compressed,
+    portable bundle which can be imported into another machine's cache. Returns the
+    keys of the exported entries.
+
+    Raises:
+        BundleException: If there are no cached results for one of the `revisions`.
+    """
+    keys = cache.keys()
+    if revisions is not None:
+        for revision in revisions:
+            if not any(_revision(key).startswith(revision) for key in keys):
+                raise BundleException(f"No cached authorship for revision {revision}")
+        keys = [k for k in keys if _revision(k).startswith(tuple(revisions))]
+    entries = []
+    for key in keys:
+        if (data := cache.get(key)) is not None:
+            entries.append(make_entry(key, data))
+    with atomic_open(output, "wb") as f:
+        with gzip.GzipFile(fileobj=f, mode="wb") as gz:
+            gz.write(json.dumps({"format": BUNDLE_FORMAT, "entries": entries}).encode())
+    return [entry["key"] for entry in entries]
+
+
+def import_bundle(
+    cache: Cache, bundle: Path, revisions: Optional[List[str]] = None
+) -> List[str]:
+    """
+    Verifies every entry of a bundle, then adds them (only those of `revisions`, if
+    given) to the cache. Returns the keys of the imported entries.
+
+    Raises:
+        BundleException: If the bundle (or any entry in it) fails verification, or
+            it has no entries for one of the `revisions`.
+    """
+    try:
+        with gzip.open(bundle, "rb") as f:
+            contents = json.loads(f.read())
+    except (OSError, ValueError) as e:
+        raise BundleException(f"{bundle} is not a valid bundle: {e}")
+    if not isinstance(contents, dict) or contents.get("format") != BUNDLE_FORMAT:
+        raise BundleException(f"{bundle} is not a bundle of format {BUNDLE_FORMAT}")
+    verified = {}
+    for entry in _entries(contents):
+        data = verify_entry(entry)
+        verified[entry["key"]] = data
+    if revisions is not None:
+        for revision in revisions:
+            if not any(_revision(key).startswith(revision) for key in verified):
+                raise BundleException(f"{bundle} has no entries for {revision}")
+        verified = {
+            key: data
+            for key, data in verified.items()
+            if _revision(key).startswith(tuple(revisions))
+        }
+    for key, data in verified.items():
+        cache.put(key, data)
+    return list(verified)
+
+
+def make_entry(key: str, data: RepoAuthorship) -> Entry:
+    authorship = {str(path): authors for path, authors in data.items()}
+    return {
+        "key": key,
+        "sha256": _digest(key, authorship),
+        "authorship": authorship,
+    }
+
+
+def verify_entry(entry: Entry, revision: Optional[str] = None) -> RepoAuthorship:
+    """
+    Checks that an entry's contents are intact. The checksum covers the key, so an
+    entry can't be passed off as another revision's (or blame options') without
+    failing it. If `revision` is given, also checks that the entry was computed for
+    it (e.g. the commit a note is attached to).
+    """
+    try:
+        key, authorship, digest = entry["key"], entry["authorship"], entry["sha256"]
+    except (KeyError, TypeError):
+        raise BundleException("Malformed bundle entry")
+    if not isinstance(key, str) or not isinstance(authorship, dict):
+        raise BundleException(f"{key} is malformed")
+    if revision is not None and _revision(key) != revision:
+        raise BundleException(f"{key} does not belong to revision {revision}")
+    if _digest(key, authorship) != digest:
+        raise BundleException(f"{key} is corrupt (checksum mismatch)")
+    return {Path(path): authors for path, authors in authorship.items()}
+
+
+def fetch_notes(repo: Repo, remote: str = "origin"):
+    """Fetches the results other machines have stored in git notes, if any."""
+    try:
+        repo.git.fetch(remote, f"+{NOTES_REF}:{NOTES_REF}")
+    except GitCommandError as e:
+        log.info(f"No authorship notes fetched from {remote}: {e.stderr.strip()}")
+
+
+def read_note(repo: Repo, key: str) -> Optional[RepoAuthorship]:
+    """The verified result for `key` stored in the git notes of its revision, if any"""
+    revision = _revision(key)
+    try:
+        for entry in _note_entries(repo, revision):
+            if isinstance(entry, dict) and entry.get("key") == key:
+                return verify_entry(entry, revision)
+    except BundleException as e:
+        log.warning(f"Ignoring authorship note: {e}")
+    return None
+
+
+def write_note(repo: Repo, key: str, data: RepoAuthorship):
+    """Stores a result in the git notes of its revision (keeping other results)."""
+    revision = _revision(key)
+    try:
+        entries = [
+            e
+            for e in _note_entries(repo, revision)
+            if isinstance(e, dict) and e.get("key") != key
+        ]
+    except BundleException as e:
+        log.warning(f"Replacing authorship note: {e}")
+        entries = []
+    note = {"format": BUNDLE_FORMAT, "entries": [*entries, make_entry(key, data)]}
+
+    fd, path = tempfile.mkstemp(suffix=".json")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(note, f)
+        repo.git.notes(
+            "--ref", NOTES_REF, "add", "-f", "-F", path, revision, env=NOTES_AUTHOR
+        )
+    finally:
+        os.unlink(path)
+
+
+def _note_entries(repo: Repo, revision: str) -> List[Any]:
+    """The (unverified) entries of the note of `revision` (none without a note)"""
+    try:
+        output = repo.git.notes("--ref", NOTES_REF, "show", revision)
+    except GitCommandError:
+        return []
+    try:
+        note = json.loads(output)
+    except ValueError as e:
+        raise BundleException(f"The note of {revision} is not JSON: {e}")
+    return _entries(note)
+
+
+def _entries(contents: Any) -> List[Any]:
+    """The (unverified) entries of a bundle or note"""
+    if not isinstance(contents, dict):
+        raise BundleException("Expected a JSON object with a list of entries")
+    entries = contents.get("entries", [])
+    if not isinstance(entries, list):
+        raise BundleException("Expected a JSON object with a list of entries")
+    return entries
+
+
+def _revision(key: str) -> str:
+    return key.split("-", 1)[0]
+
+
+def _digest(key: str, authorship: Dict[str, Any]) -> str:
+    canonical = json.dumps(
+        {"key": key, "authorship": authorship}, sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+__all__ = [
+    "export_bundle",
+    "import_bundle",
+    "make_entry",
+    "verify_entry",
+    "fetch_notes",
+    "read_note",
+    "write_note",
+]
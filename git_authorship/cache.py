@@ -0,0 +1,233 @@
+# Copyright (c) 2025 Joseph Hale
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
+
+from . import telemetry
+from ._pathutils import compression_extension
+from ._pathutils import COMPRESSIONS
+from ._pathutils import io_handle
+from ._types import RepoAuthorship
+from .classify import BlobCache
+from .classify import BLOBS_FILENAME
+
+try:
+    import fcntl
+except ImportError:  # e.g. on Windows
+    fcntl = None  # type: ignore
+
+log = logging.getLogger(__name__)
+
+EXTENSIONS = ["", *COMPRESSIONS.values()]
+ENTRY_SUFFIXES = [
+    f"{suffix}{ext}" for suffix in [".json", ".jsonl"] for ext in EXTENSIONS
+]
+STALE_TMP_AGE = 60 * 60
+"""Seconds before an unfinished write (e.g. from a killed job) is considered dead"""
+
+
+class CacheEntry(NamedTuple):
+    path: Path
+    size: int
+    """In bytes"""
+    last_access: float
+    """As a UNIX timestamp"""
+
+
+class CacheStats(NamedTuple):
+    entries: int
+    size: int
+    oldest: Optional[float]
+    newest: Optional[float]
+
+
+class Cache:
+    """
+    A directory of computed (raw) repo authorships, keyed by revision.
+
+    Entries are written atomically and read without locks, so parallel jobs can
+    share one cache directory. Writes share a lock which `prune` takes exclusively,
+    so an entry is never evicted while it is being written. Each read refreshes the
+    entry's modification time, which `prune` uses to evict the least recently used
+    entries first.
+
+    New entries are compressed with `compression` (if any). Entries are read back
+    whatever their compression.
+    """
+
+    def __init__(self, directory: Path, compression: Optional[str] = None):
+        self.directory = directory
+        self.extension = compression_extension(compression)
+        """Appended to the suffix of new entries, e.g. `.gz`"""
+
+    def path(self, key: str, suffix: str = ".json") -> Path:
+        return self.directory / f"{key}{suffix}"
+
+    def get(self, key: str) -> Optional[RepoAuthorship]:
+        for ext in sorted(EXTENSIONS, key=lambda ext: ext != self.extension):
+            path = self.path(key, f".json{ext}")
+            try:
+                with io_handle(path, "r") as f:
+                    data = {Path(k): v for k, v in (json.load(f) or {}).items()}
+            except FileNotFoundError:
+                continue
+            except (OSError, EOFError, ValueError) as e:
+                log.warning(f"Ignoring corrupt cache entry {path}: {e}")
+                continue
+            telemetry.add_file_size("cache_read_bytes_total", path)
+            self.touch(path)
+            return data
+        return None
+
+    def put(self, key: str, data: RepoAuthorship):
+        self.directory.mkdir(exist_ok=True, parents=True)
+        with self._lock(shared=True):
+            with io_handle(self.path(key, f".json{self.extension}")) as f:
+                json.dump({str(path): authors for path, authors in data.items()}, f)
+
+    def keys(self) -> List[str]:
+        """The key of every (non-spilled) entry, least recently used first"""
+        suffixes = [f".json{ext}" for ext in EXTENSIONS]
+        return [_key(e.path) for e in self.entries() if _suffix(e.path) in suffixes]
+
+    def touch(self, path: Path):
+        try:
+            os.utime(path)
+        except OSError:  # e.g. pruned by a parallel job in the meantime
+            pass
+
+    def entries(self) -> List[CacheEntry]:
+        """Every entry, least recently used first"""
+        entries = []
+        for path in self._files():
+            if _suffix(path) in ENTRY_SUFFIXES and not path.name.startswith("."):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append(CacheEntry(path, stat.st_size, stat.st_mtime))
+        return sorted(entries, key=lambda e: (e.last_access, e.path))
+
+    def stats(self) -> CacheStats:
+        entries = self.entries()
+        return CacheStats(
+            entries=len(entries),
+            size=sum(e.size for e in entries),
+            oldest=entries[0].last_access if entries else None,
+            newest=entries[-1].last_access if entries else None,
+        )
+
+    def prune(
+        self, *, max_size: Optional[int] = None, max_age: Optional[float] = None
+    ) -> List[Path]:
+        """
+        Evicts entries not used within `max_age` seconds, then the least recently
+        used entries until the cache fits in `max_size` bytes. Also removes dead
+        temporary files, journals of runs abandoned for `max_age`, and the stats of
+        blobs unused for `max_age` (all of them, once no entry is left). Returns the
+        removed entries.
+        """
+        removed = []
+        with self._lock():
+            now = time.time()
+            entries = self.entries()
+            size = sum(e.size for e in entries)
+            for entry in entries:
+                expired = max_age is not None and now - entry.last_access > max_age
+                oversized = max_size is not None and size > max_size
+                if expired or oversized:
+                    entry.path.unlink(missing_ok=True)
+                    removed.append(entry.path)
+                    size -= entry.size
+            for path in self._files():
+                age = now - _mtime(path)
+                abandoned = path.suffix == ".journal" and max_age and age > max_age
+                if (path.suffix == ".tmp" and age > STALE_TMP_AGE) or abandoned:
+                    path.unlink(missing_ok=True)
+            blobs = self.directory / BLOBS_FILENAME
+            if not self.entries():
+                blobs.unlink(missing_ok=True)
+            elif max_age is not None and blobs.is_file():
+                BlobCache(blobs).load().prune(max_age)
+        return removed
+
+    def verify(self, fix: bool = False) -> List[Tuple[Path, str]]:
+        """
+        Checks that every entry can be read back. Returns the problems found (and
+        removes those entries, if `fix`).
+        """
+        problems = []
+        for entry in self.entries():
+            if (problem := _verify_entry(entry.path)) is not None:
+                problems.append((entry.path, problem))
+                if fix:
+                    entry.path.unlink(missing_ok=True)
+        return problems
+
+    def _files(self) -> List[Path]:
+        return list(self.directory.iterdir()) if self.directory.is_dir() else []
+
+    @contextmanager
+    def _lock(self, shared: bool = False):
+        if fcntl is None or not self.directory.is_dir():
+            yield
+            return
+        with open(self.directory / ".lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _mtime(path: Path) -> float:
+    try:
+        return path.stat().st_mtime
+    except FileNotFoundError:
+        return time.time()
+
+
+def _key(path: Path) -> str:
+    return path.name.split(".", 1)[0]
+
+
+def _suffix(path: Path) -> str:
+    """e.g. `.json.gz`"""
+    name = path.name
+    return name[name.index(".") :] if "." in name else ""
+
+
+def _verify_entry(path: Path) -> Optional[str]:
+    try:
+        with io_handle(path, "r") as f:
+            if _suffix(path).startswith(".jsonl"):
+                nodes = [tuple(json.loads(line)) for line in f]
+            else:
+                nodes = list((json.load(f) or {}).items())
+    except (OSError, EOFError, ValueError) as e:
+        return f"Unreadable: {e}"
+    for idx, node in enumerate(nodes):
+        if not (len(node) == 2 and _is_authorship(node[1])):
+            return f"Malformed authorship in entry {idx}"
+    return None
+
+
+def _is_authorship(authorship) -> bool:
+    return isinstance(authorship, dict) and all(
+        isinstance(info, dict) and isinstance(info.get("lines"), int)
+        for info in authorship.values()
+    )
+
+
+__all__ = ["Cache", "CacheEntry", "CacheStats"]
@@ -0,0 +1,237 @@
+# Copyright (c) 2025 Joseph Hale
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Sequence
+from typing import Set
+
+from git import Repo
+
+from ._git import TreeEntry
+from ._pathutils import io_handle
+from ._types import FilePath
+from ._types import LineCount
+
+log = logging.getLogger(__name__)
+
+TEXT = "text"
+"""Blamed as usual"""
+BINARY = "binary"
+"""Not blamed (no lines)"""
+GENERATED = "generated"
+"""Not blamed. Every line is credited to the last commit touching the file."""
+
+BLOBS_FILENAME = ".blobs.json"
+"""Kept in the cache directory (dotfiles are not cache entries)"""
+BINARY_SNIFF_BYTES = 8000
+"""Like git, a file is binary if a NUL byte is within its first 8000 bytes"""
+MAX_LINE_LENGTH = 1000
+"""Files with longer lines are considered minified (i.e. generated)"""
+GENERATED_FILENAMES = {
+    "Cargo.lock",
+    "Gemfile.lock",
+    "composer.lock",
+    "go.sum",
+    "package-lock.json",
+    "pnpm-lock.yaml",
+    "poetry.lock",
+    "yarn.lock",
+}
+ATTRIBUTES = ["binary", "diff", "linguist-generated"]
+ATTRIBUTES_BATCH_SIZE = 512
+"""Paths passed to a single `git check-attr` call (bounds argv length)"""
+CHUNK_SIZE = 64 * 1024
+
+
+class BlobStats(NamedTuple):
+    """What the content of a blob says about it (so it depends only on the blob)"""
+
+    binary: bool
+    lines: LineCount
+    longest_line: int
+
+
+class Classification(NamedTuple):
+    kind: str
+    """`TEXT`, `BINARY`, or `GENERATED`"""
+    lines: LineCount
+
+
+class BlobCache:
+    """
+    The stats of every blob seen by earlier runs, by blob id, along with when each
+    was last used (so that `prune` can evict the stats of blobs no longer seen).
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.stats: Dict[str, BlobStats] = {}
+        self.last_used: Dict[str, float] = {}
+        self._used: Set[str] = set()
+
+    def load(self) -> "BlobCache":
+        try:
+            with io_handle(self.path, "r") as f:
+                for blob, (*stats, last_used) in json.load(f).items():
+                    self.stats[blob] = BlobStats(*stats)
+                    self.last_used[blob] = last_used
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, TypeError) as e:
+            log.warning(f"Ignoring unreadable blob stats {self.path}: {e}")
+            self.stats, self.last_used = {}, {}
+        return self
+
+    def get(self, blob: str) -> Optional[BlobStats]:
+        if (stats := self.stats.get(blob)) is not None:
+            self._used.add(blob)
+        return stats
+
+    def put(self, blob: str, stats: BlobStats):
+        self.stats[blob] = stats
+        self._used.add(blob)
+
+    def save(self):
+        """Saves the stats, marking those used since `load` as used now"""
+        if not self._used:
+            return
+        now = time.time()
+        self.last_used.update((blob, now) for blob in self._used)
+        self._used.clear()
+        self._write()
+
+    def prune(self, max_age: float) -> int:
+        """Evicts the stats unused for `max_age` seconds. Returns how many."""
+        now = time.time()
+        stale = [b for b, used in self.last_used.items() if now - used > max_age]
+        for blob in stale:
+            del self.stats[blob], self.last_used[blob]
+        if stale:
+            self._write()
+        return len(stale)
+
+    def _write(self):
+        self.path.parent.mkdir(exist_ok=True, parents=True)
+        with io_handle(self.path) as f:
+            json.dump(
+                {b: [*s, self.last_used[b]] for b, s in self.stats.items()},
+                f,
+            )
+
+
+def classify(
+    repo: Repo, entries: Sequence[TreeEntry], blobs: Optional[BlobCache] = None
+) -> Dict[FilePath, Classification]:
+    """
+    Classifies each file before blaming it, from its `.gitattributes` (`binary`,
+    `-diff`, `linguist-generated`), its name (lockfiles), and its content (NUL bytes
+    and line lengths). Contents are read in bulk through git's persistent
+    `cat-file --batch` process, unless their stats are already in `blobs` (or the
+    attributes already say the file is binary).
+    """
+    blobs = blobs if blobs is not None else BlobCache(Path(BLOBS_FILENAME))
+    files = [e for e in entries if e.type == "blob"]
+    attributes = check_attributes(repo, [e.path for e in files])
+    classes: Dict[FilePath, Classification] = {}
+    for entry in files:
+        file_attributes = attributes.get(entry.path, {})
+        if _binary_attributes(file_attributes):
+            classes[entry.path] = Classification(BINARY, 0)
+            continue
+        if (stats := blobs.get(entry.object)) is None:
+            stats = blob_stats(repo, entry.object)
+            blobs.put(entry.object, stats)
+        classes[entry.path] = Classification(
+            _kind(entry.path, stats, file_attributes), stats.lines
+        )
+    return classes
+
+
+def blob_stats(repo: Repo, blob: str) -> BlobStats:
+    """
+    Scans the content of a blob (without holding all of it in memory). Lines aren't
+    counted in binary blobs, which are only read past their first NUL byte to drain
+    them from git's `cat-file --batch` process.
+    """
+    _, _, _, stream = repo.git.stream_object_data(blob)
+    lines = longest = current = 0
+    read = 0
+    while chunk := stream.read(CHUNK_SIZE):
+        if read < BINARY_SNIFF_BYTES and b"\0" in chunk[: BINARY_SNIFF_BYTES - read]:
+            while stream.read(CHUNK_SIZE):
+                pass
+            return BlobStats(True, 0, 0)
+        read += len(chunk)
+        start = 0
+        while (end := chunk.find(b"\n", start)) != -1:
+            longest = max(longest, current + end - start)
+            lines += 1
+            current, start = 0, end + 1
+        current += len(chunk) - start
+    if current:  # A last line without a trailing newline
+        longest = max(longest, current)
+        lines += 1
+    return BlobStats(False, lines, longest)
+
+
+def check_attributes(
+    repo: Repo, paths: List[FilePath]
+) -> Dict[FilePath, Dict[str, str]]:
+    """The (specified) values of `ATTRIBUTES` of each path, e.g. `{"diff": "unset"}`"""
+    attributes: Dict[FilePath, Dict[str, str]] = {}
+    for start in range(0, len(paths), ATTRIBUTES_BATCH_SIZE):
+        batch = paths[start : start + ATTRIBUTES_BATCH_SIZE]
+        output = repo.git.check_attr("-z", *ATTRIBUTES, "--", *map(str, batch))
+        fields = output.split("\0")
+        for path, attribute, value in zip(fields[::3], fields[1::3], fields[2::3]):
+            if value != "unspecified":
+                attributes.setdefault(Path(path), {})[attribute] = value
+    return attributes
+
+
+def _kind(path: Path, stats: BlobStats, attributes: Dict[str, str]) -> str:
+    if _binary_attributes(attributes):
+        return BINARY
+    if (generated := attributes.get("linguist-generated")) is not None:
+        return GENERATED if generated in ["set", "true"] else _content_kind(stats)
+    if path.name in GENERATED_FILENAMES:
+        return GENERATED
+    return _content_kind(stats)
+
+
+def _binary_attributes(attributes: Dict[str, str]) -> bool:
+    return attributes.get("binary") == "set" or attributes.get("diff") == "unset"
+
+
+def _content_kind(stats: BlobStats) -> str:
+    if stats.binary:
+        return BINARY
+    if stats.longest_line > MAX_LINE_LENGTH:
+        return GENERATED
+    return TEXT
+
+
+__all__ = [
+    "TEXT",
+    "BINARY",
+    "GENERATED",
+    "BLOBS_FILENAME",
+    "BINARY_SNIFF_BYTES",
+    "MAX_LINE_LENGTH",
+    "GENERATED_FILENAMES",
+    "BlobStats",
+    "Classification",
+    "BlobCache",
+    "classify",
+    "blob_stats",
+    "check_attributes",
+]
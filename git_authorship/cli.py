@@ -5,25 +5,57 @@
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
 import argparse
 import importlib.metadata
+import json
 import logging
 import shutil
+import sys
+from contextlib import ExitStack
+from contextlib import nullcontext
 from dataclasses import dataclass
 from dataclasses import field
 from datetime import date
+from datetime import datetime
 from pathlib import Path
+from typing import Callable
+from typing import Dict
 from typing import Iterable
+from typing import Iterator
+from typing import List
 from typing import Optional
+from typing import Tuple
 from typing import Union
 
 from git import Repo
 
 from git_authorship import authorship
+from git_authorship import bundle
 from git_authorship import export
+from git_authorship import index
+from git_authorship import plan
+from git_authorship import prepare
+from git_authorship import sample
+from git_authorship import server
+from git_authorship import shard
+from git_authorship import telemetry
+from git_authorship import watch
+from git_authorship._pathutils import compression_extension
+from git_authorship._pathutils import COMPRESSIONS
+from git_authorship._pathutils import io_handle
+from git_authorship._types import Authorship
+from git_authorship._types import Config
+from git_authorship._types import RepoAuthorship
+from git_authorship.cache import Cache
+from git_authorship.config import load_aliases_config
 from git_authorship.config import load_licenses_config
 from git_authorship.config import load_pseudonyms_config
+from git_authorship.server import AuthorshipService
+from git_authorship.shard import Shard
 
 log = logging.getLogger(__name__)
 
+PLAN_TOP = 10
+"""The number of most expensive folders/files listed by --plan"""
+
 DEFAULT_IGNORE_EXTENSIONS = [
     ".doc",
     ".docx",
@@ -47,16 +79,76 @@ class Args:
     branch: str
     author_licenses: Optional[Path]
     pseudonyms: Optional[Path]
+    aliases: Optional[Path] = None
     use_cache: bool = True
     show_version: bool = False
     ignore_extensions: Iterable[str] = field(
         default_factory=lambda: DEFAULT_IGNORE_EXTENSIONS
     )
     ignore_revs_file: str = ".git-blame-ignore-revs"
+    serve: Optional[str] = None
+    watch: bool = False
+    watch_interval: float = 60.0
+    debounce: float = 10.0
+    shard: Optional[Shard] = None
+    shard_strategy: str = "hash"
+    paths: Optional[List[Path]] = None
+    update: bool = False
+    max_memory: Optional[int] = None
+    cache_max_size: Optional[int] = None
+    cache_max_age: Optional[float] = None
+    notes: bool = False
+    diff: Optional[Tuple[str, str]] = None
+    sample: Optional[int] = None
+    sample_seed: int = 0
+    compress: Optional[str] = None
+    metrics: bool = False
+    index: bool = False
+    plan: bool = False
+    submodules: bool = False
+    classify: bool = False
+    since: Optional[str] = None
+    prepare: bool = False
+    telemetry: bool = False
+
+
+@dataclass
+class CacheArgs:
+    action: str
+    output: Path
+    max_size: Optional[int] = None
+    max_age: Optional[float] = None
+    fix: bool = False
+    compress: Optional[str] = None
+    bundle: Optional[Path] = None
+    revisions: Optional[List[str]] = None
+
+
+@dataclass
+class QueryArgs:
+    output: Path
+    author: Optional[str] = None
+    license: Optional[str] = None
+    limit: int = 10
+    folders: bool = False
+
+
+@dataclass
+class MergeArgs:
+    partials: List[Path]
+    output: Path
+    author_licenses: Optional[Path] = None
+    pseudonyms: Optional[Path] = None
+    aliases: Optional[Path] = None
+    ignore_extensions: Iterable[str] = field(
+        default_factory=lambda: DEFAULT_IGNORE_EXTENSIONS
+    )
 
 
 def parse_args(argv=None) -> Args:
-    parser = argparse.ArgumentParser()
+    parser = argparse.ArgumentParser(
+        epilog="other commands: merge, cache, query (see `git-authorship COMMAND --help`)"
+    )
     parser.add_argument(
         "--version",
         action="store_true",
@@ -90,12 +182,164 @@ def parse_args(argv=None) -> Args:
         default=None,
         help="The path to a CSV file containing pseudonyms (Columns: path,author,license)",
     )
+    parser.add_argument(
+        "--aliases",
+        nargs="?",
+        default=None,
+        help="The path to a CSV file merging author identities (Columns: alias,author)",
+    )
     parser.add_argument(
         "--ignore-revs-file",
         nargs="?",
         default=".git-blame-ignore-revs",
         help="The path to a file containing revisions to ignore",
     )
+    parser.add_argument(
+        "--serve",
+        metavar="ADDRESS",
+        default=None,
+        help="Answer authorship queries over HTTP at HOST:PORT or unix:PATH",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running, and recompute the reports whenever the branch moves",
+    )
+    parser.add_argument(
+        "--watch-interval",
+        type=float,
+        default=60.0,
+        help="Seconds between checks for new commits in --watch mode",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=10.0,
+        help="Seconds a new commit must stay unchanged before recomputing in --watch mode",
+    )
+    parser.add_argument(
+        "--shard",
+        metavar="K/N",
+        default=None,
+        help="Only blame the K-th of N parts of the repo, saving a partial result to merge",
+    )
+    parser.add_argument(
+        "--shard-strategy",
+        choices=shard.STRATEGIES,
+        default="hash",
+        help="Split files into shards by path hash or by estimated cost (blob size)",
+    )
+    parser.add_argument(
+        "--path",
+        action="append",
+        default=None,
+        help="Only analyze the given file/folder (repeatable)",
+    )
+    parser.add_argument(
+        "--update",
+        action="store_true",
+        help="Update the --path(s) within the existing reports in --output",
+    )
+    parser.add_argument(
+        "--max-memory",
+        metavar="MB",
+        type=int,
+        default=None,
+        help="Spill per-file results to disk, holding at most MB of them in memory",
+    )
+    parser.add_argument(
+        "--cache-max-size",
+        metavar="MB",
+        type=int,
+        default=None,
+        help="After running, evict least recently used cache entries beyond MB",
+    )
+    parser.add_argument(
+        "--cache-max-age",
+        metavar="DAYS",
+        type=float,
+        default=None,
+        help="After running, evict cache entries unused for DAYS",
+    )
+    parser.add_argument(
+        "--diff",
+        metavar="OLD..NEW",
+        default=None,
+        help="Report how authorship changed between two revisions (instead of at one)",
+    )
+    parser.add_argument(
+        "--sample",
+        metavar="FILES",
+        type=int,
+        default=None,
+        help="Quickly estimate author/license shares by only blaming about FILES files",
+    )
+    parser.add_argument(
+        "--sample-seed",
+        type=int,
+        default=0,
+        help="Blame a different --sample of files",
+    )
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help="Estimate how long the run would take (and its most expensive paths) "
+        "without blaming anything",
+    )
+    parser.add_argument(
+        "--compress",
+        choices=list(COMPRESSIONS),
+        default=None,
+        help="Compress the reports and cache (zstd requires the zstandard package)",
+    )
+    parser.add_argument(
+        "--metrics",
+        action="store_true",
+        help="Also report when each author's lines were authored/committed, "
+        "their distinct commits, and their ages",
+    )
+    parser.add_argument(
+        "--index",
+        action="store_true",
+        help="Also save an index of the paths each author/license contributed to, "
+        "for `git-authorship query`",
+    )
+    parser.add_argument(
+        "--submodules",
+        action="store_true",
+        help="Also analyze each submodule (at its pinned commit), under its path",
+    )
+    parser.add_argument(
+        "--since",
+        metavar="DATE|REV",
+        default=None,
+        help="Only walk history back to a date (e.g. '2 years ago') or revision. "
+        "Older lines are credited to a single 'before <since>' author",
+    )
+    parser.add_argument(
+        "--classify",
+        action="store_true",
+        help="Don't blame binary files (no authors) or generated files (credited to "
+        "their last commit), detected from .gitattributes, names, and contents",
+    )
+    parser.add_argument(
+        "--prepare",
+        action="store_true",
+        help="Before blaming, write a commit-graph with changed-path Bloom filters "
+        "and repack objects (unless already done), reporting blame timings before "
+        "and after",
+    )
+    parser.add_argument(
+        "--telemetry",
+        action="store_true",
+        help="Also save the resources used by the run (CPU, memory, git processes, "
+        "I/O) as a Prometheus textfile and JSON",
+    )
+    parser.add_argument(
+        "--notes",
+        action="store_true",
+        help="Share computed authorship with other clones through git notes",
+    )
     parser.add_argument(
         "--no-cache",
         action="store_true",
@@ -112,7 +356,32 @@ def parse_args(argv=None) -> Args:
             branch=args.branch,
             author_licenses=_parse_file_path(args.author_licenses, "--author-licenses"),
             pseudonyms=_parse_file_path(args.pseudonyms, "--pseudonyms"),
+            aliases=_parse_file_path(args.aliases, "--aliases"),
             ignore_revs_file=args.ignore_revs_file,
+            serve=args.serve,
+            watch=args.watch,
+            watch_interval=args.watch_interval,
+            debounce=args.debounce,
+            shard=Shard.parse(args.shard) if args.shard else None,
+            shard_strategy=args.shard_strategy,
+            paths=[Path(p) for p in args.path] if args.path else None,
+            update=args.update,
+            max_memory=args.max_memory,
+            cache_max_size=args.cache_max_size,
+            cache_max_age=args.cache_max_age,
+            notes=args.notes,
+            diff=_parse_revision_range(args.diff) if args.diff else None,
+            sample=args.sample,
+            sample_seed=args.sample_seed,
+            compress=args.compress,
+            metrics=args.metrics,
+            index=args.index,
+            plan=args.plan,
+            submodules=args.submodules,
+            classify=args.classify,
+            since=args.since,
+            prepare=args.prepare,
+            telemetry=args.telemetry,
             use_cache=not args.no_cache,
             show_version=args.version,
         )
@@ -122,9 +391,275 @@ def parse_args(argv=None) -> Args:
 def _assert_valid_args(args: Args):
     if args.output.exists() and args.output.is_file():
         raise ValueError(f"--output cannot be an existing file. Given: {args.output}")
+    if args.serve and args.watch:
+        raise ValueError("--serve and --watch cannot be combined")
+    if args.shard and (args.serve or args.watch):
+        raise ValueError("--shard cannot be combined with --serve or --watch")
+    if args.paths and (args.serve or args.watch or args.shard):
+        raise ValueError("--path cannot be combined with --serve, --watch, or --shard")
+    if args.update and not args.paths:
+        raise ValueError("--update requires at least one --path")
+    if args.max_memory and (args.serve or args.watch or args.shard or args.paths):
+        raise ValueError(
+            "--max-memory cannot be combined with --serve, --watch, --shard, or --path"
+        )
+    if args.diff and (
+        args.serve or args.watch or args.shard or args.paths or args.max_memory
+    ):
+        raise ValueError(
+            "--diff cannot be combined with --serve, --watch, --shard, --path, "
+            "or --max-memory"
+        )
+    compression_extension(args.compress)
+    if args.sample is not None and args.sample < 1:
+        raise ValueError(f"--sample must be at least 1. Given: {args.sample}")
+    if args.sample and (
+        args.serve
+        or args.watch
+        or args.shard
+        or args.paths
+        or args.max_memory
+        or args.diff
+    ):
+        raise ValueError(
+            "--sample cannot be combined with --serve, --watch, --shard, --path, "
+            "--max-memory, or --diff"
+        )
+    if args.metrics and (args.update or args.diff or args.sample or args.shard):
+        raise ValueError(
+            "--metrics cannot be combined with --update, --diff, --sample, or --shard"
+        )
+    if args.index and (
+        args.serve or args.watch or args.shard or args.diff or args.sample
+    ):
+        raise ValueError(
+            "--index cannot be combined with --serve, --watch, --shard, --diff, "
+            "or --sample"
+        )
+    if args.plan and (
+        args.serve
+        or args.watch
+        or args.shard
+        or args.update
+        or args.max_memory
+        or args.diff
+        or args.sample
+        or args.index
+    ):
+        raise ValueError(
+            "--plan cannot be combined with --serve, --watch, --shard, --update, "
+            "--max-memory, --diff, --sample, or --index"
+        )
+    if args.submodules and (
+        args.serve
+        or args.watch
+        or args.shard
+        or args.max_memory
+        or args.diff
+        or args.sample
+        or args.plan
+    ):
+        raise ValueError(
+            "--submodules cannot be combined with --serve, --watch, --shard, "
+            "--max-memory, --diff, --sample, or --plan"
+        )
+    if args.classify and (
+        args.serve
+        or args.watch
+        or args.shard
+        or args.max_memory
+        or args.diff
+        or args.sample
+        or args.plan
+    ):
+        raise ValueError(
+            "--classify cannot be combined with --serve, --watch, --shard, "
+            "--max-memory, --diff, --sample, or --plan"
+        )
+    if args.since and (
+        args.serve
+        or args.watch
+        or args.shard
+        or args.max_memory
+        or args.diff
+        or args.sample
+        or args.plan
+    ):
+        raise ValueError(
+            "--since cannot be combined with --serve, --watch, --shard, "
+            "--max-memory, --diff, --sample, or --plan"
+        )
+    if args.telemetry and (args.serve or args.watch):
+        raise ValueError("--telemetry cannot be combined with --serve or --watch")
+    if args.notes and (args.max_memory or args.shard or args.paths):
+        raise ValueError(
+            "--notes cannot be combined with --max-memory, --shard, or --path"
+        )
     return args
 
 
+def parse_cache_args(argv=None) -> CacheArgs:
+    parser = argparse.ArgumentParser(
+        prog="git-authorship cache",
+        description="Inspects and maintains the cache of computed authorship",
+    )
+    parser.add_argument(
+        "action",
+        choices=["stats", "prune", "verify", "export", "import"],
+        help=(
+            "Show cache usage, evict entries, check that entries are readable, "
+            "or export/import entries to/from a portable bundle"
+        ),
+    )
+    parser.add_argument(
+        "bundle",
+        nargs="?",
+        default=None,
+        help="export/import: The path to the bundle (e.g. authorship-cache.json.gz)",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        nargs="?",
+        default="./build",
+        help="The directory the reports (and cache) are output to",
+    )
+    parser.add_argument(
+        "--max-size",
+        metavar="MB",
+        type=int,
+        default=None,
+        help="prune: Evict least recently used entries until the cache fits in MB",
+    )
+    parser.add_argument(
+        "--max-age",
+        metavar="DAYS",
+        type=float,
+        default=None,
+        help="prune: Evict entries unused for DAYS",
+    )
+    parser.add_argument(
+        "--fix",
+        action="store_true",
+        help="verify: Remove entries which fail verification",
+    )
+    parser.add_argument(
+        "--compress",
+        choices=list(COMPRESSIONS),
+        default=None,
+        help="import: Compress the imported entries",
+    )
+    parser.add_argument(
+        "--revision",
+        action="append",
+        default=None,
+        help="export/import: Only the results for the given revision (repeatable)",
+    )
+
+    args = parser.parse_args(argv)
+    if args.action in ["export", "import"] and not args.bundle:
+        parser.error(f"{args.action} requires the path to a bundle")
+
+    return CacheArgs(
+        action=args.action,
+        output=Path(args.output),
+        max_size=args.max_size,
+        max_age=args.max_age,
+        fix=args.fix,
+        compress=args.compress,
+        bundle=Path(args.bundle) if args.bundle else None,
+        revisions=args.revision,
+    )
+
+
+def parse_query_args(argv=None) -> QueryArgs:
+    parser = argparse.ArgumentParser(
+        prog="git-authorship query",
+        description="Lists the paths an author/license contributed the most lines to, "
+        "using the index saved by an --index run",
+    )
+    parser.add_argument("--author", default=None, help="Only count lines by AUTHOR")
+    parser.add_argument(
+        "--license", default=None, help="Only count lines under LICENSE"
+    )
+    parser.add_argument(
+        "-n",
+        "--limit",
+        type=int,
+        default=10,
+        help="The number of paths to list",
+    )
+    parser.add_argument(
+        "--folders",
+        action="store_true",
+        help="List folders instead of files",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        nargs="?",
+        default="./build",
+        help="The directory the reports (and index) are output to",
+    )
+
+    args = parser.parse_args(argv)
+    if not args.author and not args.license:
+        parser.error("query requires an --author and/or a --license")
+
+    return QueryArgs(
+        output=Path(args.output),
+        author=args.author,
+        license=args.license,
+        limit=args.limit,
+        folders=args.folders,
+    )
+
+
+def parse_merge_args(argv=None) -> MergeArgs:
+    parser = argparse.ArgumentParser(
+        prog="git-authorship merge",
+        description="Combines the partial results of a --shard run into full reports",
+    )
+    parser.add_argument(
+        "partials", nargs="+", help="The partial results of every shard of one run"
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        nargs="?",
+        default="./build",
+        help="The directory to output the reports",
+    )
+    parser.add_argument(
+        "--author-licenses",
+        nargs="?",
+        default=None,
+        help="The path to a CSV file containing author licenses (Columns: author,license)",
+    )
+    parser.add_argument(
+        "--pseudonyms",
+        nargs="?",
+        default=None,
+        help="The path to a CSV file containing pseudonyms (Columns: path,author,license)",
+    )
+    parser.add_argument(
+        "--aliases",
+        nargs="?",
+        default=None,
+        help="The path to a CSV file merging author identities (Columns: alias,author)",
+    )
+
+    args = parser.parse_args(argv)
+
+    return MergeArgs(
+        partials=[_parse_partial_path(p) for p in args.partials],
+        output=Path(args.output),
+        author_licenses=_parse_file_path(args.author_licenses, "--author-licenses"),
+        pseudonyms=_parse_file_path(args.pseudonyms, "--pseudonyms"),
+        aliases=_parse_file_path(args.aliases, "--aliases"),
+    )
+
+
 def _parse_file_path(arg: Optional[str] = None, optname: str = "") -> Optional[Path]:
     if not arg:
         return None
@@ -137,6 +672,19 @@ def _parse_file_path(arg: Optional[str] = None, optname: str = "") -> Optional[P
             return Path(arg)
 
 
+def _parse_revision_range(arg: str) -> Tuple[str, str]:
+    old, sep, new = arg.partition("..")
+    if not (sep and old and new):
+        raise ValueError(f"--diff must be given as OLD..NEW. Given: {arg}")
+    return old, new
+
+
+def _parse_partial_path(arg: str) -> Path:
+    if (path := _parse_file_path(arg, "partials")) is None:
+        raise ValueError("partials cannot be empty")
+    return path
+
+
 def clone_and_checkout(args: Args):
     log.info(
         f"Cloning {args.location} @ {args.branch or '<default>'} to {args.clone_to}"
@@ -150,15 +698,24 @@ def clone_and_checkout(args: Args):
 
     repo = Repo(args.clone_to)
 
+    if args.notes:
+        bundle.fetch_notes(repo)
+
     if args.branch:
         repo.git.checkout(args.branch)
 
+    if args.submodules:
+        repo.git.submodule("update", "--init", "--recursive")
+
     return repo
 
 
 def run(args: Union[Args, Iterable[str]]):
     if isinstance(args, Iterable):
-        args = parse_args(args)
+        argv = list(args)
+        if argv and argv[0] in COMMANDS:
+            return COMMANDS[argv[0]](argv[1:])
+        args = parse_args(argv)
 
     if args.show_version:
         lines = [
@@ -168,25 +725,401 @@ def run(args: Union[Args, Iterable[str]]):
         ]
         print("\n".join(lines))
     else:
+        with telemetry.collecting() if args.telemetry else nullcontext() as collected:
+            _run_analysis(args)
+        if collected is not None:
+            args.output.mkdir(exist_ok=True, parents=True)
+            collected.as_textfile(args.output / "authorship.telemetry.prom")
+            collected.as_json(args.output / "authorship.telemetry.json")
+
+
+def _run_analysis(args: Args):
+    with telemetry.phase("clone"):
         repo = clone_and_checkout(args)
-        licenses = load_licenses_config(args.author_licenses)
-        pseudonyms = load_pseudonyms_config(args.pseudonyms)
-        repo_authorship = authorship.for_repo(
+    if args.prepare:
+        with telemetry.phase("prepare"):
+            _prepare(repo, args)
+    licenses = load_licenses_config(args.author_licenses)
+    pseudonyms = load_pseudonyms_config(args.pseudonyms)
+    aliases = load_aliases_config(args.aliases)
+    if args.plan:
+        _run_plan(repo, args, pseudonyms)
+    elif args.sample:
+        _run_sample(repo, args, licenses, pseudonyms, aliases)
+    elif args.diff:
+        _run_diff(repo, args, licenses, pseudonyms, aliases)
+    elif args.shard:
+        _run_shard(repo, args)
+    elif args.max_memory:
+        _run_bounded(repo, args, licenses, pseudonyms, aliases)
+    elif args.serve or args.watch:
+        _run_service(repo, args, licenses, pseudonyms, aliases)
+    else:
+        with telemetry.phase("authorship"):
+            repo_authorship = authorship.for_repo(
+                repo,
+                licenses=licenses,
+                pseudonyms=pseudonyms,
+                aliases=aliases,
+                ignore_revs_file=args.ignore_revs_file,
+                ignore_extensions=args.ignore_extensions,
+                cache_dir=args.output / "cache",
+                use_cache=args.use_cache,
+                cache_compression=args.compress,
+                paths=args.paths,
+                use_notes=args.notes,
+                collect_metrics=args.metrics,
+                submodules=args.submodules,
+                classify_files=args.classify,
+                since=args.since,
+            )
+            if args.update:
+                assert args.paths
+                ext = compression_extension(args.compress)
+                repo_authorship = authorship.update_subtrees(
+                    _read_report(args.output / f"authorship.json{ext}"),
+                    repo_authorship,
+                    args.paths,
+                )
+        with telemetry.phase("export"):
+            _export(repo_authorship, args.output, args.compress)
+            if args.index:
+                index.build(repo_authorship.items(), args.output / index.INDEX_FILENAME)
+
+    if args.cache_max_size is not None or args.cache_max_age is not None:
+        cache = Cache(args.output / "cache", args.compress)
+        _prune_cache(cache, args.cache_max_size, args.cache_max_age)
+
+
+def _run_service(
+    repo: Repo,
+    args: Args,
+    licenses: Config.AuthorLicenses,
+    pseudonyms: Config.Pseudonyms,
+    aliases: Config.Aliases,
+):
+    service = AuthorshipService(
+        repo,
+        licenses=licenses,
+        pseudonyms=pseudonyms,
+        aliases=aliases,
+        ignore_revs_file=args.ignore_revs_file,
+        ignore_extensions=args.ignore_extensions,
+        cache_dir=args.output / "cache",
+        use_cache=args.use_cache,
+        cache_compression=args.compress,
+        collect_metrics=args.metrics,
+    )
+    if args.serve:
+        server.serve(service, args.serve)
+    else:
+        watch.watch(
+            repo,
+            service,
+            lambda repo_authorship: _export(
+                repo_authorship, args.output, args.compress
+            ),
+            branch=args.branch,
+            interval=args.watch_interval,
+            debounce=args.debounce,
+            config=lambda: (
+                load_licenses_config(args.author_licenses),
+                load_pseudonyms_config(args.pseudonyms),
+            ),
+            prepare_repo=args.prepare,
+        )
+
+
+def _run_bounded(
+    repo: Repo,
+    args: Args,
+    licenses: Config.AuthorLicenses,
+    pseudonyms: Config.Pseudonyms,
+    aliases: Config.Aliases,
+):
+    assert args.max_memory
+    with telemetry.phase("authorship"):
+        spilled = authorship.for_repo_bounded(
             repo,
             licenses=licenses,
             pseudonyms=pseudonyms,
+            aliases=aliases,
             ignore_revs_file=args.ignore_revs_file,
             ignore_extensions=args.ignore_extensions,
             cache_dir=args.output / "cache",
             use_cache=args.use_cache,
+            cache_compression=args.compress,
+            max_memory=args.max_memory * 1024 * 1024,
+            collect_metrics=args.metrics,
+        )
+    # Files are augmented and rolled up while streaming the reports (in one pass)
+    with telemetry.phase("export"), ExitStack() as stack:
+        nodes: Iterable[Tuple[Path, Authorship]] = spilled
+        if args.index:
+            add = stack.enter_context(index.builder(args.output / index.INDEX_FILENAME))
+            nodes = _tap(nodes, add)
+        export.as_reports_stream(
+            nodes, args.output, compression=args.compress, metrics=args.metrics
         )
-        export.as_treemap(repo_authorship, output=args.output / "authorship.html")
-        export.as_json(repo_authorship, output=args.output / "authorship.json")
-        export.as_csv(repo_authorship, output=args.output / "authorship.csv")
+
+
+def _tap(
+    nodes: Iterable[Tuple[Path, Authorship]], add: Callable[[Path, Authorship], None]
+) -> Iterator[Tuple[Path, Authorship]]:
+    for path, authors in nodes:
+        add(path, authors)
+        yield path, authors
+
+
+def _run_diff(
+    repo: Repo,
+    args: Args,
+    licenses: Config.AuthorLicenses,
+    pseudonyms: Config.Pseudonyms,
+    aliases: Config.Aliases,
+):
+    assert args.diff
+    old_rev, new_rev = args.diff
+    log.info(f"Comparing authorship between {old_rev} and {new_rev}")
+    delta = authorship.for_revisions(
+        repo,
+        old_rev,
+        new_rev,
+        licenses=licenses,
+        pseudonyms=pseudonyms,
+        aliases=aliases,
+        ignore_revs_file=args.ignore_revs_file,
+        ignore_extensions=args.ignore_extensions,
+        cache_dir=args.output / "cache",
+        use_cache=args.use_cache,
+        cache_compression=args.compress,
+    )
+    args.output.mkdir(exist_ok=True, parents=True)
+    ext = compression_extension(args.compress)
+    export.as_delta_json(delta, output=args.output / f"authorship.diff.json{ext}")
+    export.as_delta_csv(delta, output=args.output / f"authorship.diff.csv{ext}")
+
+
+def _run_sample(
+    repo: Repo,
+    args: Args,
+    licenses: Config.AuthorLicenses,
+    pseudonyms: Config.Pseudonyms,
+    aliases: Config.Aliases,
+):
+    assert args.sample
+    estimate = authorship.for_repo_sample(
+        repo,
+        sample_size=args.sample,
+        seed=args.sample_seed,
+        licenses=licenses,
+        pseudonyms=pseudonyms,
+        aliases=aliases,
+        ignore_revs_file=args.ignore_revs_file,
+        ignore_extensions=args.ignore_extensions,
+    )
+    args.output.mkdir(exist_ok=True, parents=True)
+    ext = compression_extension(args.compress)
+    export.as_estimate_json(
+        estimate,
+        output=args.output / f"authorship.estimate.json{ext}",
+        confidence=sample.DEFAULT_CONFIDENCE,
+    )
+    export.as_estimate_csv(
+        estimate, output=args.output / f"authorship.estimate.csv{ext}"
+    )
+
+
+def _run_plan(repo: Repo, args: Args, pseudonyms: Config.Pseudonyms):
+    repo_plan = plan.for_repo(
+        repo,
+        pseudonyms=pseudonyms,
+        ignore_extensions=args.ignore_extensions,
+        paths=args.paths,
+        timings=plan.Timings(args.output / "cache" / plan.TIMINGS_FILENAME),
+    )
+    args.output.mkdir(exist_ok=True, parents=True)
+    ext = compression_extension(args.compress)
+    export.as_plan_csv(repo_plan, output=args.output / f"authorship.plan.csv{ext}")
+
+    discarded = [f for f in repo_plan.files if f.discarded]
+    calibration = (
+        f"calibrated with {repo_plan.calibrated_from} timed files"
+        if repo_plan.calibrated_from
+        else "uncalibrated, no earlier run has been timed"
+    )
+    lines = [
+        f"Estimated blame time: {_duration(repo_plan.seconds)} ({calibration})",
+        f"Files: {len(repo_plan.files)} "
+        f"({len(discarded)} discarded by ignored extensions or pseudonyms, "
+        f"{_duration(sum(f.seconds for f in discarded))})",
+        "Most expensive folders:",
+        *(
+            f"  {_duration(seconds):>9}  {path}"
+            for path, seconds in list(repo_plan.folders().items())[:PLAN_TOP]
+        ),
+        "Most expensive files:",
+        *(
+            f"  {_duration(f.seconds):>9}  {f.path}"
+            f"{'  (discarded)' if f.discarded else ''}"
+            for f in repo_plan.files[:PLAN_TOP]
+        ),
+    ]
+    print("\n".join(lines))
+
+
+def _prepare(repo: Repo, args: Args):
+    prepared = prepare.prepare(
+        repo,
+        lambda path: authorship.for_file(
+            repo, path, ignore_revs_file=args.ignore_revs_file
+        ),
+    )
+    if prepared.blame_before is None or prepared.blame_after is None:
+        return
+    done = [
+        *(["commit-graph written"] if prepared.commit_graph else []),
+        *(["objects repacked"] if prepared.repacked else []),
+    ]
+    speedup = prepared.blame_before / max(prepared.blame_after, 1e-9)
+    lines = [
+        f"Prepared repo in {_duration(prepared.seconds)} ({', '.join(done)})",
+        f"Blame of {prepared.files} sampled files: "
+        f"{_duration(prepared.blame_before)} before, "
+        f"{_duration(prepared.blame_after)} after ({speedup:.1f}x)",
+    ]
+    print("\n".join(lines))
+
+
+def _run_shard(repo: Repo, args: Args):
+    assert args.shard
+    repo_authorship = authorship.for_shard(
+        repo,
+        args.shard,
+        strategy=args.shard_strategy,
+        ignore_revs_file=args.ignore_revs_file,
+    )
+    args.output.mkdir(exist_ok=True, parents=True)
+    shard.write_partial(
+        repo_authorship,
+        args.output / args.shard.filename,
+        revision=repo.head.commit.hexsha,
+        shard=args.shard,
+        strategy=args.shard_strategy,
+        ignore_revs_file=args.ignore_revs_file,
+    )
+
+
+def run_merge(args: Union[MergeArgs, Iterable[str]]):
+    if isinstance(args, Iterable):
+        args = parse_merge_args(args)
+
+    revision, data = shard.merge_partials(args.partials)
+    log.info(f"Merged {len(args.partials)} shard(s) @ {revision}")
+    repo_authorship = authorship._augment(
+        None,
+        data,
+        licenses=load_licenses_config(args.author_licenses),
+        pseudonyms=load_pseudonyms_config(args.pseudonyms),
+        aliases=load_aliases_config(args.aliases),
+        ignore_extensions=args.ignore_extensions,
+    )
+    args.output.mkdir(exist_ok=True, parents=True)
+    _export(repo_authorship, args.output)
+
+
+def run_cache(args: Union[CacheArgs, Iterable[str]]):
+    if isinstance(args, Iterable):
+        args = parse_cache_args(args)
+
+    cache = Cache(args.output / "cache", args.compress)
+    if args.action == "stats":
+        stats = cache.stats()
+        lines = [
+            f"Entries: {stats.entries}",
+            f"Size: {stats.size / 1024 / 1024:.1f} MB",
+            f"Least recently used: {_timestamp(stats.oldest)}",
+            f"Most recently used: {_timestamp(stats.newest)}",
+        ]
+        print("\n".join(lines))
+    elif args.action == "prune":
+        removed = _prune_cache(cache, args.max_size, args.max_age)
+        print(f"Removed {len(removed)} entries")
+    elif args.action == "verify":
+        problems = cache.verify(fix=args.fix)
+        for path, problem in problems:
+            print(f"{path}: {problem}")
+        print(f"{len(problems)} invalid entries{' removed' if args.fix else ''}")
+    elif args.action == "export":
+        assert args.bundle
+        keys = bundle.export_bundle(cache, args.bundle, args.revisions)
+        print(f"Exported {len(keys)} entries to {args.bundle}")
+    elif args.action == "import":
+        assert args.bundle
+        keys = bundle.import_bundle(cache, args.bundle, args.revisions)
+        print(f"Imported {len(keys)} entries from {args.bundle}")
+
+
+def run_query(args: Union[QueryArgs, Iterable[str]]):
+    if isinstance(args, Iterable):
+        args = parse_query_args(args)
+
+    paths = index.top_paths(
+        args.output / index.INDEX_FILENAME,
+        author=args.author,
+        license=args.license,
+        limit=args.limit,
+        folders=args.folders,
+    )
+    for path, lines in paths:
+        print(f"{lines}\t{path}")
+
+
+def _prune_cache(
+    cache: Cache, max_size: Optional[int], max_age: Optional[float]
+) -> List[Path]:
+    return cache.prune(
+        max_size=max_size * 1024 * 1024 if max_size is not None else None,
+        max_age=max_age * 24 * 60 * 60 if max_age is not None else None,
+    )
+
+
+def _duration(seconds: float) -> str:
+    """e.g. `1h 02m`, `3m 20s`, `4.2s`"""
+    if seconds < 60:
+        return f"{seconds:.1f}s"
+    minutes, seconds = divmod(round(seconds), 60)
+    if minutes < 60:
+        return f"{minutes}m {seconds:02d}s"
+    return f"{minutes // 60}h {minutes % 60:02d}m"
+
+
+def _timestamp(timestamp: Optional[float]) -> str:
+    return datetime.fromtimestamp(timestamp).isoformat() if timestamp else "-"
+
+
+COMMANDS: Dict[str, Callable[[List[str]], None]] = {
+    "merge": run_merge,
+    "cache": run_cache,
+    "query": run_query,
+}
+
+
+def _read_report(path: Path) -> RepoAuthorship:
+    if not path.is_file():
+        raise FileNotFoundError(f"--update requires an existing report. Given: {path}")
+    with io_handle(path, "r") as f:
+        return {Path(k): v for k, v in json.load(f).items()}
+
+
+def _export(
+    repo_authorship: RepoAuthorship, output: Path, compress: Optional[str] = None
+):
+    export.as_reports(repo_authorship, output, compression=compress)
 
 
 def main(argv=None):
     logging.getLogger("git_authorship").addHandler(logging.StreamHandler())
     logging.getLogger("git_authorship").setLevel(logging.INFO)
 
-    run(parse_args(argv))
+    run(sys.argv[1:] if argv is None else argv)
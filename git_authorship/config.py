@@ -7,6 +7,7 @@ from typing import Tuple
 from ._types import Author
 from ._types import Config
 from ._types import License
+from git_authorship.exceptions import AliasesConfigException
 from git_authorship.exceptions import AuthorLicensesConfigException
 from git_authorship.exceptions import PseudonymsConfigException
 
@@ -50,4 +51,22 @@ def load_pseudonyms_config(path: Optional[Path] = None) -> Config.Pseudonyms:
         return {}
 
 
-__all__ = ["load_licenses_config", "load_pseudonyms_config"]
+def _aliases_reader(path: Path) -> Iterable[Tuple[Author, Author]]:
+    with open(path, "r") as f:
+        reader = csv.reader(f)
+        for idx, row in enumerate(reader):
+            if (count := len(row)) != 2:
+                raise AliasesConfigException(
+                    f"Two (2) columns expected, but {path} @ line {idx} has {count} column(s)"
+                )
+            yield row[0], row[1]
+
+
+def load_aliases_config(path: Optional[Path] = None) -> Config.Aliases:
+    if path:
+        return {alias: author for alias, author in _aliases_reader(path)}
+    else:
+        return {}
+
+
+__all__ = ["load_licenses_config", "load_pseudonyms_config", "load_aliases_config"]
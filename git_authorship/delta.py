@@ -0,0 +1,55 @@
+# Copyright (c) 2025 Joseph Hale
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+from typing import Dict
+
+from ._git import path_order
+from ._types import LineChange
+from ._types import LineCount
+from ._types import RepoAuthorship
+from ._types import RepoAuthorshipDelta
+from .tally import by_author
+from .tally import by_license
+
+
+def between(before: RepoAuthorship, after: RepoAuthorship) -> RepoAuthorshipDelta:
+    """
+    The change in lines per author and per license of every file/folder whose
+    authorship differs between two (augmented) repo authorships. Files/folders which
+    only exist on one side count as zero lines on the other.
+
+    e.g.
+    ```
+    {
+      "src/app.py": {
+        "authors": {"author1": {"before": 10, "after": 4, "delta": -6}, ...},
+        "licenses": {"MIT": {"before": 10, "after": 4, "delta": -6}, ...},
+      },
+      ...
+    }
+    ```
+    """
+    result: RepoAuthorshipDelta = {}
+    for path in sorted({*before, *after}, key=path_order):
+        old, new = before.get(path, {}), after.get(path, {})
+        authors = _changes(by_author(old), by_author(new))
+        licenses = _changes(by_license(old), by_license(new))
+        if authors or licenses:
+            result[path] = {"authors": authors, "licenses": licenses}
+    return result
+
+
+def _changes(
+    before: Dict[str, LineCount], after: Dict[str, LineCount]
+) -> Dict[str, LineChange]:
+    changes = {}
+    for key in sorted({*before, *after}):
+        old, new = before.get(key, 0), after.get(key, 0)
+        if old != new:
+            changes[key] = LineChange(before=old, after=new, delta=new - old)
+    return changes
+
+
+__all__ = ["between"]
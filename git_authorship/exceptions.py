@@ -12,3 +12,15 @@ class AuthorLicensesConfigException(ConfigException):
 
 class PseudonymsConfigException(ConfigException):
     """Thrown for malformed pseudonyms configs"""
+
+
+class AliasesConfigException(ConfigException):
+    """Thrown for malformed aliases configs"""
+
+
+class ShardException(GitAuthorshipException):
+    """Thrown for missing or mismatched shard results"""
+
+
+class BundleException(GitAuthorshipException):
+    """Thrown for cache bundles which fail verification"""
@@ -6,19 +6,153 @@
 import csv
 import json
 from collections import defaultdict
+from contextlib import contextmanager
+from contextlib import ExitStack
+from datetime import datetime
+from datetime import timezone
 from pathlib import Path
+from typing import Any
+from typing import Callable
 from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Sequence
+from typing import Set
+from typing import Tuple
 
 import plotly.graph_objects as go
 
+from . import telemetry
+from ._pathutils import compression_extension
 from ._pathutils import io_handle
 from ._pathutils import Writeable
+from ._types import Author
 from ._types import Authorship
+from ._types import AuthorshipInfo
+from ._types import FilePath
+from ._types import License
+from ._types import LineCount
 from ._types import RepoAuthorship
+from ._types import RepoAuthorshipDelta
+from ._types import RepoAuthorshipEstimate
+from ._types import Timestamp
+from .metrics import AGE_LABELS
+from .plan import Plan
 
+FORMATS = ["html", "json", "csv"]
 
+NodeWriter = Callable[[FilePath, Authorship], None]
+"""Writes one file/folder of a streamed export"""
+
+
+class Summary(NamedTuple):
+    """Per-file/folder values shared by the exporters, so each is computed once"""
+
+    lines: List[LineCount]
+    """Total lines of each file/folder (in the order of the authorship)"""
+    authors: List[List[Tuple[Author, AuthorshipInfo]]]
+    """Authors of each file/folder, most lines first"""
+    licenses: List[Dict[License, LineCount]]
+    """Lines per license of each file/folder"""
+    order: List[int]
+    """Indices of the files/folders, sorted by path"""
+    metrics: bool
+    """Whether the authorship includes `--metrics`"""
+
+
+def summarize(authorship: RepoAuthorship) -> Summary:
+    lines, authors, licenses = [], [], []
+    has_metrics = False
+    for authors_info in authorship.values():
+        licensing: Dict[License, LineCount] = defaultdict(int)
+        for info in authors_info.values():
+            licensing[info.get("license", "Unknown")] += info["lines"]
+            has_metrics = has_metrics or "first_authored" in info
+        lines.append(sum(licensing.values()))
+        authors.append(
+            sorted(authors_info.items(), key=lambda x: x[1]["lines"], reverse=True)
+        )
+        licenses.append(licensing)
+    paths = list(authorship.keys())
+    order = sorted(range(len(paths)), key=paths.__getitem__)
+    return Summary(lines, authors, licenses, order, has_metrics)
+
+
+def as_reports(
+    authorship: RepoAuthorship,
+    output: Path = Path("build"),
+    formats: Sequence[str] = FORMATS,
+    compression: Optional[str] = None,
+):
+    """
+    Exports the authorship in each of the given formats (as `authorship.<format>` in
+    the `output` folder, compressed with `compression` if any). The exports share
+    one `summarize` of the authorship.
+    """
+    summary = summarize(authorship)
+    ext = compression_extension(compression)
+    paths = {format: output / f"authorship.{format}{ext}" for format in FORMATS}
+    writers: Dict[str, Callable[[], None]] = {
+        "html": lambda: as_treemap(authorship, paths["html"], summary),
+        "json": lambda: as_json(authorship, paths["json"]),
+        "csv": lambda: as_csv(authorship, paths["csv"], summary),
+    }
+    for format in formats:
+        writers[format]()
+
+
+def as_reports_stream(
+    nodes: Iterable[Tuple[FilePath, Authorship]],
+    output: Path = Path("build"),
+    formats: Sequence[str] = FORMATS,
+    compression: Optional[str] = None,
+    metrics: bool = False,
+):
+    """
+    Streaming equivalent of `as_reports`, for nodes given with each folder following
+    its contents (e.g. a `SpilledRepoAuthorship`). The nodes are read once, and each
+    is written to every format as it arrives. Only the folders are kept (for the
+    treemap, which is written last and only shows folders).
+    """
+    ext = compression_extension(compression)
+    paths = {format: output / f"authorship.{format}{ext}" for format in FORMATS}
+    with ExitStack() as stack:
+        writers: List[NodeWriter] = []
+        if "json" in formats:
+            writers.append(stack.enter_context(_json_writer(paths["json"])))
+        if "csv" in formats:
+            writers.append(stack.enter_context(_csv_writer(paths["csv"], metrics)))
+        parents: Set[FilePath] = set()
+        folders: RepoAuthorship = {}
+        for path, authors in nodes:
+            for write in writers:
+                write(path, authors)
+            if "html" in formats:
+                # (A folder is the parent of a node already seen)
+                if path in parents:
+                    parents.discard(path)
+                    folders[path] = authors
+                if str(path) != ".":
+                    parents.add(path.parent)
+    for format in ["json", "csv"]:
+        if format in formats:
+            telemetry.add_file_size(
+                "export_written_bytes_total",
+                paths[format],
+                exporter=f"as_{format}_stream",
+            )
+    if "html" in formats:
+        as_treemap(folders, paths["html"])
+
+
+@telemetry.exporter
 def as_treemap(
-    authorship: RepoAuthorship, output: Writeable = Path("build/authorship.html")
+    authorship: RepoAuthorship,
+    output: Writeable = Path("build/authorship.html"),
+    summary: Optional[Summary] = None,
 ):
     """
     Exports the authorship as an interactive treemap (in an HTML file)
@@ -27,33 +161,29 @@ def as_treemap(
         authorship (RepoAuthorship): The authorship to export
         output (Union[PathLike, IO]): The output file path or handle.
             If a path, it will be open and closed. Handles are left open.
+        summary (Summary): The `summarize`d authorship, if already computed
     """
+    summary = summary or summarize(authorship)
     ids = [str(file) for file in authorship.keys()]
     parents = [
         str(file.parent) if str(file) != "." else "" for file in authorship.keys()
     ]
-    values = [
-        sum(info["lines"] for info in authors.values())
-        for authors in authorship.values()
-    ]
+    values = summary.lines
     labels = [file.name for file in authorship.keys()]
 
-    def author_list(authorship: Authorship):
+    def author_list(authors: List[Tuple[Author, AuthorshipInfo]]):
         return "<br>Authors:<br> - " + "<br> - ".join(
-            f"{author}: {info['lines']}" for author, info in authorship.items()
+            f"{author}: {info['lines']}" for author, info in authors
         )
 
-    def license_list(authorship: Authorship):
-        licensing: Dict[str, int] = defaultdict(int)
-        for _, info in authorship.items():
-            licensing[info.get("license", "Unknown")] += info["lines"]
+    def license_list(licensing: Dict[License, LineCount]):
         return "<br>Licenses:<br> - " + "<br> - ".join(
             f"{license}: {lines}" for license, lines in licensing.items()
         )
 
     descriptions = [
-        f"{author_list(authorship)}<br>{license_list(authorship)}"
-        for authorship in authorship.values()
+        f"{author_list(authors)}<br>{license_list(licensing)}"
+        for authors, licensing in zip(summary.authors, summary.licenses)
     ]
 
     fig = go.Figure(
@@ -71,9 +201,11 @@ def as_treemap(
     )
 
     fig.update_layout(margin=dict(t=50, l=25, r=25, b=25))
-    fig.write_html(output)
+    with io_handle(output) as f:
+        fig.write_html(f)
 
 
+@telemetry.exporter
 def as_json(
     authorship: RepoAuthorship, output: Writeable = Path("build/authorship.json")
 ):
@@ -86,11 +218,14 @@ def as_json(
             If a path, it will be open and closed. Handles are left open.
     """
     with io_handle(output) as f:
-        json.dump({str(path): authors for path, authors in authorship.items()}, f)
+        f.write(json.dumps({str(path): a for path, a in authorship.items()}))
 
 
+@telemetry.exporter
 def as_csv(
-    authorship: RepoAuthorship, output: Writeable = Path("build/authorship.csv")
+    authorship: RepoAuthorship,
+    output: Writeable = Path("build/authorship.csv"),
+    summary: Optional[Summary] = None,
 ):
     """
     Exports the authorship in CSV format
@@ -99,15 +234,272 @@ def as_csv(
         authorship (RepoAuthorship): The authorship to export
         output (Union[PathLike, IO]): The output file path or handle.
             If a path, it will be open and closed. Handles are left open.
+        summary (Summary): The `summarize`d authorship, if already computed
     """
+    summary = summary or summarize(authorship)
+    paths = list(authorship.keys())
+    extra = _metric_columns if summary.metrics else lambda info: []
     with io_handle(output) as f:
         writer = csv.writer(f)
-        writer.writerow(["path", "author", "lines", "license"])
-        for path, authors in sorted(authorship.items(), key=lambda x: x[0]):
+        writer.writerow(_csv_header(summary.metrics))
+        writer.writerows(
+            [paths[idx], author, info["lines"], info.get("license"), *extra(info)]
+            for idx in summary.order
+            for author, info in summary.authors[idx]
+        )
+
+
+@telemetry.exporter
+def as_json_stream(
+    nodes: Iterable[Tuple[FilePath, Authorship]],
+    output: Writeable = Path("build/authorship.json"),
+):
+    """
+    Exports the authorship in JSON format, one file/folder at a time (i.e. without
+    holding the whole authorship in memory). Files/folders are written in the order
+    given.
+
+    Args:
+        nodes (Iterable[Tuple[FilePath, Authorship]]): The authorship to export
+        output (Union[PathLike, IO]): The output file path or handle.
+            If a path, it will be open and closed. Handles are left open.
+    """
+    with _json_writer(output) as write:
+        for path, authors in nodes:
+            write(path, authors)
+
+
+@telemetry.exporter
+def as_csv_stream(
+    nodes: Iterable[Tuple[FilePath, Authorship]],
+    output: Writeable = Path("build/authorship.csv"),
+    metrics: bool = False,
+):
+    """
+    Exports the authorship in CSV format, one file/folder at a time (i.e. without
+    holding the whole authorship in memory). Files/folders are written in the order
+    given.
+
+    Args:
+        nodes (Iterable[Tuple[FilePath, Authorship]]): The authorship to export
+        output (Union[PathLike, IO]): The output file path or handle.
+            If a path, it will be open and closed. Handles are left open.
+        metrics (bool): Whether to include the `--metrics` columns
+    """
+    with _csv_writer(output, metrics) as write:
+        for path, authors in nodes:
+            write(path, authors)
+
+
+@contextmanager
+def _json_writer(output: Writeable) -> Iterator[NodeWriter]:
+    with io_handle(output) as f:
+        f.write("{")
+        separator = ""
+
+        def write(path: FilePath, authors: Authorship):
+            nonlocal separator
+            f.write(f"{separator}{json.dumps(str(path))}: ")
+            json.dump(authors, f)
+            separator = ", "
+
+        yield write
+        f.write("}")
+
+
+@contextmanager
+def _csv_writer(output: Writeable, metrics: bool) -> Iterator[NodeWriter]:
+    extra = _metric_columns if metrics else lambda info: []
+    with io_handle(output) as f:
+        writer = csv.writer(f)
+        writer.writerow(_csv_header(metrics))
+
+        def write(path: FilePath, authors: Authorship):
             for author, info in sorted(
                 authors.items(), key=lambda x: x[1]["lines"], reverse=True
             ):
-                writer.writerow([path, author, info["lines"], info.get("license")])
+                row = [path, author, info["lines"], info.get("license")]
+                writer.writerow([*row, *extra(info)])
+
+        yield write
+
+
+def _csv_header(metrics: bool) -> List[str]:
+    header = ["path", "author", "lines", "license"]
+    if metrics:
+        header += ["first_authored", "last_authored", "last_committed", "commits"]
+        header += [f"lines_aged_{label}" for label in AGE_LABELS]
+    return header
+
+
+def _metric_columns(info: AuthorshipInfo) -> List[Any]:
+    ages = info.get("ages", {})
+    return [
+        _isoformat(info.get("first_authored")),
+        _isoformat(info.get("last_authored")),
+        _isoformat(info.get("last_committed")),
+        info.get("commits"),
+        *(ages.get(label, 0) for label in AGE_LABELS),
+    ]
+
+
+def _isoformat(timestamp: Optional[Timestamp]) -> Optional[str]:
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+@telemetry.exporter
+def as_delta_json(
+    delta: RepoAuthorshipDelta, output: Writeable = Path("build/authorship.diff.json")
+):
+    """
+    Exports the change in authorship between two revisions in JSON format
+
+    Args:
+        delta (RepoAuthorshipDelta): The change in authorship to export
+        output (Union[PathLike, IO]): The output file path or handle.
+            If a path, it will be open and closed. Handles are left open.
+    """
+    with io_handle(output) as f:
+        json.dump({str(path): changes for path, changes in delta.items()}, f)
+
+
+@telemetry.exporter
+def as_delta_csv(
+    delta: RepoAuthorshipDelta, output: Writeable = Path("build/authorship.diff.csv")
+):
+    """
+    Exports the change in authorship between two revisions in CSV format
+
+    Args:
+        delta (RepoAuthorshipDelta): The change in authorship to export
+        output (Union[PathLike, IO]): The output file path or handle.
+            If a path, it will be open and closed. Handles are left open.
+    """
+    with io_handle(output) as f:
+        writer = csv.writer(f)
+        writer.writerow(["path", "kind", "name", "before", "after", "delta"])
+        for path, changes in delta.items():
+            for kind, by_kind in [
+                ("author", changes["authors"]),
+                ("license", changes["licenses"]),
+            ]:
+                for name, change in by_kind.items():
+                    row = [change["before"], change["after"], change["delta"]]
+                    writer.writerow([path, kind, name, *row])
+
+
+@telemetry.exporter
+def as_estimate_json(
+    estimate: RepoAuthorshipEstimate,
+    output: Writeable = Path("build/authorship.estimate.json"),
+    *,
+    confidence: float,
+):
+    """
+    Exports the estimated (sampled) authorship in JSON format. The values are marked
+    as estimates, along with the confidence of their intervals.
+
+    Args:
+        estimate (RepoAuthorshipEstimate): The estimated authorship to export
+        output (Union[PathLike, IO]): The output file path or handle.
+            If a path, it will be open and closed. Handles are left open.
+        confidence (float): The confidence level of the intervals (e.g. 0.95)
+    """
+    with io_handle(output) as f:
+        json.dump(
+            {
+                "estimate": True,
+                "confidence": confidence,
+                "authorship": {str(path): e for path, e in estimate.items()},
+            },
+            f,
+        )
+
+
+@telemetry.exporter
+def as_estimate_csv(
+    estimate: RepoAuthorshipEstimate,
+    output: Writeable = Path("build/authorship.estimate.csv"),
+):
+    """
+    Exports the estimated (sampled) authorship in CSV format. Every value column is
+    marked as an estimate.
+
+    Args:
+        estimate (RepoAuthorshipEstimate): The estimated authorship to export
+        output (Union[PathLike, IO]): The output file path or handle.
+            If a path, it will be open and closed. Handles are left open.
+    """
+    with io_handle(output) as f:
+        writer = csv.writer(f)
+        writer.writerow(
+            [
+                "path",
+                "kind",
+                "name",
+                "estimated_lines",
+                "estimated_share",
+                "estimated_share_low",
+                "estimated_share_high",
+                "sampled_files",
+                "files",
+            ]
+        )
+        for path, e in estimate.items():
+            for kind, by_kind in [
+                ("author", e["authors"]),
+                ("license", e["licenses"]),
+            ]:
+                for name, share in by_kind.items():
+                    row = [share["lines"], share["share"], share["low"], share["high"]]
+                    writer.writerow([path, kind, name, *row, e["sampled"], e["files"]])
+
+
+@telemetry.exporter
+def as_plan_csv(plan: Plan, output: Writeable = Path("build/authorship.plan.csv")):
+    """
+    Exports the estimated cost of every file of a plan in CSV format, most
+    expensive first.
+
+    Args:
+        plan (Plan): The plan to export
+        output (Union[PathLike, IO]): The output file path or handle.
+            If a path, it will be open and closed. Handles are left open.
+    """
+    with io_handle(output) as f:
+        writer = csv.writer(f)
+        writer.writerow(
+            ["path", "size", "commits", "renames", "estimated_seconds", "discarded"]
+        )
+        for file in plan.files:
+            writer.writerow(
+                [
+                    file.path,
+                    file.size,
+                    file.commits,
+                    file.renames,
+                    round(file.seconds, 3),
+                    file.discarded,
+                ]
+            )
 
 
-__all__ = ["as_treemap", "as_json", "as_csv"]
+__all__ = [
+    "FORMATS",
+    "Summary",
+    "summarize",
+    "as_reports",
+    "as_reports_stream",
+    "as_treemap",
+    "as_json",
+    "as_csv",
+    "as_json_stream",
+    "as_csv_stream",
+    "as_delta_json",
+    "as_delta_csv",
+    "as_estimate_json",
+    "as_estimate_csv",
+    "as_plan_csv",
+]
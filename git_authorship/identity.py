@@ -0,0 +1,104 @@
+# Copyright (c) 2025 Joseph Hale
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+import logging
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from git import GitCommandError
+from git import Repo
+
+from ._types import Author
+from ._types import Config
+
+log = logging.getLogger(__name__)
+
+MAILMAP_BATCH_SIZE = 512
+"""Identities passed to a single `git check-mailmap` call (bounds argv length)"""
+
+
+class IdentityTable:
+    """
+    Interns raw author identities so that each distinct `(name, email)` pair is
+    formatted and stored only once per run, no matter how many hunks it appears in.
+
+    Usage:
+
+    ```python
+    identities = IdentityTable()
+    author = identities.intern("Alice", "alice@example.com")
+    # "Alice <alice@example.com>"
+    ```
+    """
+
+    def __init__(self):
+        self._ids: Dict[Tuple[str, str], Author] = {}
+
+    def intern(self, name: Optional[str], email: Optional[str]) -> Author:
+        key = (name or "", email or "")
+        if (author := self._ids.get(key)) is None:
+            author = self._ids[key] = f"{key[0]} <{key[1]}>"
+        return author
+
+    def __iter__(self) -> Iterator[Author]:
+        return iter(self._ids.values())
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+def resolve(
+    repo: Optional[Repo],
+    authors: Iterable[Author],
+    aliases: Optional[Config.Aliases] = None,
+) -> Dict[Author, Author]:
+    """
+    Resolves each distinct raw author to its canonical identity, first through the
+    repo's mailmap (in batches via `git check-mailmap`, skipped without a repo), then
+    through the given alias table. Alias chains (`a -> b -> c`) are followed to the
+    end.
+
+    Returns:
+        Dict[Author, Author]: Map of 'Raw Author' -> 'Canonical Author'
+    """
+    distinct = sorted(set(authors))
+    # (Only `Name <email>` contacts can be mailmapped, e.g. not `before <since>`)
+    contacts = [author for author in distinct if author.endswith(">")]
+    mailmapped = dict(
+        zip(contacts, _check_mailmap(repo, contacts) if repo else contacts)
+    )
+    return {
+        raw: _follow_aliases(mailmapped.get(raw, raw), aliases or {})
+        for raw in distinct
+    }
+
+
+def _check_mailmap(repo: Repo, authors: List[Author]) -> List[Author]:
+    resolved: List[Author] = []
+    for start in range(0, len(authors), MAILMAP_BATCH_SIZE):
+        batch = authors[start : start + MAILMAP_BATCH_SIZE]
+        try:
+            output = repo.git.check_mailmap(*batch)
+            lines = output.splitlines()
+            resolved.extend(lines if len(lines) == len(batch) else batch)
+        except GitCommandError as e:
+            log.warning(f"Failed to resolve identities through the mailmap: {e}")
+            resolved.extend(batch)
+    return resolved
+
+
+def _follow_aliases(author: Author, aliases: Config.Aliases) -> Author:
+    seen = {author}
+    while (alias := aliases.get(author)) is not None and alias not in seen:
+        seen.add(alias)
+        author = alias
+    return author
+
+
+__all__ = ["IdentityTable", "resolve"]
@@ -0,0 +1,120 @@
+# Copyright (c) 2025 Joseph Hale
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+import sqlite3
+from contextlib import closing
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+from typing import Callable
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+from ._pathutils import atomic_path
+from ._types import Authorship
+from ._types import FilePath
+from ._types import LineCount
+from .tally import UNKNOWN_LICENSE
+
+INDEX_FORMAT = 1
+INDEX_FILENAME = "authorship.index.sqlite"
+SCHEMA = """
+CREATE TABLE authorship (
+    path TEXT NOT NULL,
+    author TEXT NOT NULL,
+    license TEXT NOT NULL,
+    lines INTEGER NOT NULL,
+    folder INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX by_author ON authorship (author, folder, lines DESC, path);
+CREATE INDEX by_license ON authorship (license, folder, path);
+"""
+
+
+def build(nodes: Iterable[Tuple[FilePath, Authorship]], output: Path):
+    """
+    Saves an inverted index of an (augmented) authorship, from each author and
+    license to the files/folders they contributed to. The `nodes` are streamed, so
+    the authorship never needs to be held in memory at once.
+    """
+    with builder(output) as add:
+        for path, authors in nodes:
+            add(path, authors)
+
+
+@contextmanager
+def builder(output: Path) -> Iterator[Callable[[FilePath, Authorship], None]]:
+    """
+    Like `build`, but the nodes are added one at a time (e.g. while they are also
+    being exported). The index is saved once the context exits.
+    """
+    folders: Set[str] = set()
+    with atomic_path(output) as tmp:
+        with closing(sqlite3.connect(tmp)) as db:
+            db.executescript(SCHEMA)
+            db.execute(f"PRAGMA user_version = {INDEX_FORMAT}")
+
+            def add(path: FilePath, authors: Authorship):
+                folders.update(str(parent) for parent in path.parents)
+                db.executemany(
+                    "INSERT INTO authorship VALUES (?, ?, ?, ?, 0)",
+                    [
+                        (
+                            str(path),
+                            author,
+                            info.get("license", UNKNOWN_LICENSE),
+                            info["lines"],
+                        )
+                        for author, info in authors.items()
+                    ],
+                )
+
+            yield add
+            db.execute("CREATE TEMPORARY TABLE folders (path TEXT PRIMARY KEY)")
+            db.executemany("INSERT INTO folders VALUES (?)", ((f,) for f in folders))
+            db.execute(
+                "UPDATE authorship SET folder = 1 "
+                "WHERE path IN (SELECT path FROM folders)"
+            )
+            db.commit()
+
+
+def top_paths(
+    index: Path,
+    *,
+    author: Optional[str] = None,
+    license: Optional[str] = None,
+    limit: Optional[int] = 10,
+    folders: bool = False,
+) -> List[Tuple[str, LineCount]]:
+    """
+    The files (or folders) with the most lines by `author` and/or under `license`,
+    most lines first, looked up without reading the rest of the authorship.
+    """
+    if not index.is_file():
+        raise FileNotFoundError(f"No authorship index at {index}")
+    clauses = ["folder = ?"]
+    params: List[Any] = [int(folders)]
+    if author is not None:
+        clauses.append("author = ?")
+        params.append(author)
+    if license is not None:
+        clauses.append("license = ?")
+        params.append(license)
+    query = (
+        f"SELECT path, SUM(lines) FROM authorship WHERE {' AND '.join(clauses)} "
+        "GROUP BY path ORDER BY SUM(lines) DESC, path LIMIT ?"
+    )
+    params.append(limit if limit is not None else -1)
+    uri = f"{index.absolute().as_uri()}?mode=ro"
+    with closing(sqlite3.connect(uri, uri=True)) as db:
+        return db.execute(query, params).fetchall()
+
+
+__all__ = ["INDEX_FORMAT", "INDEX_FILENAME", "build", "builder", "top_paths"]
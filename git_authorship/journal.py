@@ -0,0 +1,123 @@
+# Copyright (c) 2025 Joseph Hale
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO
+from typing import Iterator
+from typing import Optional
+from typing import Tuple
+
+from ._types import Authorship
+from ._types import FilePath
+from ._types import RepoAuthorship
+
+try:
+    import fcntl
+except ImportError:  # e.g. on Windows
+    fcntl = None  # type: ignore
+
+log = logging.getLogger(__name__)
+
+SYNC_INTERVAL = 1.0
+"""Seconds between forcing journaled results to disk"""
+
+
+class Journal:
+    """
+    An append-only record of the per-file results of an unfinished computation, one
+    JSON line per file. Each result is written as soon as it is computed, so an
+    interrupted run can resume where it stopped.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def read(self) -> RepoAuthorship:
+        """Every result journaled so far (ignoring a partially written last line)"""
+        return dict(self._read()[0])
+
+    @contextmanager
+    def appender(self) -> Iterator[Optional["JournalAppender"]]:
+        """
+        Opens the journal for appending, or yields `None` if another process is
+        already appending to it.
+        """
+        self.path.parent.mkdir(exist_ok=True, parents=True)
+        with open(self.path, "a+") as f:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    log.warning(f"{self.path} is in use by another run")
+                    yield None
+                    return
+            f.truncate(self._read()[1])
+            appender = JournalAppender(f)
+            try:
+                yield appender
+            finally:
+                appender.sync()
+
+    def remove(self):
+        """
+        Removes the journal, unless another run is appending to it (e.g. a run which
+        started first, and whose progress must survive if it is interrupted).
+        """
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    log.info(f"Keeping {self.path}, which another run is using")
+                    return
+            self.path.unlink(missing_ok=True)
+
+    def _read(self) -> Tuple[RepoAuthorship, int]:
+        """The valid results, and the offset just after the last of them"""
+        results: RepoAuthorship = {}
+        offset = 0
+        try:
+            with open(self.path, "rb") as f:
+                for line in f:
+                    try:
+                        filepath, authorship = json.loads(line)
+                    except ValueError:
+                        break
+                    if not line.endswith(b"\n"):
+                        break
+                    results[Path(filepath)] = authorship
+                    offset += len(line)
+        except FileNotFoundError:
+            pass
+        return results, offset
+
+
+class JournalAppender:
+    def __init__(self, f: IO):
+        self._f = f
+        self._synced = time.monotonic()
+
+    def append(self, path: FilePath, authorship: Authorship):
+        self._f.write(json.dumps([str(path), authorship]) + "\n")
+        self._f.flush()
+        if time.monotonic() - self._synced > SYNC_INTERVAL:
+            self.sync()
+
+    def sync(self):
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self._synced = time.monotonic()
+
+
+__all__ = ["Journal", "JournalAppender"]
@@ -0,0 +1,104 @@
+# Copyright (c) 2025 Joseph Hale
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+from typing import List
+from typing import Tuple
+from typing import Union
+
+from git import Commit
+
+from ._git import BlamedCommit
+from ._types import Authorship
+from ._types import AuthorshipInfo
+from ._types import Timestamp
+
+AGE_BUCKETS: List[Tuple[int, str]] = [
+    (30, "<1m"),
+    (90, "<3m"),
+    (365, "<1y"),
+    (2 * 365, "<2y"),
+    (5 * 365, "<5y"),
+]
+"""Line age buckets, as (exclusive upper bound in days, label)"""
+OLDEST_AGE_BUCKET = ">=5y"
+AGE_LABELS = [label for _, label in AGE_BUCKETS] + [OLDEST_AGE_BUCKET]
+
+
+def for_hunk(
+    commit: Union[Commit, BlamedCommit], lines: int, as_of: Timestamp
+) -> AuthorshipInfo:
+    """
+    The metrics of a blamed hunk, using only what `git blame` already reports for its
+    commit. Line ages are relative to `as_of` (the time of the blamed revision), so
+    results don't change as time passes.
+    """
+    return {
+        "lines": lines,
+        "first_authored": commit.authored_date,
+        "last_authored": commit.authored_date,
+        "last_committed": commit.committed_date,
+        "commits": [commit.hexsha],
+        "ages": {age_bucket(as_of - commit.authored_date): lines},
+    }
+
+
+def age_bucket(age: int) -> str:
+    """The label of the bucket of a line `age` seconds old"""
+    days = age / (24 * 60 * 60)
+    for limit, label in AGE_BUCKETS:
+        if days < limit:
+            return label
+    return OLDEST_AGE_BUCKET
+
+
+def merge(into: AuthorshipInfo, info: AuthorshipInfo):
+    """
+    Adds the metrics of `info` to `into` (whose distinct commits are collected in a
+    set, until `finalize`d). Lines and licenses are left to the caller.
+    """
+    if "first_authored" not in info:
+        return
+    if "first_authored" in into:
+        into["first_authored"] = min(into["first_authored"], info["first_authored"])
+        into["last_authored"] = max(into["last_authored"], info["last_authored"])
+        into["last_committed"] = max(into["last_committed"], info["last_committed"])
+    else:
+        into["first_authored"] = info["first_authored"]
+        into["last_authored"] = info["last_authored"]
+        into["last_committed"] = info["last_committed"]
+    commits = into.setdefault("commits", set())
+    assert isinstance(commits, set)
+    commits.update(info["commits"])  # type: ignore[arg-type]
+    ages = into.setdefault("ages", {})
+    for label, lines in info["ages"].items():
+        ages[label] = ages.get(label, 0) + lines
+
+
+def collect(authorship: Authorship) -> Authorship:
+    """Stores the distinct commits of a file as a (sorted) list, e.g. for caching"""
+    for info in authorship.values():
+        if isinstance(info.get("commits"), set):
+            info["commits"] = sorted(info["commits"])  # type: ignore[arg-type]
+    return authorship
+
+
+def finalize(authorship: Authorship) -> Authorship:
+    """Replaces the distinct commits of a file/folder by their count, for reports"""
+    for info in authorship.values():
+        if "commits" in info and not isinstance(info["commits"], int):
+            info["commits"] = len(info["commits"])
+    return authorship
+
+
+__all__ = [
+    "AGE_BUCKETS",
+    "OLDEST_AGE_BUCKET",
+    "AGE_LABELS",
+    "for_hunk",
+    "age_bucket",
+    "merge",
+    "collect",
+    "finalize",
+]
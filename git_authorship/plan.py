@@ -0,0 +1,201 @@
+# Copyright (c) 2025 Joseph Hale
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+import json
+import logging
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+from git import Repo
+
+from ._git import ls_tree
+from ._pathutils import io_handle
+from ._types import Config
+from ._types import FilePath
+
+log = logging.getLogger(__name__)
+
+TIMINGS_FILENAME = ".timings.json"
+"""Kept in the cache directory (dotfiles are not cache entries)"""
+DEFAULT_SECONDS_PER_UNIT = 0.005
+"""A rough rate for converting cost units to seconds, until a run has been timed"""
+
+
+class FileCost(NamedTuple):
+    path: Path
+    size: int
+    """In bytes"""
+    commits: int
+    """Commits touching the file (under its current or former names)"""
+    renames: int
+    seconds: float
+    """The estimated time to blame the file"""
+    discarded: bool
+    """Whether the blame would be discarded (by an ignored extension or pseudonym)"""
+
+
+class Plan(NamedTuple):
+    files: List[FileCost]
+    """Most expensive first"""
+    calibrated_from: int
+    """The number of files timed by earlier runs the estimate is calibrated with"""
+
+    @property
+    def seconds(self) -> float:
+        return sum(f.seconds for f in self.files)
+
+    def folders(self) -> Dict[FilePath, float]:
+        """The estimated seconds of every folder, most expensive first"""
+        folders: Dict[FilePath, float] = defaultdict(float)
+        for f in self.files:
+            for parent in f.path.parents:
+                folders[parent] += f.seconds
+        return dict(sorted(folders.items(), key=lambda item: (-item[1], item[0])))
+
+
+class Timings:
+    """
+    How long blaming each file took in earlier runs (the latest time per path), for
+    calibrating plans.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.recorded: Dict[FilePath, float] = {}
+
+    def record(self, path: FilePath, seconds: float):
+        self.recorded[path] = seconds
+
+    def load(self) -> Dict[FilePath, float]:
+        try:
+            with io_handle(self.path, "r") as f:
+                return {Path(k): v for k, v in json.load(f).items()}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            log.warning(f"Ignoring unreadable timings {self.path}: {e}")
+            return {}
+
+    def save(self):
+        if not self.recorded:
+            return
+        timings = {**self.load(), **self.recorded}
+        self.path.parent.mkdir(exist_ok=True, parents=True)
+        with io_handle(self.path) as f:
+            json.dump({str(path): seconds for path, seconds in timings.items()}, f)
+
+
+def for_repo(
+    repo: Repo,
+    *,
+    pseudonyms: Optional[Config.Pseudonyms] = None,
+    ignore_extensions: Optional[Config.IgnoreExtensions] = None,
+    paths: Optional[Sequence[Path]] = None,
+    timings: Optional[Timings] = None,
+) -> Plan:
+    """
+    Estimates how long blaming every file of the repo would take, without blaming
+    anything. The cost of a file grows with its size and with the number of commits
+    (and renames) in its history, all read from a single `git log`.
+
+    The estimate is calibrated with the `timings` of files blamed by earlier runs,
+    if any (otherwise a rough default rate is assumed).
+    """
+    blobs = [e for e in ls_tree(repo, paths=paths) if e.type == "blob"]
+    histories = history(repo, [e.path for e in blobs], paths=paths)
+    units = {e.path: cost_units(e.size, *histories[e.path]) for e in blobs}
+
+    timed = {p: s for p, s in (timings.load() if timings else {}).items() if p in units}
+    timed_units = sum(units[p] for p in timed)
+    rate = sum(timed.values()) / timed_units if timed else DEFAULT_SECONDS_PER_UNIT
+
+    files = [
+        FileCost(
+            e.path,
+            e.size,
+            *histories[e.path],
+            seconds=units[e.path] * rate,
+            discarded=_discarded(e.path, pseudonyms or {}, ignore_extensions or []),
+        )
+        for e in blobs
+    ]
+    files.sort(key=lambda f: (-f.seconds, f.path))
+    return Plan(files, calibrated_from=len(timed))
+
+
+def history(
+    repo: Repo,
+    files: Sequence[FilePath],
+    *,
+    rev: str = "HEAD",
+    paths: Optional[Sequence[Path]] = None,
+) -> Dict[FilePath, Tuple[int, int]]:
+    """
+    The number of commits touching, and renames of, each of the `files` of `rev`
+    throughout its history (following renames), e.g. `{Path("src/app.py"): (12, 1)}`
+    """
+    output = repo.git.log(
+        "--format=%x00", "--name-status", "-M", "-z", rev, "--", *map(str, paths or [])
+    )
+    commits: Dict[FilePath, int] = defaultdict(int)
+    renames: Dict[FilePath, int] = defaultdict(int)
+    # The file of `rev` each name refers to, at the point reached in history
+    names = {path.as_posix(): path for path in files}
+
+    tokens = iter(output.split("\0"))
+    for token in tokens:
+        if not (status := token.lstrip("\n")):
+            continue
+        if status[0] in "RC":
+            old, new = next(tokens), next(tokens)
+            if (current := names.get(new)) is not None:
+                commits[current] += 1
+                if status[0] == "R":
+                    renames[current] += 1
+                    del names[new]
+                    names[old] = current
+        elif (current := names.get(name := next(tokens))) is not None:
+            commits[current] += 1
+            if status[0] == "A":  # Older changes to this name are another file's
+                del names[name]
+    return {path: (commits[path], renames[path]) for path in files}
+
+
+def cost_units(size: int, commits: int, renames: int) -> float:
+    """
+    The relative cost of blaming a file. Each commit (or rename) in its history
+    means diffing (or searching for) about `size` bytes, on top of a fixed cost per
+    file.
+    """
+    return 1 + (commits + renames) * (1 + size / 1024)
+
+
+def _discarded(
+    path: Path,
+    pseudonyms: Config.Pseudonyms,
+    ignore_extensions: Config.IgnoreExtensions,
+) -> bool:
+    """Mirrors the rules `authorship.for_repo` applies after blaming"""
+    if path.suffix.lower() in ignore_extensions:
+        return True
+    return any(path.name.startswith(p.name) for p in pseudonyms)
+
+
+__all__ = [
+    "TIMINGS_FILENAME",
+    "DEFAULT_SECONDS_PER_UNIT",
+    "FileCost",
+    "Plan",
+    "Timings",
+    "for_repo",
+    "history",
+    "cost_units",
+]
@@ -0,0 +1,139 @@
+# Copyright (c) 2025 Joseph Hale
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+import logging
+import time
+from pathlib import Path
+from typing import Callable
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+
+from git import GitCommandError
+from git import Repo
+
+from . import sample
+from ._git import ls_tree
+
+log = logging.getLogger(__name__)
+
+MAX_LOOSE_OBJECTS = 1000
+"""Loose objects (e.g. from fetches) tolerated before repacking"""
+MAX_PACKS = 20
+"""Packs tolerated before repacking them into one"""
+BENCHMARK_FILES = 5
+"""Files blamed before and after preparing, to measure the gain"""
+
+PREPARED_KEY = "authorship.prepared"
+"""The git config key recording the revision the commit-graph was last written at"""
+
+
+class Preparation(NamedTuple):
+    commit_graph: bool
+    """Whether the commit-graph was (re)written"""
+    repacked: bool
+    seconds: float
+    files: int = 0
+    """Files blamed to measure the gain"""
+    blame_before: Optional[float] = None
+    """Seconds taken to blame the benchmark files before preparing"""
+    blame_after: Optional[float] = None
+
+
+def prepare(
+    repo: Repo, blame: Optional[Callable[[Path], object]] = None
+) -> Preparation:
+    """
+    Speeds up the history walks of blame: writes a commit-graph with changed-path
+    Bloom filters (incrementally, as a new layer for new commits), and repacks
+    loose objects and small packs. Anything already done is skipped.
+
+    Git doesn't report whether a commit-graph has Bloom filters, so the revision
+    it was written at is recorded in the repo's config (see `prepared_revision`).
+
+    If `blame` is given (and there is work to do), a sample of files is blamed with
+    it before and after preparing, to measure the gain.
+    """
+    head = repo.head.commit.hexsha
+    prepared = prepared_revision(repo)
+    write_graph = prepared != head
+    repack = _needs_repack(repo)
+    if not write_graph and not repack:
+        log.info("Repo already prepared")
+        return Preparation(commit_graph=False, repacked=False, seconds=0.0)
+
+    files = sample.select(ls_tree(repo), BENCHMARK_FILES) if blame else []
+    files = files[:BENCHMARK_FILES]  # (The sample has a file of every top folder)
+    _timed(blame, files)  # (Warms the page cache, so only git's work is measured)
+    blame_before = _timed(blame, files)
+
+    start = time.perf_counter()
+    if write_graph:
+        # Bloom filters are only used if every layer has them
+        split = "--split" if prepared is not None else "--split=replace"
+        log.info("Writing commit-graph with changed-path Bloom filters")
+        repo.git.commit_graph("write", "--reachable", "--changed-paths", split)
+        repo.git.config(PREPARED_KEY, head)
+    if repack:
+        log.info("Repacking objects")
+        repo.git.repack("-a", "-d")
+    seconds = time.perf_counter() - start
+
+    return Preparation(
+        commit_graph=write_graph,
+        repacked=repack,
+        seconds=seconds,
+        files=len(files),
+        blame_before=blame_before,
+        blame_after=_timed(blame, files),
+    )
+
+
+def prepared_revision(repo: Repo) -> Optional[str]:
+    """
+    The revision `prepare` last wrote the repo's commit-graph at, or None if the
+    repo has no (valid) commit-graph written by `prepare`.
+    """
+    info = Path(repo.git_dir) / "objects" / "info"
+    graphs = [info / "commit-graph", info / "commit-graphs" / "commit-graph-chain"]
+    if not any(path.is_file() for path in graphs):
+        return None
+    try:
+        repo.git.commit_graph("verify", "--shallow")
+        return repo.git.config("--get", PREPARED_KEY)
+    except GitCommandError:
+        return None
+
+
+def _needs_repack(repo: Repo) -> bool:
+    counts = dict(
+        line.split(": ", 1) for line in repo.git.count_objects("-v").splitlines()
+    )
+    return (
+        int(counts.get("count", 0)) > MAX_LOOSE_OBJECTS
+        or int(counts.get("packs", 0)) > MAX_PACKS
+    )
+
+
+def _timed(
+    blame: Optional[Callable[[Path], object]], files: List[Path]
+) -> Optional[float]:
+    if blame is None:
+        return None
+    start = time.perf_counter()
+    for path in files:
+        blame(path)
+    return time.perf_counter() - start
+
+
+__all__ = [
+    "MAX_LOOSE_OBJECTS",
+    "MAX_PACKS",
+    "BENCHMARK_FILES",
+    "PREPARED_KEY",
+    "Preparation",
+    "prepare",
+    "prepared_revision",
+]
@@ -0,0 +1,182 @@
+# Copyright (c) 2025 Joseph Hale
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+import math
+import random
+from collections import defaultdict
+from pathlib import Path
+from statistics import NormalDist
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+from typing import Sequence
+
+from ._git import path_order
+from ._git import TreeEntry
+from ._types import Authorship
+from ._types import AuthorshipEstimate
+from ._types import FilePath
+from ._types import LineCount
+from ._types import RepoAuthorship
+from ._types import RepoAuthorshipEstimate
+from ._types import ShareEstimate
+from .tally import by_author
+from .tally import by_license
+
+DEFAULT_CONFIDENCE = 0.95
+
+
+class _Stratum(NamedTuple):
+    files: int
+    size: int
+    """Total blob size (in bytes) of the files"""
+    sampled: List[Path]
+
+
+def select(entries: Sequence[TreeEntry], size: int, seed: int = 0) -> List[Path]:
+    """
+    A stratified sample of (about) `size` files. Files are stratified by top-level
+    folder, and each folder gets a share of the sample proportional to its total
+    blob size (but at least one file). The sample only depends on the tree and the
+    `seed`, so repeated runs blame the same files.
+    """
+    strata: Dict[Path, List[TreeEntry]] = defaultdict(list)
+    for entry in entries:
+        if entry.type == "blob":
+            strata[_stratum(entry.path)].append(entry)
+    total = sum(e.size for files in strata.values() for e in files) or 1
+
+    selected: List[Path] = []
+    for stratum, files in strata.items():
+        weight = sum(e.size for e in files) / total
+        count = min(len(files), max(1, round(size * weight)))
+        rng = random.Random(f"{seed}:{stratum.as_posix()}")
+        selected.extend(e.path for e in rng.sample(files, count))
+    return sorted(selected, key=path_order)
+
+
+def estimate(
+    entries: Sequence[TreeEntry],
+    sampled: RepoAuthorship,
+    confidence: float = DEFAULT_CONFIDENCE,
+) -> RepoAuthorshipEstimate:
+    """
+    Extrapolates the author and license shares of every folder from the (augmented)
+    authorship of the files sampled by `select`.
+
+    Within each stratum, lines are estimated from blob sizes (a ratio estimator), and
+    each share comes with a `confidence` interval from the variation between the
+    sampled files. Folders without any sampled file are omitted.
+    """
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    sizes = {e.path: e.size for e in entries if e.type == "blob"}
+    folders: Dict[FilePath, Dict[Path, List[Path]]] = defaultdict(
+        lambda: defaultdict(list)
+    )
+    for path in sizes:
+        for folder in path.parents:
+            folders[folder][_stratum(path)].append(path)
+
+    result: RepoAuthorshipEstimate = {}
+    for folder in sorted(folders, key=path_order):
+        strata = [
+            _Stratum(len(files), sum(sizes[p] for p in files), sampled_files)
+            for files in folders[folder].values()
+            if (sampled_files := [p for p in files if p in sampled])
+        ]
+        if strata:
+            result[folder] = _estimate_folder(strata, sizes, sampled, z)
+    return result
+
+
+def _estimate_folder(
+    strata: List[_Stratum],
+    sizes: Dict[Path, int],
+    sampled: RepoAuthorship,
+    z: float,
+) -> AuthorshipEstimate:
+    lines = [_estimate_lines(stratum, sizes, sampled) for stratum in strata]
+    total = sum(lines)
+    weights = [stratum_lines / total if total else 0.0 for stratum_lines in lines]
+    return {
+        "files": sum(s.files for s in strata),
+        "sampled": sum(len(s.sampled) for s in strata),
+        "authors": _estimate_shares(strata, weights, total, sampled, by_author, z),
+        "licenses": _estimate_shares(strata, weights, total, sampled, by_license, z),
+    }
+
+
+def _estimate_lines(
+    stratum: _Stratum, sizes: Dict[Path, int], sampled: RepoAuthorship
+) -> float:
+    lines = sum(_lines(sampled[p]) for p in stratum.sampled)
+    size = sum(sizes[p] for p in stratum.sampled)
+    if size:
+        return lines / size * stratum.size
+    return lines / len(stratum.sampled) * stratum.files
+
+
+def _estimate_shares(
+    strata: List[_Stratum],
+    weights: List[float],
+    total: float,
+    sampled: RepoAuthorship,
+    breakdown: Callable[[Authorship], Dict[str, LineCount]],
+    z: float,
+) -> Dict[str, ShareEstimate]:
+    shares: Dict[str, float] = defaultdict(float)
+    variances: Dict[str, float] = defaultdict(float)
+    for stratum, weight in zip(strata, weights):
+        files = [sampled[p] for p in stratum.sampled]
+        names = {name for authorship in files for name in breakdown(authorship)}
+        for name in names:
+            share, variance = _ratio(stratum, files, name, breakdown)
+            shares[name] += weight * share
+            variances[name] += weight**2 * variance
+
+    estimates = {}
+    for name in sorted(shares):
+        share, margin = shares[name], z * math.sqrt(variances[name])
+        estimates[name] = ShareEstimate(
+            lines=round(share * total),
+            share=round(share, 4),
+            low=round(max(0.0, share - margin), 4),
+            high=round(min(1.0, share + margin), 4),
+        )
+    return estimates
+
+
+def _ratio(
+    stratum: _Stratum,
+    files: List[Authorship],
+    name: str,
+    breakdown: Callable[[Authorship], Dict[str, LineCount]],
+):
+    """The share of `name` within a stratum, and the variance of that share"""
+    lines = [_lines(authorship) for authorship in files]
+    named = [breakdown(authorship).get(name, 0) for authorship in files]
+    n = len(files)
+    if not sum(lines):
+        return 0.0, 0.0
+    share = sum(named) / sum(lines)
+    if n == stratum.files:
+        return share, 0.0
+    if n == 1:
+        return share, share * (1 - share)
+    mean = sum(lines) / n
+    residuals = sum((a - share * y) ** 2 for a, y in zip(named, lines)) / (n - 1)
+    return share, (1 - n / stratum.files) * residuals / (n * mean**2)
+
+
+def _stratum(path: Path) -> Path:
+    return Path(path.parts[0]) if len(path.parts) > 1 else Path(".")
+
+
+def _lines(authorship: Authorship) -> LineCount:
+    return sum(info["lines"] for info in authorship.values())
+
+
+__all__ = ["DEFAULT_CONFIDENCE", "select", "estimate"]
@@ -0,0 +1,263 @@
+# Copyright (c) 2025 Joseph Hale
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+import json
+import logging
+import os
+import socketserver
+import stat
+import threading
+from collections import defaultdict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+from urllib.parse import parse_qs
+from urllib.parse import urlsplit
+
+from git import Repo
+
+from . import authorship
+from ._types import Author
+from ._types import Authorship
+from ._types import Config
+from ._types import License
+from ._types import LineCount
+from ._types import RepoAuthorship
+
+log = logging.getLogger(__name__)
+
+UNIX_SOCKET_PREFIX = "unix:"
+
+
+class AuthorshipService:
+    """
+    Keeps a repo's authorship (and the indexes needed to query it) warm in memory.
+
+    Every query first checks whether HEAD has moved. If it has, only the files changed
+    since the previously loaded revision are re-blamed before answering. Changes to
+    the licenses or pseudonyms are re-applied without re-blaming (see `reconfigure`).
+    """
+
+    def __init__(
+        self,
+        repo: Repo,
+        *,
+        licenses: Optional[Config.AuthorLicenses] = None,
+        pseudonyms: Optional[Config.Pseudonyms] = None,
+        aliases: Optional[Config.Aliases] = None,
+        ignore_extensions: Optional[Config.IgnoreExtensions] = None,
+        ignore_revs_file: str = ".git-blame-ignore-revs",
+        cache_dir: Path = Path("build/cache"),
+        use_cache: bool = True,
+        cache_compression: Optional[str] = None,
+        collect_metrics: bool = False,
+    ):
+        self.repo = repo
+        self.licenses = licenses or {}
+        self.pseudonyms = pseudonyms or {}
+        self.aliases = aliases or {}
+        self.ignore_extensions = ignore_extensions or []
+        self.ignore_revs_file = ignore_revs_file
+        self.cache_dir = cache_dir
+        self.use_cache = use_cache
+        self.cache_compression = cache_compression
+        self.collect_metrics = collect_metrics
+
+        self.revision: Optional[str] = None
+        self._raw: RepoAuthorship = {}
+        self._enriched = authorship.EnrichedAuthorship({})
+        self._by_author: Dict[Author, List[Tuple[str, LineCount]]] = {}
+        self._by_license: Dict[License, Dict[Author, LineCount]] = {}
+        self._lock = threading.Lock()
+
+    def refresh(self) -> bool:
+        """Reloads the authorship if HEAD has moved. Returns whether it did."""
+        with self._lock:
+            head = self.repo.head.commit.hexsha
+            if head == self.revision:
+                return False
+
+            log.info(f"Loading authorship @ {head}")
+            previous = (self.revision, self._raw) if self.revision else None
+            self._raw = authorship._load_repo_authorship(
+                self.repo,
+                ignore_revs_file=self.ignore_revs_file,
+                cache_dir=self.cache_dir,
+                use_cache=self.use_cache,
+                cache_compression=self.cache_compression,
+                previous=previous,
+                collect_metrics=self.collect_metrics,
+            )
+            files = authorship._augment_files(
+                self.repo,
+                self._raw,
+                aliases=self.aliases,
+                ignore_extensions=self.ignore_extensions,
+            )
+            self._enriched = authorship.EnrichedAuthorship(
+                files, licenses=self.licenses, pseudonyms=self.pseudonyms
+            )
+            self._index_authors()
+            self._index_licenses()
+            self.revision = head
+            return True
+
+    def reconfigure(
+        self,
+        *,
+        licenses: Optional[Config.AuthorLicenses] = None,
+        pseudonyms: Optional[Config.Pseudonyms] = None,
+    ):
+        """
+        Re-applies new licenses and/or pseudonyms to the loaded authorship. Only the
+        paths of the authors whose license changed, and the folders above the files
+        whose pseudonym changed, are updated.
+        """
+        with self._lock:
+            if pseudonyms is not None:
+                self.pseudonyms = pseudonyms
+                if self._enriched.set_pseudonyms(pseudonyms):
+                    self._index_authors()
+            if licenses is not None:
+                self.licenses = licenses
+                self._enriched.set_licenses(licenses)
+            self._index_licenses()
+
+    @property
+    def authorship(self) -> RepoAuthorship:
+        self.refresh()
+        return self._enriched.authorship
+
+    def path(self, path: str) -> Optional[Authorship]:
+        self.refresh()
+        return self._enriched.authorship.get(Path(path))
+
+    def author(
+        self, author: Author, limit: Optional[int] = None
+    ) -> List[Tuple[str, LineCount]]:
+        self.refresh()
+        return self._by_author.get(author, [])[:limit]
+
+    def license(self, license: License) -> Dict[Author, LineCount]:
+        self.refresh()
+        return self._by_license.get(license, {})
+
+    def _index_authors(self):
+        by_author: Dict[Author, List[Tuple[str, LineCount]]] = defaultdict(list)
+        for path, authors in self._enriched.authorship.items():
+            if path in self._enriched.files:
+                for author, info in authors.items():
+                    by_author[author].append((str(path), info["lines"]))
+        for paths in by_author.values():
+            paths.sort(key=lambda x: (-x[1], x[0]))
+        self._by_author = dict(by_author)
+
+    def _index_licenses(self):
+        by_license: Dict[License, Dict[Author, LineCount]] = defaultdict(dict)
+        for author, info in self._enriched.authorship.get(Path("."), {}).items():
+            by_license[info.get("license", "Unknown")][author] = info["lines"]
+        self._by_license = dict(by_license)
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    service: AuthorshipService
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            status, body = self._route(url.path, query)
+        except Exception as e:  # Keep serving even if one query fails.
+            log.exception(f"Failed to answer {self.path}")
+            status, body = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)}
+
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _route(self, route: str, query: Dict[str, str]) -> Tuple[HTTPStatus, Any]:
+        service = self.service
+        if route == "/path":
+            result = service.path(query.get("path", "."))
+            if result is None:
+                return HTTPStatus.NOT_FOUND, {"error": "Unknown path"}
+            return HTTPStatus.OK, result
+        elif route == "/author" and "author" in query:
+            if not query.get("limit", "0").isdigit():
+                error = f"limit must be a non-negative integer, not {query['limit']!r}"
+                return HTTPStatus.BAD_REQUEST, {"error": error}
+            limit = int(query["limit"]) if "limit" in query else None
+            paths = service.author(query["author"], limit)
+            return HTTPStatus.OK, [{"path": p, "lines": n} for p, n in paths]
+        elif route == "/license" and "license" in query:
+            return HTTPStatus.OK, service.license(query["license"])
+        elif route == "/revision":
+            service.refresh()
+            return HTTPStatus.OK, {"revision": service.revision}
+        else:
+            return HTTPStatus.NOT_FOUND, {"error": f"Unknown route {route}"}
+
+    def address_string(self) -> str:
+        # Unix socket peers have no (host, port) address
+        return str(self.client_address[0]) if self.client_address else "unix"
+
+    def log_message(self, format: str, *args: Any):
+        log.debug(format % args)
+
+
+class _ThreadingUnixHTTPServer(
+    socketserver.ThreadingMixIn, socketserver.UnixStreamServer
+):
+    daemon_threads = True
+
+
+def make_server(service: AuthorshipService, address: str) -> socketserver.BaseServer:
+    """
+    Creates a server answering authorship queries from the given service.
+
+    Args:
+        address (str): `HOST:PORT` for HTTP over TCP, or `unix:PATH` for HTTP over a
+            unix domain socket.
+
+    Routes:
+        GET /path?path=PATH                  Authorship of a file or folder
+        GET /author?author=AUTHOR[&limit=N]  Files by lines contributed, descending
+        GET /license?license=LICENSE         Lines per author under that license
+        GET /revision                        The revision currently being served
+    """
+    handler = type("RequestHandler", (_RequestHandler,), {"service": service})
+    if address.startswith(UNIX_SOCKET_PREFIX):
+        socket_path = address[len(UNIX_SOCKET_PREFIX) :]
+        # (Replaces the socket of a previous server, but never any other file)
+        if os.path.lexists(socket_path):
+            if not stat.S_ISSOCK(os.lstat(socket_path).st_mode):
+                raise ValueError(f"{socket_path} exists and is not a socket")
+            os.unlink(socket_path)
+        return _ThreadingUnixHTTPServer(socket_path, handler)
+    else:
+        host, _, port = address.rpartition(":")
+        return ThreadingHTTPServer((host or "127.0.0.1", int(port)), handler)
+
+
+def serve(service: AuthorshipService, address: str):
+    service.refresh()
+    with make_server(service, address) as server:
+        log.info(f"Serving authorship @ {address}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+__all__ = ["AuthorshipService", "make_server", "serve"]
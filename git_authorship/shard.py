@@ -0,0 +1,155 @@
+# Copyright (c) 2025 Joseph Hale
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+import hashlib
+import heapq
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Sequence
+from typing import Tuple
+
+from ._git import path_order
+from ._git import TreeEntry
+from ._pathutils import io_handle
+from ._pathutils import Writeable
+from ._types import RepoAuthorship
+from .exceptions import ShardException
+
+STRATEGIES = ["hash", "cost"]
+
+
+@dataclass(frozen=True)
+class Shard:
+    index: int
+    """1-based, i.e. `1 <= index <= count`"""
+    count: int
+
+    @classmethod
+    def parse(cls, spec: str) -> "Shard":
+        """Parses a `K/N` spec (e.g. `3/16`)"""
+        try:
+            index, count = (int(part) for part in spec.split("/"))
+        except ValueError:
+            raise ValueError(f"Shards must be given as K/N. Given: {spec}")
+        if not 1 <= index <= count:
+            raise ValueError(
+                f"Shard index must be between 1 and {count}. Given: {spec}"
+            )
+        return cls(index, count)
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.count}"
+
+    @property
+    def filename(self) -> str:
+        return f"authorship.shard-{self.index}-of-{self.count}.json"
+
+
+def select(
+    entries: Sequence[TreeEntry], shard: Shard, strategy: str = "hash"
+) -> List[Path]:
+    """
+    The files assigned to `shard`. Every file is assigned to exactly one shard, and
+    the assignment only depends on the tree (never on the machine running it).
+
+    Strategies:
+        hash: By a hash of the path. Stable as files are added/removed.
+        cost: Balances the total blob size per shard (largest files first).
+    """
+    blobs = [entry for entry in entries if entry.type == "blob"]
+    if strategy == "hash":
+        return [
+            e.path for e in blobs if _path_hash(e.path) % shard.count == shard.index - 1
+        ]
+    elif strategy == "cost":
+        assigned = _balance(blobs, shard.count)
+        return [e.path for e in blobs if assigned[e.path] == shard.index - 1]
+    else:
+        raise ValueError(
+            f"Unknown shard strategy {strategy}. Expected one of {STRATEGIES}"
+        )
+
+
+def _path_hash(path: Path) -> int:
+    return int.from_bytes(hashlib.sha1(path_order(path)).digest()[:8], "big")
+
+
+def _balance(blobs: Iterable[TreeEntry], count: int) -> Dict[Path, int]:
+    loads = [(0, idx) for idx in range(count)]
+    assigned = {}
+    for entry in sorted(blobs, key=lambda e: (-e.size, path_order(e.path))):
+        load, idx = heapq.heappop(loads)
+        assigned[entry.path] = idx
+        heapq.heappush(loads, (load + entry.size, idx))
+    return assigned
+
+
+def write_partial(
+    repo_authorship: RepoAuthorship,
+    output: Writeable,
+    *,
+    revision: str,
+    shard: Shard,
+    strategy: str,
+    ignore_revs_file: str,
+):
+    """Saves the (raw) authorship of one shard, for a later `merge_partials`"""
+    with io_handle(output) as f:
+        json.dump(
+            {
+                "revision": revision,
+                "shard": [shard.index, shard.count],
+                "strategy": strategy,
+                "ignore_revs_file": ignore_revs_file,
+                "authorship": {str(p): a for p, a in repo_authorship.items()},
+            },
+            f,
+        )
+
+
+def merge_partials(partials: Iterable[Path]) -> Tuple[str, RepoAuthorship]:
+    """
+    Combines the results of every shard of one run into the (raw) authorship of the
+    whole repo, in the same order an unsharded run would produce.
+
+    Raises:
+        ShardException: If shards are missing, duplicated, or from different runs.
+
+    Returns:
+        Tuple[str, RepoAuthorship]: The revision and its authorship
+    """
+    runs = set()
+    seen: Dict[int, Path] = {}
+    merged: RepoAuthorship = {}
+    for partial in partials:
+        with open(partial, "r") as f:
+            data = json.load(f)
+        index, count = data["shard"]
+        runs.add((data["revision"], count, data["strategy"], data["ignore_revs_file"]))
+        if len(runs) > 1:
+            raise ShardException(f"{partial} is from a different run than the others")
+        if index in seen:
+            raise ShardException(
+                f"Shard {index}/{count} given twice: {seen[index]} and {partial}"
+            )
+        seen[index] = partial
+        merged.update({Path(p): a for p, a in data["authorship"].items()})
+
+    if not runs:
+        raise ShardException("No shards given")
+    revision, count, _, _ = runs.pop()
+    if missing := sorted(set(range(1, count + 1)) - set(seen)):
+        raise ShardException(
+            f"Missing shard(s) {', '.join(f'{i}/{count}' for i in missing)}"
+        )
+
+    return revision, {p: merged[p] for p in sorted(merged, key=path_order)}
+
+
+__all__ = ["Shard", "STRATEGIES", "select", "write_partial", "merge_partials"]
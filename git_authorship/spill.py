@@ -0,0 +1,71 @@
+# Copyright (c) 2025 Joseph Hale
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+import json
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO
+from typing import Iterator
+from typing import List
+from typing import Tuple
+
+from . import telemetry
+from ._pathutils import io_handle
+from ._types import Authorship
+from ._types import FilePath
+
+DEFAULT_MAX_MEMORY = 64 * 1024 * 1024
+"""Bytes of per-file results to hold in memory before spilling them to disk"""
+
+
+class SpillWriter:
+    """
+    Appends per-file results to a JSON lines file, holding at most `max_memory` bytes
+    of them in memory at a time.
+    """
+
+    def __init__(self, f: IO, max_memory: int = DEFAULT_MAX_MEMORY):
+        self._f = f
+        self._max_memory = max_memory
+        self._buffer: List[str] = []
+        self._size = 0
+
+    def append(self, path: FilePath, authorship: Authorship):
+        line = json.dumps([str(path), authorship]) + "\n"
+        self._buffer.append(line)
+        self._size += len(line)
+        if self._size >= self._max_memory:
+            self.flush()
+
+    def flush(self):
+        self._f.writelines(self._buffer)
+        self._f.flush()
+        self._buffer.clear()
+        self._size = 0
+
+
+@contextmanager
+def writer(path: Path, max_memory: int = DEFAULT_MAX_MEMORY) -> Iterator[SpillWriter]:
+    """
+    Opens a spill for writing. The spill only appears at `path` once it is complete,
+    so an interrupted run never leaves a truncated spill behind. The spill is
+    compressed if `path` has a compressed extension (e.g. `.jsonl.gz`).
+    """
+    with io_handle(path) as f:
+        spill = SpillWriter(f, max_memory)
+        yield spill
+        spill.flush()
+
+
+def read(path: Path) -> Iterator[Tuple[FilePath, Authorship]]:
+    """Yields the per-file results of a spill, one at a time, in the order written"""
+    telemetry.add_file_size("cache_read_bytes_total", path)
+    with io_handle(path, "r") as f:
+        for line in f:
+            filepath, authorship = json.loads(line)
+            yield Path(filepath), authorship
+
+
+__all__ = ["DEFAULT_MAX_MEMORY", "SpillWriter", "writer", "read"]
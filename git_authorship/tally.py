@@ -0,0 +1,31 @@
+# Copyright (c) 2025 Joseph Hale
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+from collections import defaultdict
+from typing import Dict
+
+from ._types import Author
+from ._types import Authorship
+from ._types import License
+from ._types import LineCount
+
+UNKNOWN_LICENSE = "Unknown"
+"""The license of lines whose author has none"""
+
+
+def by_author(authorship: Authorship) -> Dict[Author, LineCount]:
+    """The lines of each author of a file/folder"""
+    return {author: info["lines"] for author, info in authorship.items()}
+
+
+def by_license(authorship: Authorship) -> Dict[License, LineCount]:
+    """The lines under each license of a file/folder"""
+    licensing: Dict[License, LineCount] = defaultdict(int)
+    for info in authorship.values():
+        licensing[info.get("license", UNKNOWN_LICENSE)] += info["lines"]
+    return licensing
+
+
+__all__ = ["UNKNOWN_LICENSE", "by_author", "by_license"]
@@ -0,0 +1,212 @@
+# Copyright (c) 2025 Joseph Hale
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+import functools
+import inspect
+import json
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from os import PathLike
+from pathlib import Path
+from typing import Callable
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
+from typing import TypeVar
+
+from git.cmd import Git
+
+from ._pathutils import io_handle
+from ._pathutils import Writeable
+
+try:
+    import resource
+except ImportError:  # e.g. on Windows
+    resource = None  # type: ignore
+
+PREFIX = "git_authorship_"
+
+Labels = Tuple[Tuple[str, str], ...]
+F = TypeVar("F", bound=Callable)
+
+
+class Metric(NamedTuple):
+    type: str
+    """`counter` or `gauge`"""
+    help: str
+
+
+METRICS = {
+    "git_subprocesses_total": Metric("counter", "git subprocesses spawned"),
+    "cache_read_bytes_total": Metric("counter", "Bytes of cache entries read"),
+    "export_written_bytes_total": Metric("counter", "Bytes written by each exporter"),
+    "phase_seconds": Metric("gauge", "Wall time of each phase of the run"),
+    "cpu_seconds_total": Metric("counter", "CPU time of Python and its git children"),
+    "peak_rss_bytes": Metric("gauge", "Peak resident memory of Python and git"),
+}
+
+_active: Optional["Telemetry"] = None
+"""The telemetry being collected (if any). Collection is a no-op otherwise."""
+
+
+class Telemetry:
+    """The resource usage of (part of) a run, as labelled counters and gauges"""
+
+    def __init__(self):
+        self.values: Dict[str, Dict[Labels, float]] = defaultdict(dict)
+        self._lock = threading.Lock()
+
+    def add(self, name: str, value: float, **labels: str):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self.values[name][key] = self.values[name].get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels: str):
+        with self._lock:
+            self.values[name][tuple(sorted(labels.items()))] = value
+
+    def sample_resources(self):
+        """Records the CPU time and peak memory of this process and its children"""
+        if resource is None:
+            return
+        # ru_maxrss is in kilobytes on Linux, but in bytes on macOS
+        rss_unit = 1 if sys.platform == "darwin" else 1024
+        for process, who in [
+            ("python", resource.RUSAGE_SELF),
+            ("git", resource.RUSAGE_CHILDREN),
+        ]:
+            usage = resource.getrusage(who)
+            self.set("cpu_seconds_total", usage.ru_utime, process=process, mode="user")
+            self.set(
+                "cpu_seconds_total", usage.ru_stime, process=process, mode="system"
+            )
+            self.set("peak_rss_bytes", usage.ru_maxrss * rss_unit, process=process)
+
+    def as_textfile(self, output: Writeable = Path("build/authorship.telemetry.prom")):
+        """
+        Exports the telemetry in the Prometheus text format, e.g. for the textfile
+        collector of `node_exporter`. Values are written exactly (integers as
+        integers, floats in their shortest round-tripping form).
+        """
+        lines: List[str] = []
+        for name, metric in METRICS.items():
+            if not (values := self.values.get(name)):
+                continue
+            lines.append(f"# HELP {PREFIX}{name} {metric.help}")
+            lines.append(f"# TYPE {PREFIX}{name} {metric.type}")
+            for labels, value in sorted(values.items()):
+                lines.append(f"{PREFIX}{name}{_labels(labels)} {_value(value)}")
+        lines.append("# EOF")
+        with io_handle(output) as f:
+            f.write("\n".join(lines) + "\n")
+
+    def as_json(self, output: Writeable = Path("build/authorship.telemetry.json")):
+        """Exports the telemetry as `{metric: [{"labels": {...}, "value": ...}]}`"""
+        with io_handle(output) as f:
+            json.dump(
+                {
+                    name: [
+                        {"labels": dict(labels), "value": value}
+                        for labels, value in sorted(self.values[name].items())
+                    ]
+                    for name in METRICS
+                    if self.values.get(name)
+                },
+                f,
+                indent=2,
+            )
+
+
+@contextmanager
+def collecting() -> Iterator[Telemetry]:
+    """
+    Collects the telemetry of everything run within the context (including the git
+    subprocesses spawned through GitPython).
+    """
+    global _active
+    telemetry = _active = Telemetry()
+    execute = Git.execute
+
+    @functools.wraps(execute)
+    def _counted(*args, **kwargs):
+        telemetry.add("git_subprocesses_total", 1)
+        return execute(*args, **kwargs)
+
+    Git.execute = _counted  # type: ignore[method-assign]
+    try:
+        yield telemetry
+    finally:
+        Git.execute = execute  # type: ignore[method-assign]
+        _active = None
+        telemetry.sample_resources()
+
+
+def add(name: str, value: float, **labels: str):
+    if _active is not None:
+        _active.add(name, value, **labels)
+
+
+def add_file_size(name: str, path: Writeable, **labels: str):
+    """Adds the size of the file at `path` (if a path, and if collecting)"""
+    if _active is not None and isinstance(path, (str, PathLike)):
+        _active.add(name, Path(path).stat().st_size, **labels)
+
+
+@contextmanager
+def phase(name: str):
+    """Records the wall time of a phase of the run (if collecting)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add("phase_seconds", time.perf_counter() - start, phase=name)
+
+
+def exporter(func: F) -> F:
+    """Records the bytes written to the `output` of an export function"""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        result = func(*args, **kwargs)
+        if _active is not None:
+            bound = inspect.signature(func).bind(*args, **kwargs)
+            bound.apply_defaults()
+            output = bound.arguments["output"]
+            add_file_size("export_written_bytes_total", output, exporter=func.__name__)
+        return result
+
+    return wrapper  # type: ignore[return-value]
+
+
+def _value(value: float) -> str:
+    return str(value) if isinstance(value, int) else repr(float(value))
+
+
+def _labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in labels
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+__all__ = [
+    "METRICS",
+    "Metric",
+    "Telemetry",
+    "collecting",
+    "add",
+    "add_file_size",
+    "phase",
+    "exporter",
+]
@@ -0,0 +1,126 @@
+# Copyright (c) 2025 Joseph Hale
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+import logging
+import time
+from typing import Callable
+from typing import Iterator
+from typing import Optional
+from typing import Tuple
+from typing import TypeVar
+
+from git import GitCommandError
+from git import Repo
+
+from . import prepare
+from ._types import Config
+from ._types import RepoAuthorship
+from .server import AuthorshipService
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def watch(
+    repo: Repo,
+    service: AuthorshipService,
+    on_change: Callable[[RepoAuthorship], None],
+    *,
+    branch: Optional[str] = None,
+    interval: float = 60.0,
+    debounce: float = 10.0,
+    sleep: Callable[[float], None] = time.sleep,
+    config: Optional[
+        Callable[[], Tuple[Config.AuthorLicenses, Config.Pseudonyms]]
+    ] = None,
+    prepare_repo: bool = False,
+):
+    """
+    Recomputes authorship whenever the watched ref moves, calling `on_change` with
+    each new result. Runs until interrupted.
+
+    Args:
+        branch (str): The branch/revision to follow. Defaults to the remote's HEAD.
+        interval (float): Seconds between polls of the remote.
+        debounce (float): Seconds a new revision must stay put before recomputing,
+            so that a burst of pushes results in a single recompute.
+        config (Callable): Re-reads the licenses and pseudonyms (at every poll).
+            Changes are re-applied without re-blaming anything.
+        prepare_repo (bool): Whether to `prepare` the repo for blame after each
+            fetched revision (only new commits are added to the commit-graph).
+    """
+    service.refresh()
+    on_change(service.authorship)
+
+    def poll():
+        configured = config() if config is not None else None
+        return poll_revision(repo, branch), configured
+
+    try:
+        for revision, configured in debounced(
+            poll,
+            interval=interval,
+            debounce=debounce,
+            sleep=sleep,
+            initial=(repo.head.commit.hexsha, config() if config else None),
+        ):
+            if configured is not None:
+                licenses, pseudonyms = configured
+                service.reconfigure(licenses=licenses, pseudonyms=pseudonyms)
+            if revision != repo.head.commit.hexsha:
+                log.info(f"Watched ref moved to {revision}")
+                repo.git.checkout("--detach", revision)
+                if prepare_repo:
+                    prepare.prepare(repo)
+            service.refresh()
+            on_change(service.authorship)
+    except KeyboardInterrupt:
+        pass
+
+
+def poll_revision(repo: Repo, branch: Optional[str] = None) -> str:
+    """Fetches from `origin` (if any), then resolves the watched ref to a commit."""
+    if "origin" not in repo.remotes:
+        return repo.head.commit.hexsha
+    try:
+        repo.remotes.origin.fetch()
+    except GitCommandError as e:
+        log.warning(f"Failed to fetch from origin: {e}")
+    ref = f"origin/{branch}" if branch else "origin/HEAD"
+    try:
+        return repo.git.rev_parse("--verify", f"{ref}^{{commit}}")
+    except GitCommandError:  # e.g. `branch` is a tag or commit, not a branch
+        return repo.git.rev_parse("--verify", f"{branch or 'HEAD'}^{{commit}}")
+
+
+def debounced(
+    poll: Callable[[], T],
+    *,
+    interval: float,
+    debounce: float,
+    sleep: Callable[[float], None] = time.sleep,
+    initial: Optional[T] = None,
+) -> Iterator[T]:
+    """
+    Yields each new value of `poll()` (compared to `initial`, if given), but only once
+    it has stayed unchanged for `debounce` seconds.
+    """
+    last = initial if initial is not None else poll()
+    while True:
+        if (current := poll()) == last:
+            sleep(interval)
+            continue
+        while True:
+            sleep(debounce)
+            if (latest := poll()) == current:
+                break
+            current = latest
+        if current != last:
+            last = current
+            yield current
+
+
+__all__ = ["watch", "poll_revision", "debounced"]
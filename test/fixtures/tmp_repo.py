@@ -1,5 +1,6 @@
 from pathlib import Path
 from typing import List
+from typing import Optional
 from typing import Tuple
 from typing import Union
 
@@ -55,7 +56,13 @@ class TemporaryRepository:
 
         self._index.add(path)
 
-    def commit(self, message: str, author_name: str, author_email: str):
+    def commit(
+        self,
+        message: str,
+        author_name: str,
+        author_email: str,
+        author_date: Optional[str] = None,
+    ):
         author = Actor(author_name, author_email)
-        commit = self._index.commit(message, author=author)
+        commit = self._index.commit(message, author=author, author_date=author_date)
         return commit
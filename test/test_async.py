@@ -0,0 +1,110 @@
+import asyncio
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from test.fixtures.tmp_repo import TemporaryRepository
+
+import pytest
+from git import Repo
+
+from git_authorship import authorship
+from git_authorship.cache import Cache
+from git_authorship.journal import Journal
+
+
+@pytest.fixture
+def repo():
+    with TemporaryDirectory() as d:
+        repo = TemporaryRepository(d)
+        (Path(repo.dir) / "src").mkdir()
+        repo.set_file("src/app.py", "a = 1\nb = 2\nc = 3\n")
+        repo.set_file("src/util.py", "x = 1\n")
+        repo.set_file("README.md", "# Readme\n")
+        repo.commit("Initial commit", "Alice", "alice@example.com")
+        repo.set_file("src/app.py", "a = 1\nb = 20\nc = 3\nd = 4\n")
+        repo.commit("Edit app", "Bob", "bob@example.com")
+        yield repo
+
+
+@pytest.mark.parametrize("collect_metrics", [False, True])
+def test_same_result_as_sync(
+    repo: TemporaryRepository, tmp_path: Path, collect_metrics: bool
+):
+    expected = authorship.for_repo(
+        Repo(repo.dir), cache_dir=tmp_path / "sync", collect_metrics=collect_metrics
+    )
+
+    result = asyncio.run(
+        authorship.for_repo_async(
+            Repo(repo.dir),
+            cache_dir=tmp_path / "async",
+            collect_metrics=collect_metrics,
+            concurrency=2,
+        )
+    )
+
+    assert result == expected
+    assert Cache(tmp_path / "sync").keys() == Cache(tmp_path / "async").keys()
+
+
+def test_same_bounded_result_as_sync(repo: TemporaryRepository, tmp_path: Path):
+    expected = authorship.for_repo(
+        Repo(repo.dir), cache_dir=tmp_path / "sync", since="HEAD~1"
+    )
+
+    result = asyncio.run(
+        authorship.for_repo_async(
+            Repo(repo.dir), cache_dir=tmp_path / "async", since="HEAD~1"
+        )
+    )
+
+    assert result == expected
+    assert result[Path("src/app.py")] == {
+        "before HEAD~1": {"lines": 2},
+        "Bob <bob@example.com>": {"lines": 2},
+    }
+
+
+def test_reports_progress(repo: TemporaryRepository, tmp_path: Path):
+    progress = []
+
+    asyncio.run(
+        authorship.for_repo_async(
+            Repo(repo.dir),
+            cache_dir=tmp_path,
+            progress=lambda done, total: progress.append((done, total)),
+        )
+    )
+
+    assert progress == [(1, 3), (2, 3), (3, 3)]
+
+
+def test_cancellation_stops_every_blame(
+    repo: TemporaryRepository, tmp_path: Path, monkeypatch
+):
+    blamed = []
+
+    async def _slow_git(repo, *args):
+        blamed.append(args[-1])
+        await asyncio.sleep(10 if args[-1] != "README.md" else 0)
+        return b""
+
+    monkeypatch.setattr(authorship, "git_async", _slow_git)
+
+    async def _cancelled():
+        task = asyncio.ensure_future(
+            authorship.for_repo_async(Repo(repo.dir), cache_dir=tmp_path, concurrency=3)
+        )
+        while len(blamed) < 3:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        await task
+
+    start = time.monotonic()
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(_cancelled())
+
+    assert time.monotonic() - start < 5
+    assert Cache(tmp_path).keys() == []
+    [journal] = tmp_path.glob("*.journal")
+    assert list(Journal(journal).read()) == [Path("README.md")]
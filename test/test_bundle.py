@@ -0,0 +1,166 @@
+import gzip
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from test.fixtures.tmp_dir_factory import TemporaryDirectoryFactory
+from test.fixtures.tmp_repo import TemporaryRepository
+
+import pytest
+from git import Repo
+
+from git_authorship import authorship
+from git_authorship import bundle
+from git_authorship._types import RepoAuthorship
+from git_authorship.cache import Cache
+from git_authorship.cli import run
+from git_authorship.exceptions import BundleException
+
+AUTHORSHIP: RepoAuthorship = {
+    Path("greeting.txt"): {"Alice <alice@example.com>": {"lines": 1}}
+}
+KEY = authorship.cache_key("abc123")
+
+
+@pytest.fixture
+def repo():
+    with TemporaryDirectory() as d:
+        repo = TemporaryRepository(d)
+        repo.set_file("greeting.txt", "Hello\n")
+        repo.commit("Initial commit", "Alice", "alice@example.com")
+        yield repo
+
+
+@pytest.fixture
+def tmpdirs():
+    with TemporaryDirectoryFactory() as factory:
+        yield factory
+
+
+def test_cache_keys_depend_on_blame_options():
+    assert KEY.startswith("abc123-")
+    assert KEY == authorship.cache_key("abc123")
+    assert KEY != authorship.cache_key("abc123", ignore_revs_file="other-revs")
+
+
+def test_bundles_round_trip(tmp_path: Path):
+    source = Cache(tmp_path / "source")
+    source.put(KEY, AUTHORSHIP)
+    source.put(authorship.cache_key("def456"), AUTHORSHIP)
+
+    exported = bundle.export_bundle(source, tmp_path / "b.json.gz", ["abc"])
+    imported = bundle.import_bundle(Cache(tmp_path / "dest"), tmp_path / "b.json.gz")
+
+    assert exported == imported == [KEY]
+    assert Cache(tmp_path / "dest").get(KEY) == AUTHORSHIP
+
+
+def test_rejects_tampered_bundles(tmp_path: Path):
+    source = Cache(tmp_path / "source")
+    source.put(KEY, AUTHORSHIP)
+    bundle.export_bundle(source, tmp_path / "b.json.gz")
+    with gzip.open(tmp_path / "b.json.gz", "rb") as f:
+        contents = json.loads(f.read())
+    contents["entries"][0]["authorship"]["greeting.txt"] = {"Mallory": {"lines": 1}}
+    with gzip.open(tmp_path / "b.json.gz", "wb") as f:
+        f.write(json.dumps(contents).encode())
+
+    with pytest.raises(BundleException, match="checksum"):
+        bundle.import_bundle(Cache(tmp_path / "dest"), tmp_path / "b.json.gz")
+    assert Cache(tmp_path / "dest").entries() == []
+
+
+def test_rejects_entries_for_other_revisions():
+    entry = bundle.make_entry(KEY, AUTHORSHIP)
+
+    with pytest.raises(BundleException, match="revision"):
+        bundle.verify_entry(entry, "def456")
+
+
+def test_rejects_entries_moved_to_other_keys():
+    entry = {**bundle.make_entry(KEY, AUTHORSHIP), "key": "def456-0"}
+
+    with pytest.raises(BundleException, match="checksum"):
+        bundle.verify_entry(entry)
+
+
+def test_imports_only_the_given_revisions(tmp_path: Path):
+    source = Cache(tmp_path / "source")
+    source.put(KEY, AUTHORSHIP)
+    source.put(authorship.cache_key("def456"), AUTHORSHIP)
+    bundle.export_bundle(source, tmp_path / "b.json.gz")
+
+    imported = bundle.import_bundle(
+        Cache(tmp_path / "dest"), tmp_path / "b.json.gz", ["abc"]
+    )
+
+    assert imported == [KEY]
+    with pytest.raises(BundleException, match="no entries"):
+        bundle.import_bundle(Cache(tmp_path / "dest"), tmp_path / "b.json.gz", ["fed"])
+
+
+def test_rejects_unknown_files(tmp_path: Path):
+    (tmp_path / "b.json.gz").write_text("not a bundle")
+
+    with pytest.raises(BundleException):
+        bundle.import_bundle(Cache(tmp_path), tmp_path / "b.json.gz")
+
+
+def test_exporting_missing_revisions_fails(tmp_path: Path):
+    with pytest.raises(BundleException):
+        bundle.export_bundle(Cache(tmp_path), tmp_path / "b.json.gz", ["abc123"])
+
+
+def test_notes_round_trip(repo: TemporaryRepository):
+    git_repo = Repo(repo.dir)
+    key = authorship.cache_key(git_repo.head.commit.hexsha)
+    other_key = authorship.cache_key(git_repo.head.commit.hexsha, ignore_revs_file="x")
+
+    bundle.write_note(git_repo, key, AUTHORSHIP)
+    bundle.write_note(git_repo, other_key, {})
+
+    assert bundle.read_note(git_repo, key) == AUTHORSHIP
+    assert bundle.read_note(git_repo, other_key) == {}
+    assert bundle.read_note(git_repo, authorship.cache_key("abc123")) is None
+
+
+@pytest.mark.parametrize("note", ["[1, 2]", '{"entries": 1}', '{"entries": [1]}'])
+def test_malformed_notes_are_ignored(repo: TemporaryRepository, note: str):
+    git_repo = Repo(repo.dir)
+    key = authorship.cache_key(git_repo.head.commit.hexsha)
+    git_repo.git.notes(
+        "--ref", bundle.NOTES_REF, "add", "-m", note, "HEAD", env=bundle.NOTES_AUTHOR
+    )
+
+    assert bundle.read_note(git_repo, key) is None
+    bundle.write_note(git_repo, key, AUTHORSHIP)
+    assert bundle.read_note(git_repo, key) == AUTHORSHIP
+
+
+def test_fresh_clones_reuse_results_from_notes(
+    repo: TemporaryRepository, tmpdirs: TemporaryDirectoryFactory, monkeypatch
+):
+    # fmt: off
+    run([repo.dir, "--clone-to", (first := tmpdirs.new()), "--output", (out := tmpdirs.new()), "--notes"])  # noqa: E501
+    Repo(first).git.push("origin", bundle.NOTES_REF)
+
+    def _blame(*args, **kwargs):
+        raise AssertionError("Results should have been reused from git notes")
+    monkeypatch.setattr(authorship, "for_file", _blame)
+    run([repo.dir, "--clone-to", tmpdirs.new(), "--output", (reused := tmpdirs.new()), "--notes"])  # noqa: E501
+    # fmt: on
+
+    with open(f"{out}/authorship.json") as f, open(f"{reused}/authorship.json") as g:
+        assert json.load(f) == json.load(g)
+
+
+def test_cache_export_and_import_commands(
+    repo: TemporaryRepository, tmpdirs: TemporaryDirectoryFactory, capsys
+):
+    run([repo.dir, "--clone-to", tmpdirs.new(), "--output", (out := tmpdirs.new())])
+    bundle_path = f"{tmpdirs.new()}/cache.json.gz"
+
+    run(["cache", "export", bundle_path, "--output", out])
+    run(["cache", "import", bundle_path, "--output", (dest := tmpdirs.new())])
+
+    assert "Exported 1 entries" in capsys.readouterr().out
+    assert Cache(Path(dest) / "cache").stats().entries == 1
@@ -0,0 +1,94 @@
+import os
+import threading
+import time
+from pathlib import Path
+
+from git_authorship._types import RepoAuthorship
+from git_authorship.cache import Cache
+from git_authorship.cli import run
+
+AUTHORSHIP: RepoAuthorship = {
+    Path("greeting.txt"): {"Alice <alice@example.com>": {"lines": 1}}
+}
+
+
+def _put(cache: Cache, key: str, last_access: float):
+    cache.put(key, AUTHORSHIP)
+    os.utime(cache.path(key), (last_access, last_access))
+
+
+def test_reads_back_written_entries(tmp_path: Path):
+    cache = Cache(tmp_path / "cache")
+    cache.put("abc123", AUTHORSHIP)
+
+    assert cache.get("abc123") == AUTHORSHIP
+    assert cache.get("def456") is None
+    assert not [p for p in (tmp_path / "cache").iterdir() if p.suffix == ".tmp"]
+
+
+def test_reads_refresh_last_access(tmp_path: Path):
+    cache = Cache(tmp_path)
+    _put(cache, "abc123", time.time() - 1000)
+
+    cache.get("abc123")
+
+    assert time.time() - cache.entries()[0].last_access < 100
+
+
+def test_prunes_least_recently_used_entries_beyond_max_size(tmp_path: Path):
+    cache = Cache(tmp_path)
+    now = time.time()
+    _put(cache, "old", now - 300)
+    _put(cache, "newest", now - 100)
+    _put(cache, "middle", now - 200)
+    size = cache.path("old").stat().st_size
+
+    removed = cache.prune(max_size=2 * size)
+
+    assert removed == [cache.path("old")]
+    assert [e.path.stem for e in cache.entries()] == ["middle", "newest"]
+
+
+def test_prunes_entries_beyond_max_age(tmp_path: Path):
+    cache = Cache(tmp_path)
+    _put(cache, "old", time.time() - 3 * 24 * 60 * 60)
+    _put(cache, "new", time.time())
+
+    cache.prune(max_age=24 * 60 * 60)
+
+    assert [e.path.stem for e in cache.entries()] == ["new"]
+
+
+def test_writes_wait_for_prunes(tmp_path: Path):
+    cache = Cache(tmp_path)
+    cache.put("abc123", AUTHORSHIP)
+
+    with cache._lock():  # (As held by `prune`)
+        writer = threading.Thread(target=cache.put, args=("def456", AUTHORSHIP))
+        writer.start()
+        writer.join(timeout=0.2)
+        assert writer.is_alive()
+        assert cache.get("def456") is None
+    writer.join()
+
+    assert cache.get("def456") == AUTHORSHIP
+
+
+def test_verifies_entries(tmp_path: Path):
+    cache = Cache(tmp_path)
+    cache.put("valid", AUTHORSHIP)
+    cache.path("truncated").write_text('{"greeting.txt": {"Alice')
+    cache.path("malformed").write_text('{"greeting.txt": {"Alice": 1}}')
+
+    problems = cache.verify(fix=True)
+
+    assert sorted(path.stem for path, _ in problems) == ["malformed", "truncated"]
+    assert [e.path.stem for e in cache.entries()] == ["valid"]
+
+
+def test_cache_command_shows_stats(tmp_path: Path, capsys):
+    Cache(tmp_path / "cache").put("abc123", AUTHORSHIP)
+
+    run(["cache", "stats", "--output", str(tmp_path)])
+
+    assert "Entries: 1" in capsys.readouterr().out
@@ -0,0 +1,132 @@
+import json
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from test.fixtures.tmp_dir_factory import TemporaryDirectoryFactory
+from test.fixtures.tmp_repo import TemporaryRepository
+
+import pytest
+from git import Repo
+
+from git_authorship import authorship
+from git_authorship import classify
+from git_authorship._git import ls_tree
+from git_authorship.cache import Cache
+from git_authorship.cli import run
+
+ALICE = "Alice <alice@example.com>"
+BOB = "Bob <bob@example.com>"
+DAY = 24 * 60 * 60
+
+
+@pytest.fixture
+def repo():
+    with TemporaryDirectory() as d:
+        repo = TemporaryRepository(d)
+        repo.set_file(".gitattributes", "*.dat binary\ngen.js linguist-generated\n")
+        repo.set_file("app.py", "a = 1\nb = 2\n")
+        repo.set_file("logo.bin", b"\x89PNG\0\0\0")
+        repo.set_file("data.dat", "looks like text\n")
+        repo.set_file("gen.js", "x = 1\ny = 2\nz = 3\n")
+        repo.set_file("app.min.js", "x" * (classify.MAX_LINE_LENGTH + 1))
+        repo.set_file("yarn.lock", "dep@1\n")
+        repo.commit("Initial commit", "Alice", "alice@example.com")
+        repo.set_file("gen.js", "x = 10\ny = 2\nz = 3\nw = 4\n")
+        repo.commit("Regenerate", "Bob", "bob@example.com")
+        yield repo
+
+
+@pytest.fixture
+def tmpdirs():
+    with TemporaryDirectoryFactory() as factory:
+        yield factory
+
+
+def test_blob_stats(repo: TemporaryRepository):
+    blobs = {e.path: e.object for e in ls_tree(Repo(repo.dir))}
+    stats = {p: classify.blob_stats(Repo(repo.dir), b) for p, b in blobs.items()}
+
+    assert stats[Path("app.py")] == classify.BlobStats(False, 2, 5)
+    assert stats[Path("logo.bin")].binary
+    assert stats[Path("app.min.js")] == classify.BlobStats(
+        False, 1, classify.MAX_LINE_LENGTH + 1
+    )
+
+
+def test_classify(repo: TemporaryRepository):
+    classes = classify.classify(Repo(repo.dir), ls_tree(Repo(repo.dir)))
+
+    assert {p: c.kind for p, c in classes.items()} == {
+        Path(".gitattributes"): classify.TEXT,
+        Path("app.py"): classify.TEXT,
+        Path("logo.bin"): classify.BINARY,
+        Path("data.dat"): classify.BINARY,
+        Path("gen.js"): classify.GENERATED,
+        Path("app.min.js"): classify.GENERATED,
+        Path("yarn.lock"): classify.GENERATED,
+    }
+    assert classes[Path("gen.js")].lines == 4
+
+
+def test_blob_stats_are_reused(repo: TemporaryRepository, tmp_path: Path, monkeypatch):
+    blobs = classify.BlobCache(tmp_path / classify.BLOBS_FILENAME)
+    classify.classify(Repo(repo.dir), ls_tree(Repo(repo.dir)), blobs)
+    blobs.save()
+
+    scanned = []
+    monkeypatch.setattr(classify, "blob_stats", lambda repo, blob: scanned.append(blob))
+    blobs = classify.BlobCache(tmp_path / classify.BLOBS_FILENAME).load()
+    classify.classify(Repo(repo.dir), ls_tree(Repo(repo.dir)), blobs)
+
+    # (`data.dat` is binary by its attributes, so its content is never read)
+    assert len(blobs.stats) == 6
+    assert scanned == []
+
+
+def test_blob_stats_are_pruned(repo: TemporaryRepository, tmp_path: Path):
+    cache = Cache(tmp_path)
+    cache.put("abc123", {})
+    blobs = classify.BlobCache(tmp_path / classify.BLOBS_FILENAME)
+    classify.classify(Repo(repo.dir), ls_tree(Repo(repo.dir)), blobs)
+    blobs.save()
+    blobs.last_used["stale"] = time.time() - 3 * DAY
+    blobs.stats["stale"] = classify.BlobStats(False, 1, 1)
+    blobs._write()
+
+    cache.prune(max_age=DAY)
+    assert "stale" not in classify.BlobCache(blobs.path).load().stats
+    assert len(classify.BlobCache(blobs.path).load().stats) == 6
+
+    cache.prune(max_size=0)
+    assert not blobs.path.exists()
+
+
+def test_unblamed_files(repo: TemporaryRepository, tmp_path: Path):
+    result = authorship.for_repo(
+        Repo(repo.dir), cache_dir=tmp_path, classify_files=True, collect_metrics=True
+    )
+
+    # (Like empty files, files without authors aren't reported)
+    assert Path("logo.bin") not in result
+    assert Path("data.dat") not in result
+    assert result[Path("gen.js")].keys() == {BOB}
+    assert result[Path("gen.js")][BOB]["lines"] == 4
+    assert result[Path("gen.js")][BOB]["commits"] == 1
+    assert result[Path("app.py")][ALICE]["lines"] == 2
+    assert (tmp_path / classify.BLOBS_FILENAME).is_file()
+
+
+def test_cli_classify(repo: TemporaryRepository, tmpdirs: TemporaryDirectoryFactory):
+    # fmt: off
+    run([
+        repo.dir,
+        "--clone-to", tmpdirs.new(),
+        "--output", (output := tmpdirs.new()),
+        "--classify",
+    ])
+    # fmt: on
+
+    with open(f"{output}/authorship.json") as f:
+        report = json.load(f)
+    assert report["yarn.lock"] == {ALICE: {"lines": 1}}
+    assert "logo.bin" not in report
@@ -4,6 +4,7 @@ from pytest import raises as assertRaises
 
 from git_authorship.cli import DEFAULT_IGNORE_EXTENSIONS
 from git_authorship.cli import parse_args
+from git_authorship.shard import Shard
 
 
 def test_default_args():
@@ -15,10 +16,13 @@ def test_default_args():
     assert args.branch is None
     assert args.author_licenses is None
     assert args.pseudonyms is None
+    assert args.aliases is None
     assert args.ignore_extensions == DEFAULT_IGNORE_EXTENSIONS
     assert args.ignore_revs_file == ".git-blame-ignore-revs"
     assert args.use_cache is True
     assert args.show_version is False
+    assert args.serve is None
+    assert args.watch is False
 
 
 def test_version():
@@ -94,3 +98,128 @@ def test_pseudonyms_existing_path():
 def test_ignore_revs():
     args = parse_args(["--ignore-revs-file", ".other-ignore-revs-file"])
     assert args.ignore_revs_file == ".other-ignore-revs-file"
+
+
+def test_aliases_nonexistent_path():
+    with assertRaises(FileNotFoundError):
+        parse_args(["--aliases", "nonexistent.csv"])
+
+
+def test_aliases_rejects_folder_path():
+    with assertRaises(ValueError, match="--aliases cannot be a folder"):
+        parse_args(["--aliases", str(Path(__file__).parent)])
+
+
+def test_aliases_existing_path():
+    args = parse_args(["--aliases", "test/fixtures/aliases.csv"])
+    assert args.aliases == Path("test/fixtures/aliases.csv")
+
+
+def test_serve():
+    args = parse_args(["--serve", "127.0.0.1:8765"])
+    assert args.serve == "127.0.0.1:8765"
+
+
+def test_watch():
+    args = parse_args(["--watch", "--watch-interval", "5", "--debounce", "2"])
+    assert args.watch is True
+    assert args.watch_interval == 5.0
+    assert args.debounce == 2.0
+
+
+def test_watch_rejects_serve():
+    with assertRaises(ValueError, match="--serve and --watch cannot be combined"):
+        parse_args(["--watch", "--serve", "127.0.0.1:8765"])
+
+
+def test_shard():
+    args = parse_args(["--shard", "3/16", "--shard-strategy", "cost"])
+    assert args.shard == Shard(3, 16)
+    assert args.shard_strategy == "cost"
+
+
+def test_shard_rejects_invalid_spec():
+    with assertRaises(ValueError, match="K/N"):
+        parse_args(["--shard", "three"])
+
+
+def test_paths():
+    args = parse_args(["--path", "services/billing/", "--path", "docs", "--update"])
+    assert args.paths == [Path("services/billing"), Path("docs")]
+    assert args.update is True
+
+
+def test_update_requires_paths():
+    with assertRaises(ValueError, match="--update requires at least one --path"):
+        parse_args(["--update"])
+
+
+def test_max_memory():
+    args = parse_args(["--max-memory", "512"])
+    assert args.max_memory == 512
+
+
+def test_max_memory_rejects_path():
+    with assertRaises(ValueError, match="--max-memory cannot be combined"):
+        parse_args(["--max-memory", "512", "--path", "docs"])
+
+
+def test_diff():
+    args = parse_args(["--diff", "v1.4..v1.5"])
+    assert args.diff == ("v1.4", "v1.5")
+
+
+def test_diff_rejects_invalid_range():
+    with assertRaises(ValueError, match="OLD..NEW"):
+        parse_args(["--diff", "v1.4"])
+
+
+def test_sample():
+    args = parse_args(["--sample", "200", "--sample-seed", "7"])
+    assert args.sample == 200
+    assert args.sample_seed == 7
+
+
+def test_sample_rejects_diff():
+    with assertRaises(ValueError, match="--sample cannot be combined"):
+        parse_args(["--sample", "200", "--diff", "v1..v2"])
+
+
+def test_compress():
+    args = parse_args(["--compress", "gzip"])
+    assert args.compress == "gzip"
+
+
+def test_metrics_rejects_update():
+    with assertRaises(ValueError, match="--metrics cannot be combined"):
+        parse_args(["--metrics", "--path", "docs", "--update"])
+
+
+def test_plan():
+    args = parse_args(["--plan", "--path", "docs"])
+    assert args.plan is True
+
+
+def test_plan_rejects_shard():
+    with assertRaises(ValueError, match="--plan cannot be combined"):
+        parse_args(["--plan", "--shard", "1/2"])
+
+
+def test_submodules_rejects_max_memory():
+    with assertRaises(ValueError, match="--submodules cannot be combined"):
+        parse_args(["--submodules", "--max-memory", "64"])
+
+
+def test_telemetry_rejects_serve():
+    with assertRaises(ValueError, match="--telemetry cannot be combined"):
+        parse_args(["--telemetry", "--serve", "localhost:8000"])
+
+
+def test_classify_rejects_max_memory():
+    with assertRaises(ValueError, match="--classify cannot be combined"):
+        parse_args(["--classify", "--max-memory", "64"])
+
+
+def test_since():
+    args = parse_args(["--since", "2 years ago"])
+    assert args.since == "2 years ago"
@@ -0,0 +1,82 @@
+import gzip
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from test.fixtures.tmp_dir_factory import TemporaryDirectoryFactory
+from test.fixtures.tmp_repo import TemporaryRepository
+
+import pytest
+
+from git_authorship import _pathutils
+from git_authorship._pathutils import io_handle
+from git_authorship._types import RepoAuthorship
+from git_authorship.cache import Cache
+from git_authorship.cli import run
+
+AUTHORSHIP: RepoAuthorship = {
+    Path("greeting.txt"): {"Alice <alice@example.com>": {"lines": 1}}
+}
+
+
+@pytest.fixture
+def tmpdirs():
+    with TemporaryDirectoryFactory() as factory:
+        yield factory
+
+
+def test_compresses_by_extension(tmp_path: Path):
+    with io_handle(tmp_path / "report.csv.gz") as f:
+        f.write("path,author\n")
+
+    with gzip.open(tmp_path / "report.csv.gz", "rt") as f:
+        assert f.read() == "path,author\n"
+    with io_handle(tmp_path / "report.csv.gz", "r") as f:
+        assert f.read() == "path,author\n"
+
+
+def test_compressed_outputs_are_reproducible(tmp_path: Path):
+    for name in ["a.json.gz", "b.json.gz"]:
+        with io_handle(tmp_path / name) as f:
+            f.write("{}")
+
+    assert (tmp_path / "a.json.gz").read_bytes() == (
+        tmp_path / "b.json.gz"
+    ).read_bytes()
+
+
+@pytest.mark.skipif(_pathutils.zstandard is not None, reason="zstandard is installed")
+def test_zstd_requires_zstandard(tmp_path: Path):
+    with pytest.raises(ValueError, match="zstandard"):
+        Cache(tmp_path, "zstd")
+
+
+def test_cache_reads_entries_of_any_compression(tmp_path: Path):
+    Cache(tmp_path, "gzip").put("abc123", AUTHORSHIP)
+    Cache(tmp_path).put("def456", AUTHORSHIP)
+
+    assert (tmp_path / "abc123.json.gz").is_file()
+    assert Cache(tmp_path).get("abc123") == AUTHORSHIP
+    assert Cache(tmp_path, "gzip").get("def456") == AUTHORSHIP
+    assert sorted(Cache(tmp_path).keys()) == ["abc123", "def456"]
+    assert Cache(tmp_path).verify() == []
+
+
+def test_compressed_reports_match_uncompressed_reports(
+    tmpdirs: TemporaryDirectoryFactory,
+):
+    with TemporaryDirectory() as d:
+        repo = TemporaryRepository(d)
+        repo.set_file("greeting.txt", "Hello\n")
+        repo.commit("Initial commit", "Alice", "alice@example.com")
+
+        # fmt: off
+        run([repo.dir, "--clone-to", (clone_to := tmpdirs.new()), "--output", (plain := tmpdirs.new())])  # noqa: E501
+        run([repo.dir, "--clone-to", clone_to, "--output", (compressed := tmpdirs.new()), "--compress", "gzip"])  # noqa: E501
+        # fmt: on
+
+    for name in ["authorship.json", "authorship.csv"]:
+        with open(f"{plain}/{name}") as f, gzip.open(
+            f"{compressed}/{name}.gz", "rt"
+        ) as g:
+            assert f.read() == g.read()
+    assert Path(f"{compressed}/authorship.html.gz").is_file()
+    assert list(Path(f"{compressed}/cache").glob("*.json.gz"))
@@ -0,0 +1,27 @@
+from test.fixtures import tmp_file
+
+from pytest import raises as assertRaises
+
+from git_authorship.config import load_aliases_config
+from git_authorship.exceptions import ConfigException
+
+
+def test_rejects_csv_with_too_many_columns():
+    config = "RANDOM ALIAS,RANDOM AUTHOR,EXTRA COLUMN"
+    with tmp_file.with_content(config) as tf:
+        with assertRaises(ConfigException):
+            load_aliases_config(tf.name)
+
+
+def test_rejects_csv_with_too_few_columns():
+    config = "RANDOM ALIAS"
+    with tmp_file.with_content(config) as tf:
+        with assertRaises(ConfigException):
+            load_aliases_config(tf.name)
+
+
+def test_parses_csvs_with_correct_columns():
+    config = "Aliz <aliz@example.com>,Alice <alice@example.com>"
+    with tmp_file.with_content(config) as tf:
+        config = load_aliases_config(tf.name)
+        assert config == {"Aliz <aliz@example.com>": "Alice <alice@example.com>"}
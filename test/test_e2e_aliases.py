@@ -0,0 +1,71 @@
+from tempfile import TemporaryDirectory
+from test.fixtures import tmp_file
+from test.fixtures.tmp_dir_factory import TemporaryDirectoryFactory
+from test.fixtures.tmp_repo import TemporaryRepository
+
+import pytest
+
+from git_authorship.cli import run
+
+
+@pytest.fixture
+def repo():
+    with TemporaryDirectory() as d:
+        repo = TemporaryRepository(d)
+
+        repo.set_file("greeting.txt", "Hello, world!\n")
+        repo.commit("Initial commit", "Alice", "alice@example.com")
+
+        repo.append_file("greeting.txt", "Hello, everyone!\n")
+        repo.commit("Second commit", "Aliz", "aliz@example.com")
+
+        repo.set_file("farewell.txt", "Goodbye, world!\n")
+        repo.commit("Third commit", "Bob", "bob@example.com")
+
+        yield repo
+
+
+@pytest.fixture
+def tmpdirs():
+    with TemporaryDirectoryFactory() as factory:
+        yield factory
+
+
+def test_aliases_merged_in_authorship(
+    snapshot, repo: TemporaryRepository, tmpdirs: TemporaryDirectoryFactory
+):
+    # fmt: off
+    run([
+        repo.dir,
+        "--clone-to", tmpdirs.new(),
+        "--aliases", "./test/fixtures/aliases.csv",
+        "--output", (output := tmpdirs.new()),
+    ])
+    # fmt: on
+
+    with open(f"{output}/authorship.csv", "r") as f:
+        snapshot.assert_match(f.read(), "authorship.csv")
+
+
+def test_alias_changes_reuse_cached_blame(
+    snapshot, repo: TemporaryRepository, tmpdirs: TemporaryDirectoryFactory
+):
+    aliases = [
+        "Aliz <aliz@example.com>,Alice <alice@example.com>",
+        "Bob <bob@example.com>,Alice <alice@example.com>",
+    ]
+    clone_to = tmpdirs.new()
+    output = tmpdirs.new()
+    for idx, config in enumerate(aliases):
+        with tmp_file.with_content(config) as tf:
+            # fmt: off
+            run([
+                repo.dir,
+                "--clone-to", clone_to,
+                "--aliases", tf.name,
+                "--output", output,
+            ])
+            # fmt: on
+
+        with open(f"{output}/authorship.csv", "r") as f:
+            snapshot.assert_match(f.read(), f"authorship_{idx}.csv")
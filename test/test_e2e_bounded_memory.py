@@ -0,0 +1,61 @@
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from test.fixtures.tmp_dir_factory import TemporaryDirectoryFactory
+from test.fixtures.tmp_repo import TemporaryRepository
+
+import pytest
+
+from git_authorship.cli import run
+
+
+@pytest.fixture
+def repo():
+    with TemporaryDirectory() as d:
+        repo = TemporaryRepository(d)
+
+        (Path(repo.dir) / "src" / "app").mkdir(parents=True)
+        (Path(repo.dir) / "src-extra").mkdir()
+        repo.set_file("README.md", "# App\n")
+        repo.set_file("src/app/main.py", "print('main')\n")
+        repo.set_file("src/util.py", "print('util')\n")
+        repo.set_file("src-extra/more.py", "print('more')\n")
+        repo.commit("Initial commit", "Alice", "alice@example.com")
+
+        repo.append_file("src/app/main.py", "print('more main')\n")
+        repo.commit("Second commit", "Bob", "bob@example.com")
+
+        yield repo
+
+
+@pytest.fixture
+def tmpdirs():
+    with TemporaryDirectoryFactory() as factory:
+        yield factory
+
+
+def test_bounded_memory_reports_match_in_memory_reports(
+    repo: TemporaryRepository, tmpdirs: TemporaryDirectoryFactory
+):
+    clone_to = tmpdirs.new()
+    # fmt: off
+    run([
+        repo.dir,
+        "--clone-to", clone_to,
+        "--author-licenses", "./test/fixtures/licensing.csv",
+        "--output", (full := tmpdirs.new()),
+    ])
+    run([
+        repo.dir,
+        "--clone-to", clone_to,
+        "--author-licenses", "./test/fixtures/licensing.csv",
+        "--output", (bounded := tmpdirs.new()),
+        "--max-memory", "1",
+    ])
+    # fmt: on
+
+    with open(f"{full}/authorship.json") as f, open(f"{bounded}/authorship.json") as g:
+        assert json.load(f) == json.load(g)
+    with open(f"{full}/authorship.csv") as f, open(f"{bounded}/authorship.csv") as g:
+        assert sorted(f.readlines()) == sorted(g.readlines())
+    assert (Path(bounded) / "authorship.html").is_file()
@@ -0,0 +1,78 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from test.fixtures.tmp_dir_factory import TemporaryDirectoryFactory
+from test.fixtures.tmp_repo import TemporaryRepository
+
+import pytest
+from git import Repo
+
+from git_authorship import authorship
+from git_authorship.cli import run
+
+
+@pytest.fixture
+def repo():
+    with TemporaryDirectory() as d:
+        repo = TemporaryRepository(d)
+
+        (Path(repo.dir) / "src").mkdir()
+        repo.set_file("README.md", "# App\n")
+        repo.set_file("src/app.py", "print('app')\n")
+        repo.set_file("src/util.py", "print('util')\n")
+        repo.commit("Initial commit", "Alice", "alice@example.com")
+        Repo(repo.dir).create_tag("v1.4")
+
+        repo.append_file("src/app.py", "print('more app')\n")
+        repo.set_file("src/new.py", "print('new')\n")
+        repo.set_file("src/util.py", "print('utility')\n")
+        repo.commit("Second commit", "Bob", "bob@example.com")
+        Repo(repo.dir).create_tag("v1.5")
+
+        yield repo
+
+
+@pytest.fixture
+def tmpdirs():
+    with TemporaryDirectoryFactory() as factory:
+        yield factory
+
+
+def test_diff_between_revisions(
+    snapshot, repo: TemporaryRepository, tmpdirs: TemporaryDirectoryFactory
+):
+    # fmt: off
+    run([
+        repo.dir,
+        "--clone-to", tmpdirs.new(),
+        "--output", (output := tmpdirs.new()),
+        "--author-licenses", "./test/fixtures/licensing.csv",
+        "--diff", "v1.4..v1.5",
+    ])
+    # fmt: on
+
+    with open(f"{output}/authorship.diff.csv", "r") as f:
+        snapshot.assert_match(f.read(), "authorship.diff.csv")
+    with open(f"{output}/authorship.diff.json", "r") as f:
+        snapshot.assert_match(f.read(), "authorship.diff.json")
+
+
+def test_diff_only_blames_changed_files_at_the_new_revision(
+    repo: TemporaryRepository, tmpdirs: TemporaryDirectoryFactory, monkeypatch
+):
+    blamed = []
+    for_file = authorship.for_file
+
+    def _for_file(repo, path, **kwargs):
+        blamed.append((kwargs["rev"], path))
+        return for_file(repo, path, **kwargs)
+
+    monkeypatch.setattr(authorship, "for_file", _for_file)
+    authorship.for_revisions(
+        Repo(repo.dir), "v1.4", "v1.5", cache_dir=Path(tmpdirs.new())
+    )
+
+    assert [p for rev, p in blamed if rev == "v1.5"] == [
+        Path("src/app.py"),
+        Path("src/new.py"),
+        Path("src/util.py"),
+    ]
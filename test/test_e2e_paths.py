@@ -0,0 +1,102 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from test.fixtures.tmp_dir_factory import TemporaryDirectoryFactory
+from test.fixtures.tmp_repo import TemporaryRepository
+from unittest.mock import ANY
+
+import pytest
+from git import Repo
+
+from git_authorship import authorship
+from git_authorship.cli import run
+
+ALICE = "Alice <alice@example.com>"
+
+
+@pytest.fixture
+def repo():
+    with TemporaryDirectory() as d:
+        repo = TemporaryRepository(d)
+
+        (Path(repo.dir) / "services" / "billing").mkdir(parents=True)
+        (Path(repo.dir) / "services" / "search").mkdir(parents=True)
+        repo.set_file("README.md", "# Services\n")
+        repo.set_file("services/billing/invoice.py", "print('invoice')\n")
+        repo.set_file("services/search/query.py", "print('query')\n")
+        repo.commit("Initial commit", "Alice", "alice@example.com")
+
+        repo.append_file("services/billing/invoice.py", "print('paid')\n")
+        repo.commit("Second commit", "Bob", "bob@example.com")
+
+        yield repo
+
+
+@pytest.fixture
+def tmpdirs():
+    with TemporaryDirectoryFactory() as factory:
+        yield factory
+
+
+def test_path_scoped_reports_only_contain_the_subtree(
+    snapshot, repo: TemporaryRepository, tmpdirs: TemporaryDirectoryFactory
+):
+    # fmt: off
+    run([
+        repo.dir,
+        "--clone-to", tmpdirs.new(),
+        "--output", (output := tmpdirs.new()),
+        "--path", "services/billing",
+    ])
+    # fmt: on
+
+    with open(f"{output}/authorship.csv", "r") as f:
+        snapshot.assert_match(f.read(), "authorship.csv")
+
+
+def test_updated_subtree_matches_a_full_run(
+    repo: TemporaryRepository, tmpdirs: TemporaryDirectoryFactory
+):
+    # fmt: off
+    run([repo.dir, "--clone-to", tmpdirs.new(), "--output", (output := tmpdirs.new())])
+
+    repo.set_file("services/billing/invoice.py", "print('refunded')\n")
+    repo.set_file("services/billing/refund.py", "print('refund')\n")
+    repo.commit("Third commit", "Susie", "susie@example.com")
+
+    run([
+        repo.dir,
+        "--clone-to", tmpdirs.new(),
+        "--output", output,
+        "--path", "services/billing",
+        "--update",
+    ])
+    run([repo.dir, "--clone-to", tmpdirs.new(), "--output", (full := tmpdirs.new())])
+    # fmt: on
+
+    with open(f"{output}/authorship.csv") as f, open(f"{full}/authorship.csv") as g:
+        assert f.read() == g.read()
+
+
+def test_updated_subtree_rerolls_folder_metrics(repo: TemporaryRepository):
+    with TemporaryDirectory() as cache_dir:
+        existing = authorship.for_repo(
+            Repo(repo.dir), cache_dir=Path(cache_dir), collect_metrics=True
+        )
+        repo.set_file("services/billing/refund.py", "print('refund')\n")
+        repo.commit("Refunds", "Alice", "alice@example.com", "4102444800 +0000")
+        fresh = authorship.for_repo(
+            Repo(repo.dir),
+            cache_dir=Path(cache_dir),
+            collect_metrics=True,
+            paths=[Path("services/billing")],
+        )
+        full = authorship.for_repo(
+            Repo(repo.dir), cache_dir=Path(cache_dir), collect_metrics=True
+        )
+
+    updated = authorship.update_subtrees(existing, fresh, [Path("services/billing")])
+
+    assert updated[Path(".")][ALICE]["last_authored"] == 4102444800
+    for folder in [Path("."), Path("services"), Path("services/billing")]:
+        for author, info in full[folder].items():
+            assert updated[folder][author] == {**info, "commits": ANY}
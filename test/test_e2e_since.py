@@ -0,0 +1,95 @@
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from test.fixtures.tmp_dir_factory import TemporaryDirectoryFactory
+from test.fixtures.tmp_repo import TemporaryRepository
+
+import pytest
+from git import Repo
+
+from git_authorship import authorship
+from git_authorship import boundary
+from git_authorship.cache import Cache
+from git_authorship.cli import run
+
+ALICE = "Alice <alice@example.com>"
+BOB = "Bob <bob@example.com>"
+CAROL = "Carol <carol@example.com>"
+
+
+@pytest.fixture
+def repo(monkeypatch):
+    def _commit(repo: TemporaryRepository, name: str, date: str):
+        monkeypatch.setenv("GIT_COMMITTER_DATE", date)
+        return repo.commit(
+            f"{name}'s commit", name, f"{name.lower()}@example.com", date
+        )
+
+    with TemporaryDirectory() as d:
+        repo = TemporaryRepository(d)
+        repo.set_file("app.py", "a = 1\nb = 2\nc = 3\n")
+        repo.set_file("old.py", "x = 1\n")
+        _commit(repo, "Alice", "1577836800 +0000")
+        repo.set_file("app.py", "a = 1\nb = 20\nc = 3\n")
+        _commit(repo, "Bob", "1622505600 +0000")
+        repo.set_file(".mailmap", "Carol <carol@example.com> <carol@old.example.com>\n")
+        repo.set_file("app.py", "a = 1\nb = 20\nc = 3\nd = 4\n")
+        monkeypatch.setenv("GIT_COMMITTER_DATE", "1685577600 +0000")
+        repo.commit("Carol's commit", "Carol", "carol@old.example.com")
+        yield repo
+
+
+@pytest.fixture
+def tmpdirs():
+    with TemporaryDirectoryFactory() as factory:
+        yield factory
+
+
+def test_lines_before_a_date_are_bucketed(repo: TemporaryRepository, tmp_path: Path):
+    result = authorship.for_repo(Repo(repo.dir), cache_dir=tmp_path, since="2021-01-01")
+
+    assert result[Path("app.py")] == {
+        "before 2021-01-01": {"lines": 2},
+        BOB: {"lines": 1},
+        CAROL: {"lines": 1},
+    }
+    assert result[Path("old.py")] == {"before 2021-01-01": {"lines": 1}}
+
+
+def test_lines_before_a_revision_are_bucketed(
+    repo: TemporaryRepository, tmp_path: Path
+):
+    result = authorship.for_repo(Repo(repo.dir), cache_dir=tmp_path, since="HEAD~1")
+
+    assert result[Path("app.py")] == {
+        "before HEAD~1": {"lines": 3},
+        CAROL: {"lines": 1},
+    }
+
+
+def test_boundary_is_part_of_the_cache_key(repo: TemporaryRepository, tmp_path: Path):
+    for since in [None, "2021-01-01", "HEAD~1", "2021-01-01"]:
+        authorship.for_repo(Repo(repo.dir), cache_dir=tmp_path, since=since)
+
+    assert len(Cache(tmp_path).keys()) == 3
+
+
+def test_dates_are_rounded_to_the_day(repo: TemporaryRepository):
+    resolved = boundary.resolve(Repo(repo.dir), "2021-01-01 13:45")
+
+    assert resolved == boundary.Boundary("before 2021-01-01", timestamp=1609459200)
+
+
+def test_cli_since(repo: TemporaryRepository, tmpdirs: TemporaryDirectoryFactory):
+    # fmt: off
+    run([
+        repo.dir,
+        "--clone-to", tmpdirs.new(),
+        "--output", (output := tmpdirs.new()),
+        "--since", "2021-01-01",
+    ])
+    # fmt: on
+
+    with open(f"{output}/authorship.json") as f:
+        report = json.load(f)
+    assert report["."]["before 2021-01-01"] == {"lines": 3}
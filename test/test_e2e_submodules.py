@@ -0,0 +1,142 @@
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from test.fixtures.tmp_dir_factory import TemporaryDirectoryFactory
+from test.fixtures.tmp_repo import TemporaryRepository
+
+import pytest
+from git import Repo
+
+from git_authorship import authorship
+from git_authorship import boundary
+from git_authorship.cache import Cache
+from git_authorship.cli import run
+
+ALICE = "Alice <alice@example.com>"
+BOB = "Bob <bob@example.com>"
+
+
+@pytest.fixture(autouse=True)
+def git_env(monkeypatch):
+    monkeypatch.setenv("GIT_CONFIG_COUNT", "1")
+    monkeypatch.setenv("GIT_CONFIG_KEY_0", "protocol.file.allow")
+    monkeypatch.setenv("GIT_CONFIG_VALUE_0", "always")
+    monkeypatch.setenv("GIT_COMMITTER_NAME", "Alice")
+    monkeypatch.setenv("GIT_COMMITTER_EMAIL", "alice@example.com")
+
+
+@pytest.fixture
+def superproject():
+    with TemporaryDirectory() as lib_dir, TemporaryDirectory() as d:
+        lib = TemporaryRepository(lib_dir)
+        lib.set_file("lib.py", "x = 1\ny = 2\n")
+        lib.commit("Initial commit", "Bob", "bob@example.com")
+
+        repo = TemporaryRepository(d)
+        repo.set_file("app.py", "import lib\n")
+        repo.commit("Initial commit", "Alice", "alice@example.com")
+        git = Repo(repo.dir).git
+        git.submodule("add", lib_dir, "vendor/lib")
+        git.commit("-m", "Add lib", "--author", ALICE)
+
+        # Commits the superproject doesn't pin yet are not analyzed
+        lib.append_file("lib.py", "z = 3\n")
+        lib.commit("Unpinned", "Bob", "bob@example.com")
+        Repo(Path(repo.dir) / "vendor/lib").git.pull("origin")
+        yield repo
+
+
+@pytest.fixture
+def tmpdirs():
+    with TemporaryDirectoryFactory() as factory:
+        yield factory
+
+
+def test_submodules_are_grafted_at_their_pinned_commit(
+    superproject: TemporaryRepository, tmp_path: Path
+):
+    result = authorship.for_repo(
+        Repo(superproject.dir), cache_dir=tmp_path, submodules=True
+    )
+
+    assert result[Path("vendor/lib/lib.py")] == {BOB: {"lines": 2}}
+    assert result[Path("vendor")] == {BOB: {"lines": 2}}
+    assert result[Path(".")][BOB] == {"lines": 2}
+    assert len(Cache(tmp_path).keys()) == 2
+
+
+def test_submodules_are_bounded_by_since(
+    superproject: TemporaryRepository, tmp_path: Path
+):
+    repo = Repo(superproject.dir)
+    result = authorship.for_repo(
+        repo, cache_dir=tmp_path, submodules=True, since="tomorrow"
+    )
+
+    label = boundary.resolve(repo, "tomorrow").label
+    assert result[Path("vendor/lib/lib.py")] == {label: {"lines": 2}}
+
+
+def test_submodules_are_skipped_by_default(
+    superproject: TemporaryRepository, tmp_path: Path
+):
+    result = authorship.for_repo(Repo(superproject.dir), cache_dir=tmp_path)
+
+    assert Path("vendor/lib/lib.py") not in result
+    assert BOB not in result[Path(".")]
+
+
+def test_cli_initializes_submodules(
+    superproject: TemporaryRepository, tmpdirs: TemporaryDirectoryFactory
+):
+    # fmt: off
+    run([
+        superproject.dir,
+        "--clone-to", (clone_to := tmpdirs.new()),
+        "--output", tmpdirs.new(),
+        "--submodules",
+    ])
+    # fmt: on
+
+    assert (Path(clone_to) / "vendor/lib/lib.py").is_file()
+
+
+def test_cli_bounds_submodules_by_since(
+    tmpdirs: TemporaryDirectoryFactory, monkeypatch
+):
+    def _at(date: str):
+        monkeypatch.setenv("GIT_AUTHOR_DATE", date)
+        monkeypatch.setenv("GIT_COMMITTER_DATE", date)
+        return date
+
+    lib = TemporaryRepository(lib_dir := tmpdirs.new())
+    lib.set_file("lib.py", "x = 1\ny = 2\n")
+    lib.commit("Initial commit", "Bob", "bob@example.com", _at("1577836800 +0000"))
+
+    repo = TemporaryRepository(tmpdirs.new())
+    repo.set_file("app.py", "import lib\n")
+    repo.commit("Initial commit", "Alice", "alice@example.com", _at("1609459200 +0000"))
+    git = Repo(repo.dir).git
+    git.tag("v1")
+
+    lib.append_file("lib.py", "z = 3\n")
+    lib.commit("Add z", "Bob", "bob@example.com", _at("1640995200 +0000"))
+    git.submodule("add", lib_dir, "vendor/lib")
+    git.commit("-m", "Add lib", "--author", ALICE)
+
+    # fmt: off
+    run([
+        repo.dir,
+        "--clone-to", tmpdirs.new(),
+        "--output", (output := tmpdirs.new()),
+        "--since", "v1",
+        "--submodules",
+    ])
+    # fmt: on
+
+    with open(f"{output}/authorship.json") as f:
+        report = json.load(f)
+    assert report["vendor/lib/lib.py"] == {
+        "before v1": {"lines": 2},
+        BOB: {"lines": 1},
+    }
@@ -0,0 +1,85 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from test.fixtures.tmp_repo import TemporaryRepository
+from typing import Any
+from typing import Dict
+
+import pytest
+from git import Repo
+
+from git_authorship import authorship
+from git_authorship._types import _Pseudonym
+
+ALICE = "Alice <alice@example.com>"
+BOB = "Bob <bob@example.com>"
+DOCS: _Pseudonym = {"author": "Docs", "license": "CC-BY-4.0"}
+
+
+@pytest.fixture
+def repo():
+    with TemporaryDirectory() as d:
+        repo = TemporaryRepository(d)
+        (Path(repo.dir) / "src").mkdir()
+        (Path(repo.dir) / "docs").mkdir()
+        repo.set_file("src/app.py", "a = 1\nb = 2\n")
+        repo.set_file("docs/README.md", "# Readme\n")
+        repo.set_file("setup.py", "setup()\n")
+        repo.commit("Initial commit", "Alice", "alice@example.com")
+        repo.set_file("src/app.py", "a = 1\nb = 20\nc = 3\n")
+        repo.commit("Edit app", "Bob", "bob@example.com")
+        yield repo
+
+
+CONFIGS: Dict[str, Dict[str, Any]] = {
+    "none": {},
+    "alice": dict(licenses={ALICE: "MIT"}),
+    "bob": dict(licenses={BOB: "MIT"}, pseudonyms={Path("README"): DOCS}),
+    "docs": dict(licenses={ALICE: "MIT"}, pseudonyms={Path("README"): DOCS}),
+    "app": dict(licenses={BOB: "MIT"}, pseudonyms={Path("app"): DOCS}),
+}
+
+
+@pytest.mark.parametrize("collect_metrics", [False, True])
+@pytest.mark.parametrize("before", list(CONFIGS))
+@pytest.mark.parametrize("after", list(CONFIGS))
+def test_same_result_as_augmenting_from_scratch(
+    repo: TemporaryRepository,
+    tmp_path: Path,
+    collect_metrics: bool,
+    before: str,
+    after: str,
+):
+    raw = authorship._load_repo_authorship(
+        Repo(repo.dir), cache_dir=tmp_path, collect_metrics=collect_metrics
+    )
+    enriched = authorship.EnrichedAuthorship(
+        authorship._augment_files(Repo(repo.dir), raw), **CONFIGS[before]
+    )
+
+    enriched.set_pseudonyms(CONFIGS[after].get("pseudonyms", {}))
+    enriched.set_licenses(CONFIGS[after].get("licenses", {}))
+
+    expected = authorship._augment(Repo(repo.dir), raw, **CONFIGS[after])
+    assert enriched.authorship == expected
+    assert list(enriched.authorship) == list(expected)
+    assert raw == authorship._load_repo_authorship(
+        Repo(repo.dir), cache_dir=tmp_path, collect_metrics=collect_metrics
+    )
+
+
+def test_only_updates_the_changed_authors_paths(
+    repo: TemporaryRepository, tmp_path: Path
+):
+    raw = authorship._load_repo_authorship(Repo(repo.dir), cache_dir=tmp_path)
+    enriched = authorship.EnrichedAuthorship(
+        authorship._augment_files(Repo(repo.dir), raw), licenses={ALICE: "MIT"}
+    )
+
+    updated = enriched.set_licenses({ALICE: "MIT", BOB: "MIT"})
+    assert updated == {Path("."), Path("src"), Path("src/app.py")}
+
+    updated = enriched.set_pseudonyms({Path("README"): DOCS})
+    assert updated == {Path("."), Path("docs"), Path("docs/README.md")}
+    assert enriched.authorship[Path("docs")] == {
+        "Docs": {"lines": 1, "license": "CC-BY-4.0"}
+    }
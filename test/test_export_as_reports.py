@@ -0,0 +1,65 @@
+import json
+from io import StringIO
+from pathlib import Path
+
+from git_authorship import export
+from git_authorship._types import RepoAuthorship
+
+AUTHORSHIP: RepoAuthorship = {
+    Path("."): {
+        "Alice <alice@example.com>": {"lines": 1, "license": "MIT"},
+        "Bob <bob@example.com>": {"lines": 3},
+    },
+    Path("b.txt"): {"Bob <bob@example.com>": {"lines": 3}},
+    Path("a.txt"): {"Alice <alice@example.com>": {"lines": 1, "license": "MIT"}},
+}
+
+
+def test_summarizes_each_path_once():
+    summary = export.summarize(AUTHORSHIP)
+
+    assert summary.lines == [4, 3, 1]
+    assert [author for author, _ in summary.authors[0]] == [
+        "Bob <bob@example.com>",
+        "Alice <alice@example.com>",
+    ]
+    assert summary.licenses[0] == {"MIT": 1, "Unknown": 3}
+    assert summary.order == [0, 2, 1]
+
+
+def test_writes_every_report(tmp_path: Path):
+    export.as_reports(AUTHORSHIP, tmp_path)
+
+    csv = StringIO()
+    export.as_csv(AUTHORSHIP, output=csv)
+    with open(tmp_path / "authorship.csv", newline="") as f:
+        assert f.read() == csv.getvalue()
+    assert (tmp_path / "authorship.json").is_file()
+    assert (tmp_path / "authorship.html").is_file()
+    assert not list(tmp_path.glob(".*.tmp"))
+
+
+def test_streams_every_report_in_one_pass(tmp_path: Path, monkeypatch):
+    alice = {"Alice <alice@example.com>": {"lines": 1}}
+    nodes = [
+        (Path("a.txt"), alice),
+        (Path("src/b.txt"), alice),
+        (Path("src"), alice),
+        (Path("."), {"Alice <alice@example.com>": {"lines": 2}}),
+    ]
+    read = []
+
+    def stream():
+        for path, authors in nodes:
+            read.append(path)
+            yield path, authors
+
+    treemaps = []
+    monkeypatch.setattr(export, "as_treemap", lambda a, output: treemaps.append(a))
+    export.as_reports_stream(stream(), tmp_path)
+
+    assert read == [path for path, _ in nodes]
+    assert list(treemaps[0]) == [Path("src"), Path(".")]
+    with open(tmp_path / "authorship.json") as f:
+        assert json.load(f) == {str(path): authors for path, authors in nodes}
+    assert (tmp_path / "authorship.csv").is_file()
@@ -0,0 +1,105 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from test.fixtures.tmp_dir_factory import TemporaryDirectoryFactory
+from test.fixtures.tmp_repo import TemporaryRepository
+
+import pytest
+from git import Repo
+
+from git_authorship import authorship
+from git_authorship import index
+from git_authorship._types import RepoAuthorship
+from git_authorship.cli import run
+
+ALICE = "Alice <alice@example.com>"
+BOB = "Bob <bob@example.com>"
+
+AUTHORSHIP: RepoAuthorship = {
+    Path("."): {
+        ALICE: {"lines": 6, "license": "MIT"},
+        BOB: {"lines": 5},
+    },
+    Path("src"): {
+        ALICE: {"lines": 5, "license": "MIT"},
+        BOB: {"lines": 5},
+    },
+    Path("src/app.py"): {ALICE: {"lines": 2, "license": "MIT"}, BOB: {"lines": 4}},
+    Path("src/util.py"): {ALICE: {"lines": 3, "license": "MIT"}, BOB: {"lines": 1}},
+    Path("README.md"): {ALICE: {"lines": 1, "license": "MIT"}},
+}
+
+
+@pytest.fixture
+def tmpdirs():
+    with TemporaryDirectoryFactory() as factory:
+        yield factory
+
+
+def test_lists_the_files_an_author_contributed_most_to(tmp_path: Path):
+    index.build(AUTHORSHIP.items(), tmp_path / index.INDEX_FILENAME)
+
+    top = index.top_paths(tmp_path / index.INDEX_FILENAME, author=ALICE)
+
+    assert top == [("src/util.py", 3), ("src/app.py", 2), ("README.md", 1)]
+    assert index.top_paths(tmp_path / index.INDEX_FILENAME, author=BOB, limit=1) == [
+        ("src/app.py", 4)
+    ]
+
+
+def test_lists_folders_and_licenses(tmp_path: Path):
+    index.build(AUTHORSHIP.items(), tmp_path / index.INDEX_FILENAME)
+
+    folders = index.top_paths(tmp_path / index.INDEX_FILENAME, folders=True)
+    unknown = index.top_paths(tmp_path / index.INDEX_FILENAME, license="Unknown")
+
+    assert folders == [(".", 11), ("src", 10)]
+    assert unknown == [("src/app.py", 4), ("src/util.py", 1)]
+
+
+def test_for_repo_saves_an_index(tmp_path: Path):
+    with TemporaryDirectory() as d:
+        repo = TemporaryRepository(d)
+        repo.set_file("app.py", "a = 1\nb = 2\n")
+        repo.commit("Initial commit", "Alice", "alice@example.com")
+
+        authorship.for_repo(
+            Repo(repo.dir),
+            cache_dir=tmp_path / "cache",
+            index_path=tmp_path / index.INDEX_FILENAME,
+        )
+
+    assert index.top_paths(tmp_path / index.INDEX_FILENAME, author=ALICE) == [
+        ("app.py", 2)
+    ]
+
+
+def test_missing_index(tmp_path: Path):
+    with pytest.raises(FileNotFoundError):
+        index.top_paths(tmp_path / index.INDEX_FILENAME, author=ALICE)
+
+
+@pytest.mark.parametrize("bounded", [False, True])
+def test_query_indexed_run(tmpdirs: TemporaryDirectoryFactory, capsys, bounded: bool):
+    with TemporaryDirectory() as d:
+        repo = TemporaryRepository(d)
+        (Path(repo.dir) / "src").mkdir()
+        repo.set_file("src/app.py", "a = 1\nb = 2\n")
+        repo.set_file("README.md", "# Readme\n")
+        repo.commit("Initial commit", "Alice", "alice@example.com")
+
+        # fmt: off
+        run([
+            repo.dir,
+            "--clone-to", tmpdirs.new(),
+            "--output", (output := tmpdirs.new()),
+            "--index",
+            *(["--max-memory", "1"] if bounded else []),
+        ])
+        # fmt: on
+
+    capsys.readouterr()
+    run(["query", "--author", ALICE, "--output", output])
+    assert capsys.readouterr().out == "2\tsrc/app.py\n1\tREADME.md\n"
+
+    run(["query", "--author", ALICE, "--folders", "-n", "1", "--output", output])
+    assert capsys.readouterr().out == "3\t.\n"
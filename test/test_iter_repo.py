@@ -0,0 +1,139 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from test.fixtures.tmp_repo import TemporaryRepository
+from typing import Any
+from typing import cast
+from typing import Dict
+from typing import Generator
+from typing import List
+
+import pytest
+from git import Repo
+
+from git_authorship import authorship
+from git_authorship import identity
+
+
+@pytest.fixture
+def repo():
+    with TemporaryDirectory() as d:
+        repo = TemporaryRepository(d)
+        (Path(repo.dir) / "src").mkdir()
+        repo.set_file("src/app.py", "a = 1\nb = 2\nc = 3\n")
+        repo.set_file("src/util.py", "x = 1\n")
+        repo.set_file("README.md", "# Readme\n")
+        repo.set_file("logo.png", "not really a png\n")
+        repo.commit("Initial commit", "Aliz", "aliz@example.com")
+        repo.set_file("src/app.py", "a = 1\nb = 20\nc = 3\nd = 4\n")
+        repo.commit("Edit app", "Bob", "bob@example.com")
+        yield repo
+
+
+CONFIG: Dict[str, Any] = dict(
+    licenses={"Alice <alice@example.com>": "MPL-2.0"},
+    pseudonyms={Path("README.md"): {"author": "Docs", "license": "CC-BY-4.0"}},
+    aliases={"Aliz <aliz@example.com>": "Alice <alice@example.com>"},
+    ignore_extensions=[".png"],
+)
+
+
+@pytest.mark.parametrize("collect_metrics", [False, True])
+def test_same_result_as_for_repo(
+    repo: TemporaryRepository, tmp_path: Path, collect_metrics: bool
+):
+    expected = authorship.for_repo(
+        Repo(repo.dir),
+        cache_dir=tmp_path / "for_repo",
+        collect_metrics=collect_metrics,
+        **CONFIG,
+    )
+
+    roll_up = authorship.FolderRollUp()
+    files = dict(
+        authorship.iter_repo(
+            Repo(repo.dir),
+            cache_dir=tmp_path / "iter_repo",
+            collect_metrics=collect_metrics,
+            roll_up=roll_up,
+            **CONFIG,
+        )
+    )
+
+    assert list(files) == [Path("README.md"), Path("src/app.py"), Path("src/util.py")]
+    assert {**files, **roll_up.folders()} == expected
+
+
+def test_yields_each_file_once_blamed(
+    repo: TemporaryRepository, tmp_path: Path, monkeypatch
+):
+    blamed: List[Path] = []
+    for_file = authorship.for_file
+
+    def _recorded(repo, path, **kwargs):
+        blamed.append(path)
+        return for_file(repo, path, **kwargs)
+
+    monkeypatch.setattr(authorship, "for_file", _recorded)
+    files = authorship.iter_repo(Repo(repo.dir), cache_dir=tmp_path)
+
+    assert next(files)[0] == Path("README.md")
+    assert blamed == [Path("README.md")]
+    cast(Generator, files).close()
+    assert not list(tmp_path.glob("*.jsonl"))
+
+    list(authorship.iter_repo(Repo(repo.dir), cache_dir=tmp_path))
+    blamed.clear()
+    assert len(list(authorship.iter_repo(Repo(repo.dir), cache_dir=tmp_path))) == 4
+    assert blamed == []
+
+
+def test_reuses_for_repo_results(
+    repo: TemporaryRepository, tmp_path: Path, monkeypatch
+):
+    expected = authorship.for_repo(Repo(repo.dir), cache_dir=tmp_path, **CONFIG)
+
+    def _blame(*args, **kwargs):
+        raise AssertionError("Results should have been reused from the cache")
+
+    monkeypatch.setattr(authorship, "for_file", _blame)
+    files = dict(authorship.iter_repo(Repo(repo.dir), cache_dir=tmp_path, **CONFIG))
+
+    assert files == {p: a for p, a in expected.items() if p in files}
+    assert len(files) == 3
+
+
+def test_resolves_identities_in_one_batch(
+    repo: TemporaryRepository, tmp_path: Path, monkeypatch
+):
+    batches = []
+    resolve = identity.resolve
+
+    def _recorded(repo, authors, aliases=None):
+        batches.append(sorted(set(authors)))
+        return resolve(repo, authors, aliases)
+
+    repo.set_file(".mailmap", "Carol <carol@example.com> <carol@old.example.com>\n")
+    repo.commit("Add mailmap", "Carol", "carol@old.example.com")
+
+    monkeypatch.setattr(identity, "resolve", _recorded)
+    list(authorship.iter_repo(Repo(repo.dir), cache_dir=tmp_path, **CONFIG))
+
+    assert batches == [
+        [
+            "Aliz <aliz@example.com>",
+            "Bob <bob@example.com>",
+            "Carol <carol@example.com>",
+        ]
+    ]
+
+
+def test_cached_results_dont_list_commit_authors(
+    repo: TemporaryRepository, tmp_path: Path, monkeypatch
+):
+    list(authorship.iter_repo(Repo(repo.dir), cache_dir=tmp_path, **CONFIG))
+
+    def _commit_authors(*args, **kwargs):
+        raise AssertionError("Commit authors should only be listed after a blame")
+
+    monkeypatch.setattr(authorship, "_commit_authors", _commit_authors)
+    assert len(list(authorship.iter_repo(Repo(repo.dir), cache_dir=tmp_path))) == 4
@@ -0,0 +1,88 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from test.fixtures.tmp_repo import TemporaryRepository
+from typing import List
+
+import pytest
+from git import Repo
+
+from git_authorship import authorship
+from git_authorship._types import Authorship
+from git_authorship.journal import Journal
+
+AUTHORSHIP: Authorship = {"Alice <alice@example.com>": {"lines": 1}}
+
+
+@pytest.fixture
+def repo():
+    with TemporaryDirectory() as d:
+        repo = TemporaryRepository(d)
+        for name in ["a.txt", "b.txt", "c.txt"]:
+            repo.set_file(name, f"{name}\n")
+        repo.commit("Initial commit", "Alice", "alice@example.com")
+        yield repo
+
+
+def test_reads_back_appended_results(tmp_path: Path):
+    journal = Journal(tmp_path / "run.journal")
+
+    with journal.appender() as appender:
+        assert appender is not None
+        appender.append(Path("a.txt"), AUTHORSHIP)
+        appender.append(Path("b.txt"), AUTHORSHIP)
+
+    assert journal.read() == {Path("a.txt"): AUTHORSHIP, Path("b.txt"): AUTHORSHIP}
+
+
+def test_discards_partially_written_results(tmp_path: Path):
+    journal = Journal(tmp_path / "run.journal")
+    with journal.appender() as appender:
+        assert appender is not None
+        appender.append(Path("a.txt"), AUTHORSHIP)
+    with open(journal.path, "a") as f:
+        f.write('["b.txt", {"Alice <alice')
+
+    with journal.appender() as appender:
+        assert appender is not None
+        appender.append(Path("c.txt"), AUTHORSHIP)
+
+    assert journal.read() == {Path("a.txt"): AUTHORSHIP, Path("c.txt"): AUTHORSHIP}
+
+
+def test_journals_in_use_are_not_removed(tmp_path: Path):
+    journal = Journal(tmp_path / "run.journal")
+
+    with journal.appender() as appender:
+        assert appender is not None
+        appender.append(Path("a.txt"), AUTHORSHIP)
+        # (As by a concurrent run, which couldn't append to the journal)
+        Journal(journal.path).remove()
+        assert journal.read() == {Path("a.txt"): AUTHORSHIP}
+    journal.remove()
+
+    assert not journal.path.exists()
+
+
+def test_interrupted_runs_resume(
+    repo: TemporaryRepository, tmp_path: Path, monkeypatch
+):
+    blamed: List[Path] = []
+    for_file = authorship.for_file
+
+    def _interrupted(repo, path, **kwargs):
+        if len(blamed) == 2:
+            raise KeyboardInterrupt()
+        blamed.append(path)
+        return for_file(repo, path, **kwargs)
+
+    monkeypatch.setattr(authorship, "for_file", _interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        authorship.for_repo(Repo(repo.dir), cache_dir=tmp_path)
+    assert blamed == [Path("a.txt"), Path("b.txt")]
+
+    blamed.clear()
+    resumed = authorship.for_repo(Repo(repo.dir), cache_dir=tmp_path)
+
+    assert blamed == [Path("c.txt")]
+    assert resumed[Path(".")] == {"Alice <alice@example.com>": {"lines": 3}}
+    assert not list(tmp_path.glob("*.journal"))
@@ -0,0 +1,83 @@
+import csv
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from test.fixtures.tmp_dir_factory import TemporaryDirectoryFactory
+from test.fixtures.tmp_repo import TemporaryRepository
+
+import pytest
+from git import Repo
+
+from git_authorship import authorship
+from git_authorship import metrics
+from git_authorship.cli import run
+
+DAY = 24 * 60 * 60
+
+
+@pytest.fixture
+def repo():
+    with TemporaryDirectory() as d:
+        repo = TemporaryRepository(d)
+
+        (Path(repo.dir) / "src").mkdir()
+        repo.set_file("src/app.py", "print('app')\n")
+        repo.commit("Initial", "Alice", "alice@example.com", "1577836800 +0000")
+        repo.append_file("src/app.py", "print('more')\n")
+        repo.set_file("src/util.py", "print('util')\n")
+        repo.commit("Second", "Alice", "alice@example.com", "1717200000 +0000")
+        repo.append_file("src/util.py", "print('bob')\n")
+        repo.commit("Third", "Bob", "bob@example.com")
+
+        yield repo
+
+
+@pytest.fixture
+def tmpdirs():
+    with TemporaryDirectoryFactory() as factory:
+        yield factory
+
+
+def test_buckets_line_ages():
+    assert metrics.age_bucket(-DAY) == "<1m"
+    assert metrics.age_bucket(45 * DAY) == "<3m"
+    assert metrics.age_bucket(3 * 365 * DAY) == "<5y"
+    assert metrics.age_bucket(10 * 365 * DAY) == ">=5y"
+
+
+def test_metrics_are_rolled_up(repo: TemporaryRepository, tmp_path: Path):
+    result = authorship.for_repo(
+        Repo(repo.dir), cache_dir=tmp_path, collect_metrics=True
+    )
+
+    alice = result[Path(".")]["Alice <alice@example.com>"]
+    assert alice["lines"] == 3
+    assert alice["commits"] == 2
+    assert alice["first_authored"] == 1577836800
+    assert alice["last_authored"] == 1717200000
+    assert sum(alice["ages"].values()) == alice["lines"]
+    assert result[Path("src/app.py")]["Alice <alice@example.com>"]["commits"] == 2
+    assert result[Path("src/util.py")]["Bob <bob@example.com>"]["ages"] == {"<1m": 1}
+
+
+def test_metrics_are_cached_separately(repo: TemporaryRepository, tmp_path: Path):
+    authorship.for_repo(Repo(repo.dir), cache_dir=tmp_path)
+    result = authorship.for_repo(
+        Repo(repo.dir), cache_dir=tmp_path, collect_metrics=True
+    )
+
+    assert "commits" in result[Path(".")]["Bob <bob@example.com>"]
+
+
+def test_metrics_in_csv_report(
+    repo: TemporaryRepository, tmpdirs: TemporaryDirectoryFactory
+):
+    # fmt: off
+    run([repo.dir, "--clone-to", tmpdirs.new(), "--output", (output := tmpdirs.new()), "--metrics"])  # noqa: E501
+    # fmt: on
+
+    with open(f"{output}/authorship.csv") as f:
+        rows = {(r["path"], r["author"]): r for r in csv.DictReader(f)}
+    alice = rows[("src/app.py", "Alice <alice@example.com>")]
+    assert alice["first_authored"] == "2020-01-01T00:00:00+00:00"
+    assert alice["commits"] == "2"
+    assert alice["lines_aged_>=5y"] == "1"
@@ -0,0 +1,89 @@
+import csv
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from test.fixtures.tmp_dir_factory import TemporaryDirectoryFactory
+from test.fixtures.tmp_repo import TemporaryRepository
+
+import pytest
+from git import Repo
+
+from git_authorship import plan
+from git_authorship.cache import Cache
+from git_authorship.cli import run
+
+
+@pytest.fixture
+def repo():
+    with TemporaryDirectory() as d:
+        repo = TemporaryRepository(d)
+        (Path(repo.dir) / "src").mkdir()
+        repo.set_file("src/app.py", "a = 1\nb = 2\nc = 3\nd = 4\n")
+        repo.set_file("README.md", "# Readme\n")
+        repo.set_file("logo.png", "not really a png\n")
+        repo.commit("Initial commit", "Alice", "alice@example.com")
+        repo.set_file("src/app.py", "a = 1\nb = 2\nc = 3\nd = 5\n")
+        repo.commit("Edit app", "Bob", "bob@example.com")
+        repo.set_file("src/main.py", "a = 1\nb = 2\nc = 3\nd = 5\n")
+        repo._index.remove(["src/app.py"], working_tree=True)
+        repo.commit("Rename app", "Bob", "bob@example.com")
+        yield repo
+
+
+@pytest.fixture
+def tmpdirs():
+    with TemporaryDirectoryFactory() as factory:
+        yield factory
+
+
+def test_history_follows_renames(repo: TemporaryRepository):
+    files = [Path("README.md"), Path("logo.png"), Path("src/main.py")]
+
+    history = plan.history(Repo(repo.dir), files)
+
+    assert history == {
+        Path("README.md"): (1, 0),
+        Path("logo.png"): (1, 0),
+        Path("src/main.py"): (3, 1),
+    }
+
+
+def test_plans_most_expensive_files_first(repo: TemporaryRepository):
+    repo_plan = plan.for_repo(Repo(repo.dir), ignore_extensions=[".png"])
+
+    assert [f.path for f in repo_plan.files][0] == Path("src/main.py")
+    assert [f.path for f in repo_plan.files if f.discarded] == [Path("logo.png")]
+    assert repo_plan.calibrated_from == 0
+    assert list(repo_plan.folders())[0] == Path(".")
+    assert repo_plan.folders()[Path("src")] == repo_plan.files[0].seconds
+
+
+def test_calibrates_with_earlier_timings(repo: TemporaryRepository, tmp_path: Path):
+    timings = plan.Timings(tmp_path / plan.TIMINGS_FILENAME)
+    timings.record(Path("README.md"), 2.0)
+    timings.record(Path("deleted.txt"), 100.0)
+    timings.save()
+
+    repo_plan = plan.for_repo(Repo(repo.dir), timings=timings)
+    costs = {f.path: f.seconds for f in repo_plan.files}
+
+    assert repo_plan.calibrated_from == 1
+    assert costs[Path("README.md")] == pytest.approx(2.0)
+    assert costs[Path("src/main.py")] > costs[Path("README.md")]
+
+
+def test_plan_after_run(
+    repo: TemporaryRepository, tmpdirs: TemporaryDirectoryFactory, capsys
+):
+    clone_to, output = tmpdirs.new(), tmpdirs.new()
+    run([repo.dir, "--clone-to", clone_to, "--output", output])
+    capsys.readouterr()
+
+    run([repo.dir, "--clone-to", clone_to, "--output", output, "--plan"])
+
+    printed = capsys.readouterr().out
+    with open(f"{output}/authorship.plan.csv", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert "(calibrated with 3 timed files)" in printed
+    assert "(1 discarded by ignored extensions or pseudonyms" in printed
+    assert rows[0]["path"] == "src/main.py"
+    assert len(Cache(Path(output) / "cache").keys()) == 1
@@ -0,0 +1,117 @@
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from test.fixtures.tmp_dir_factory import TemporaryDirectoryFactory
+from test.fixtures.tmp_repo import TemporaryRepository
+from typing import List
+
+import pytest
+from git import Repo
+
+from git_authorship import prepare
+from git_authorship.cli import run
+
+
+@pytest.fixture
+def repo():
+    with TemporaryDirectory() as d:
+        repo = TemporaryRepository(d)
+        repo.set_file("app.py", "a = 1\n")
+        repo.commit("Initial commit", "Alice", "alice@example.com")
+        repo.set_file("lib.py", "b = 2\n")
+        repo.commit("Add lib", "Bob", "bob@example.com")
+        yield repo
+
+
+@pytest.fixture
+def tmpdirs():
+    with TemporaryDirectoryFactory() as factory:
+        yield factory
+
+
+def test_writes_commit_graph_with_bloom_filters(repo: TemporaryRepository):
+    r = Repo(repo.dir)
+    assert prepare.prepared_revision(r) is None
+
+    prepared = prepare.prepare(r)
+
+    assert prepared.commit_graph
+    assert prepare.prepared_revision(r) == r.head.commit.hexsha
+    assert _bloom_filters_used(r)
+
+
+def test_graphs_written_elsewhere_are_replaced(repo: TemporaryRepository):
+    r = Repo(repo.dir)
+    r.git.commit_graph("write", "--reachable")  # (Without Bloom filters)
+    assert not _bloom_filters_used(r)
+
+    assert prepare.prepare(r).commit_graph
+    assert _bloom_filters_used(r)
+
+
+def test_prepared_repo_is_skipped(repo: TemporaryRepository):
+    prepare.prepare(Repo(repo.dir))
+
+    assert prepare.prepare(Repo(repo.dir)) == prepare.Preparation(
+        commit_graph=False, repacked=False, seconds=0.0
+    )
+
+
+def test_new_commits_are_added_to_the_graph(repo: TemporaryRepository):
+    prepare.prepare(Repo(repo.dir))
+    repo.set_file("app.py", "a = 10\n")
+    head = repo.commit("Change app", "Alice", "alice@example.com")
+
+    prepared = prepare.prepare(Repo(repo.dir))
+
+    assert prepared.commit_graph
+    assert prepare.prepared_revision(Repo(repo.dir)) == head.hexsha
+    assert _bloom_filters_used(Repo(repo.dir))
+
+
+def test_repacks_loose_objects(repo: TemporaryRepository, monkeypatch):
+    monkeypatch.setattr(prepare, "MAX_LOOSE_OBJECTS", 0)
+
+    assert prepare.prepare(Repo(repo.dir)).repacked
+    assert Repo(repo.dir).git.count_objects("-v").startswith("count: 0\n")
+
+
+def test_blame_is_timed_before_and_after(repo: TemporaryRepository):
+    blamed: List[Path] = []
+
+    prepared = prepare.prepare(Repo(repo.dir), blamed.append)
+
+    assert prepared.blame_before is not None
+    assert prepared.blame_after is not None
+    assert prepared.files == 2
+    # (Warm-up, before, after)
+    assert sorted(blamed) == sorted([Path("app.py"), Path("lib.py")] * 3)
+
+
+def test_cli_prepare(
+    repo: TemporaryRepository, tmpdirs: TemporaryDirectoryFactory, capsys
+):
+    # fmt: off
+    run([
+        repo.dir,
+        "--clone-to", (clone := tmpdirs.new()),
+        "--output", tmpdirs.new(),
+        "--prepare",
+    ])
+    # fmt: on
+
+    assert "Blame of 2 sampled files" in capsys.readouterr().out
+    assert _bloom_filters_used(Repo(clone))
+
+
+def _bloom_filters_used(repo: Repo) -> bool:
+    """Whether git checks changed-path Bloom filters when walking `app.py`'s history"""
+    with TemporaryDirectory() as d:
+        trace = Path(d) / "trace.json"
+        repo.git.log("--oneline", "--", "app.py", env={"GIT_TRACE2_EVENT": str(trace)})
+        events = [json.loads(line) for line in trace.read_text().splitlines()]
+    stats = [e["value"] for e in events if e.get("category") == "bloom"]
+    return any(
+        s["filter_not_present"] == 0 and s["maybe"] + s["definitely_not"] > 0
+        for s in stats
+    )
@@ -0,0 +1,102 @@
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from test.fixtures.tmp_dir_factory import TemporaryDirectoryFactory
+from test.fixtures.tmp_repo import TemporaryRepository
+
+import pytest
+
+from git_authorship import sample
+from git_authorship._git import TreeEntry
+from git_authorship._types import Authorship
+from git_authorship.cli import run
+
+
+def _blob(path: str, size: int) -> TreeEntry:
+    return TreeEntry(Path(path), "100644", "blob", "0" * 40, size)
+
+
+ENTRIES = [
+    _blob("README.md", 10),
+    *[_blob(f"docs/page{i}.md", 10) for i in range(10)],
+    *[_blob(f"src/module{i}.py", 100) for i in range(10)],
+]
+
+
+def _authorship(alice: int, bob: int) -> Authorship:
+    authors: Authorship = {
+        "Alice": {"lines": alice, "license": "MIT"},
+        "Bob": {"lines": bob},
+    }
+    return {author: info for author, info in authors.items() if info["lines"]}
+
+
+@pytest.fixture
+def tmpdirs():
+    with TemporaryDirectoryFactory() as factory:
+        yield factory
+
+
+def test_samples_every_folder_in_proportion_to_size():
+    selected = sample.select(ENTRIES, 10)
+
+    assert Path("README.md") in selected
+    assert len([p for p in selected if p.parts[0] == "docs"]) == 1
+    assert len([p for p in selected if p.parts[0] == "src"]) == 9
+    assert selected == sample.select(ENTRIES, 10)
+    assert selected != sample.select(ENTRIES, 10, seed=1)
+
+
+def test_full_samples_are_exact():
+    data = {e.path: _authorship(e.size // 10, e.size // 10) for e in ENTRIES}
+
+    estimate = sample.estimate(ENTRIES, data)
+
+    assert estimate[Path(".")]["authors"]["Alice"] == {
+        "lines": 111,
+        "share": 0.5,
+        "low": 0.5,
+        "high": 0.5,
+    }
+    assert estimate[Path("src")]["licenses"]["Unknown"]["lines"] == 100
+
+
+def test_partial_samples_have_confidence_intervals():
+    data = {
+        path: _authorship(alice, 10 - alice)
+        for path, alice in zip(sample.select(ENTRIES, 10), [10, 0, 2, 4, 6, 8, 1, 9])
+    }
+
+    estimate = sample.estimate(ENTRIES, data)[Path("src")]
+    alice = estimate["authors"]["Alice"]
+
+    assert (estimate["files"], estimate["sampled"]) == (10, len(data) - 2)
+    assert alice["low"] < alice["share"] < alice["high"]
+    assert alice["share"] == estimate["licenses"]["MIT"]["share"]
+
+
+def test_sampled_reports_are_marked_as_estimates(tmpdirs: TemporaryDirectoryFactory):
+    with TemporaryDirectory() as d:
+        repo = TemporaryRepository(d)
+        (Path(repo.dir) / "src").mkdir()
+        repo.set_file("src/app.py", "print('app')\n")
+        repo.set_file("src/util.py", "print('util')\n")
+        repo.commit("Initial commit", "Alice", "alice@example.com")
+
+        # fmt: off
+        run([
+            repo.dir,
+            "--clone-to", tmpdirs.new(),
+            "--output", (output := tmpdirs.new()),
+            "--author-licenses", "./test/fixtures/licensing.csv",
+            "--sample", "5",
+        ])
+        # fmt: on
+
+    with open(f"{output}/authorship.estimate.json") as f:
+        estimate = json.load(f)
+    with open(f"{output}/authorship.estimate.csv") as f:
+        header = f.readline()
+    assert estimate["estimate"] is True
+    assert estimate["authorship"]["."]["licenses"]["MPL-2.0"]["share"] == 1.0
+    assert "estimated_share" in header
@@ -0,0 +1,126 @@
+import json
+import threading
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from test.fixtures.tmp_repo import TemporaryRepository
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pytest
+from git import Repo
+
+from git_authorship import authorship
+from git_authorship.server import AuthorshipService
+from git_authorship.server import make_server
+
+
+@pytest.fixture
+def repo():
+    with TemporaryDirectory() as d:
+        repo = TemporaryRepository(d)
+
+        repo.set_file("greeting.txt", "Hello, world!\n")
+        repo.commit("Initial commit", "Alice", "alice@example.com")
+
+        repo.set_file("farewell.txt", "Goodbye, world!\nSee you soon!\n")
+        repo.commit("Second commit", "Bob", "bob@example.com")
+
+        yield repo
+
+
+@pytest.fixture
+def service(repo: TemporaryRepository, tmp_path: Path):
+    yield AuthorshipService(
+        Repo(repo.dir),
+        licenses={"Bob <bob@example.com>": "MIT"},
+        cache_dir=tmp_path / "cache",
+    )
+
+
+def test_answers_path_author_and_license_queries(service: AuthorshipService):
+    assert service.path("greeting.txt") == {"Alice <alice@example.com>": {"lines": 1}}
+    assert service.path("missing.txt") is None
+    assert service.author("Bob <bob@example.com>") == [("farewell.txt", 2)]
+    assert service.license("MIT") == {"Bob <bob@example.com>": 2}
+
+
+def test_refreshes_when_head_moves(
+    service: AuthorshipService, repo: TemporaryRepository
+):
+    assert service.refresh() is True
+    assert service.refresh() is False
+
+    repo.append_file("greeting.txt", "Nice to meet you!\n")
+    repo.commit("Third commit", "Bob", "bob@example.com")
+
+    assert service.refresh() is True
+    assert service.path("greeting.txt") == {
+        "Alice <alice@example.com>": {"lines": 1},
+        "Bob <bob@example.com>": {"lines": 1, "license": "MIT"},
+    }
+    assert service.author("Bob <bob@example.com>") == [
+        ("farewell.txt", 2),
+        ("greeting.txt", 1),
+    ]
+
+
+def test_reconfigures_without_reblaming(service: AuthorshipService, monkeypatch):
+    service.refresh()
+    monkeypatch.setattr(authorship, "for_file", None)  # (Nothing may be blamed)
+
+    service.reconfigure(licenses={"Alice <alice@example.com>": "MIT"})
+    assert service.license("MIT") == {"Alice <alice@example.com>": 1}
+    assert service.path("farewell.txt") == {"Bob <bob@example.com>": {"lines": 2}}
+
+    service.reconfigure(
+        pseudonyms={Path("farewell"): {"author": "Docs", "license": "CC-BY-4.0"}}
+    )
+    assert service.author("Docs") == [("farewell.txt", 2)]
+    assert service.author("Bob <bob@example.com>") == []
+    assert service.license("CC-BY-4.0") == {"Docs": 2}
+
+
+def test_serves_queries_over_http(service: AuthorshipService):
+    with make_server(service, "127.0.0.1:0") as server:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        assert isinstance(server, ThreadingHTTPServer)
+        try:
+            url = f"http://127.0.0.1:{server.server_port}/path?path=."
+            with urlopen(url) as response:
+                assert json.load(response) == {
+                    "Alice <alice@example.com>": {"lines": 1},
+                    "Bob <bob@example.com>": {"lines": 2, "license": "MIT"},
+                }
+        finally:
+            server.shutdown()
+
+
+def test_rejects_invalid_limits(service: AuthorshipService):
+    with make_server(service, "127.0.0.1:0") as server:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        assert isinstance(server, ThreadingHTTPServer)
+        try:
+            url = f"http://127.0.0.1:{server.server_port}/author?author=A&limit=ten"
+            with pytest.raises(HTTPError) as e:
+                urlopen(url)
+            assert e.value.code == 400
+            assert "limit must be a non-negative integer" in json.load(e.value)["error"]
+        finally:
+            server.shutdown()
+
+
+def test_unix_sockets_never_replace_other_files(
+    service: AuthorshipService, tmp_path: Path
+):
+    path = tmp_path / "authorship.sock"
+    path.write_text("not a socket")
+
+    with pytest.raises(ValueError, match="is not a socket"):
+        make_server(service, f"unix:{path}")
+    assert path.read_text() == "not a socket"
+
+    path.unlink()
+    make_server(service, f"unix:{path}").server_close()
+    with make_server(service, f"unix:{path}"):  # (Replaces the stale socket)
+        assert path.is_socket()
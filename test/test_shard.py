@@ -0,0 +1,111 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from test.fixtures.tmp_dir_factory import TemporaryDirectoryFactory
+from test.fixtures.tmp_repo import TemporaryRepository
+
+import pytest
+from pytest import raises as assertRaises
+
+from git_authorship._git import TreeEntry
+from git_authorship.cli import run
+from git_authorship.exceptions import ShardException
+from git_authorship.shard import select
+from git_authorship.shard import Shard
+
+
+@pytest.fixture
+def repo():
+    with TemporaryDirectory() as d:
+        repo = TemporaryRepository(d)
+
+        repo.set_file("greeting.txt", "Hello, world!\n")
+        repo.set_file("farewell.txt", "Goodbye, world!\n")
+        repo.commit("Initial commit", "Alice", "alice@example.com")
+
+        (Path(repo.dir) / "docs").mkdir()
+        repo.set_file("docs/intro.md", "# Introduction\n")
+        repo.set_file("docs/usage.md", "# Usage\n")
+        repo.append_file("greeting.txt", "Excited to be here!\n")
+        repo.commit("Second commit", "Bob", "bob@example.com")
+
+        yield repo
+
+
+@pytest.fixture
+def tmpdirs():
+    with TemporaryDirectoryFactory() as factory:
+        yield factory
+
+
+def _entries(sizes):
+    return [
+        TreeEntry(Path(f"file{idx}.txt"), "100644", "blob", f"{idx:040}", size)
+        for idx, size in enumerate(sizes)
+    ]
+
+
+def test_parses_shard_specs():
+    assert Shard.parse("3/16") == Shard(3, 16)
+    with assertRaises(ValueError, match="between 1 and 16"):
+        Shard.parse("17/16")
+    with assertRaises(ValueError, match="K/N"):
+        Shard.parse("3")
+
+
+@pytest.mark.parametrize("strategy", ["hash", "cost"])
+def test_assigns_each_file_to_exactly_one_shard(strategy):
+    entries = _entries(range(100))
+    shards = [select(entries, Shard(k, 4), strategy) for k in range(1, 5)]
+
+    assert sorted(p for paths in shards for p in paths) == sorted(
+        e.path for e in entries
+    )
+
+
+def test_cost_strategy_balances_blob_sizes():
+    entries = _entries([100, 60, 50, 30, 20])
+
+    loads = [
+        sum(e.size for e in entries if e.path in select(entries, Shard(k, 2), "cost"))
+        for k in (1, 2)
+    ]
+
+    assert loads == [130, 130]
+
+
+def test_merged_shards_match_an_unsharded_run(
+    repo: TemporaryRepository, tmpdirs: TemporaryDirectoryFactory
+):
+    clone_to = tmpdirs.new()
+    shards = tmpdirs.new()
+    # fmt: off
+    run([repo.dir, "--clone-to", clone_to, "--output", (full := tmpdirs.new())])
+    for k in (1, 2, 3):
+        run([
+            repo.dir,
+            "--clone-to", clone_to,
+            "--output", shards,
+            "--shard", f"{k}/3",
+        ])
+    partials = [str(p) for p in Path(shards).glob("*.json")]
+    run(["merge", *partials, "--output", (merged := tmpdirs.new())])
+    # fmt: on
+
+    with open(f"{full}/authorship.csv") as f, open(f"{merged}/authorship.csv") as g:
+        assert f.read() == g.read()
+
+
+def test_merge_rejects_missing_shards(
+    repo: TemporaryRepository, tmpdirs: TemporaryDirectoryFactory
+):
+    # fmt: off
+    run([
+        repo.dir,
+        "--clone-to", tmpdirs.new(),
+        "--output", (shards := tmpdirs.new()),
+        "--shard", "1/2",
+    ])
+    # fmt: on
+
+    with assertRaises(ShardException, match="Missing shard"):
+        run(["merge", f"{shards}/authorship.shard-1-of-2.json"])
@@ -0,0 +1,108 @@
+import json
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from test.fixtures.tmp_dir_factory import TemporaryDirectoryFactory
+from test.fixtures.tmp_repo import TemporaryRepository
+
+import pytest
+from git import Repo
+from git.cmd import Git
+
+from git_authorship import telemetry
+from git_authorship.cli import run
+
+
+@pytest.fixture
+def repo():
+    with TemporaryDirectory() as d:
+        repo = TemporaryRepository(d)
+        repo.set_file("greeting.txt", "Hello, world!\n")
+        repo.commit("Initial commit", "Alice", "alice@example.com")
+        yield repo
+
+
+@pytest.fixture
+def tmpdirs():
+    with TemporaryDirectoryFactory() as factory:
+        yield factory
+
+
+def test_counts_git_subprocesses(repo: TemporaryRepository):
+    execute = Git.execute
+
+    with telemetry.collecting() as collected:
+        Repo(repo.dir).git.status()
+        Repo(repo.dir).git.log()
+    Repo(repo.dir).git.status()
+
+    assert collected.values["git_subprocesses_total"] == {(): 2}
+    assert Git.execute is execute
+
+
+def test_nothing_is_collected_when_off():
+    telemetry.add("git_subprocesses_total", 1)
+
+    with telemetry.collecting() as collected:
+        pass
+
+    assert "git_subprocesses_total" not in collected.values
+
+
+def test_textfile_format(tmp_path: Path):
+    collected = telemetry.Telemetry()
+    collected.add("export_written_bytes_total", 10, exporter="as_json")
+    collected.add("export_written_bytes_total", 5, exporter="as_json")
+    collected.set("phase_seconds", 1.5, phase="clone")
+
+    collected.as_textfile(tmp_path / "telemetry.prom")
+
+    assert (tmp_path / "telemetry.prom").read_text() == "\n".join(
+        [
+            "# HELP git_authorship_export_written_bytes_total Bytes written by each "
+            "exporter",
+            "# TYPE git_authorship_export_written_bytes_total counter",
+            'git_authorship_export_written_bytes_total{exporter="as_json"} 15',
+            "# HELP git_authorship_phase_seconds Wall time of each phase of the run",
+            "# TYPE git_authorship_phase_seconds gauge",
+            'git_authorship_phase_seconds{phase="clone"} 1.5',
+            "# EOF",
+            "",
+        ]
+    )
+
+
+def test_textfile_values_are_exact(tmp_path: Path):
+    collected = telemetry.Telemetry()
+    collected.add("cache_read_bytes_total", 1470663)
+    collected.set("peak_rss_bytes", 32673792, process="python")
+    collected.set("phase_seconds", 0.1234567891, phase="clone")
+
+    collected.as_textfile(tmp_path / "telemetry.prom")
+
+    values = (tmp_path / "telemetry.prom").read_text().splitlines()
+    assert "git_authorship_cache_read_bytes_total 1470663" in values
+    assert 'git_authorship_peak_rss_bytes{process="python"} 32673792' in values
+    assert 'git_authorship_phase_seconds{phase="clone"} 0.1234567891' in values
+
+
+def test_cli_telemetry(repo: TemporaryRepository, tmpdirs: TemporaryDirectoryFactory):
+    clone_to, output = tmpdirs.new(), tmpdirs.new()
+    args = [repo.dir, "--clone-to", clone_to, "--output", output, "--telemetry"]
+    run(args)
+    run(args)
+
+    with open(f"{output}/authorship.telemetry.json") as f:
+        values = {
+            name: {tuple(v["labels"].values()): v["value"] for v in values}
+            for name, values in json.load(f).items()
+        }
+    prom = Path(f"{output}/authorship.telemetry.prom").read_text()
+    assert values["git_subprocesses_total"][()] > 0
+    assert values["cache_read_bytes_total"][()] > 0
+    assert values["export_written_bytes_total"][("as_json",)] == os.path.getsize(
+        f"{output}/authorship.json"
+    )
+    assert set(values["phase_seconds"]) == {("clone",), ("authorship",), ("export",)}
+    assert values["peak_rss_bytes"][("python",)] > 0
+    assert 'git_authorship_cpu_seconds_total{mode="user",process="git"}' in prom
@@ -0,0 +1,94 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from test.fixtures.tmp_dir_factory import TemporaryDirectoryFactory
+from test.fixtures.tmp_repo import TemporaryRepository
+from typing import List
+from typing import Tuple
+
+import pytest
+from git import Repo
+
+from git_authorship._types import AuthorshipInfo
+from git_authorship._types import Config
+from git_authorship.server import AuthorshipService
+from git_authorship.watch import debounced
+from git_authorship.watch import poll_revision
+from git_authorship.watch import watch
+
+ALICE = "Alice <alice@example.com>"
+
+
+@pytest.fixture
+def repo():
+    with TemporaryDirectory() as d:
+        repo = TemporaryRepository(d)
+
+        repo.set_file("greeting.txt", "Hello, world!\n")
+        repo.commit("Initial commit", "Alice", "alice@example.com")
+
+        yield repo
+
+
+@pytest.fixture
+def tmpdirs():
+    with TemporaryDirectoryFactory() as factory:
+        yield factory
+
+
+def test_debounces_bursts_into_a_single_revision():
+    polls = iter(["a", "a", "b", "c", "d", "d", "d", "e", "e"])
+    sleeps = []
+
+    revisions = debounced(
+        lambda: next(polls), interval=60, debounce=10, sleep=sleeps.append
+    )
+
+    assert next(revisions) == "d"
+    assert next(revisions) == "e"
+    assert sleeps == [60, 10, 10, 10, 60, 10]
+
+
+def test_ignores_bursts_which_revert_to_the_initial_revision():
+    polls = iter(["b", "a", "a", "c", "c"])
+
+    revisions = debounced(
+        lambda: next(polls), interval=60, debounce=10, sleep=lambda _: None, initial="a"
+    )
+
+    assert next(revisions) == "c"
+
+
+def test_polls_new_commits_from_origin(
+    repo: TemporaryRepository, tmpdirs: TemporaryDirectoryFactory
+):
+    clone = Repo.clone_from(repo.dir, tmpdirs.new())
+    assert poll_revision(clone) == clone.head.commit.hexsha
+
+    commit = repo.commit("Second commit", "Bob", "bob@example.com")
+
+    assert poll_revision(clone) == commit.hexsha
+    assert poll_revision(clone, repo.branch) == commit.hexsha
+
+
+def test_reapplies_changed_config(repo: TemporaryRepository, tmp_path: Path):
+    configs: List[Tuple[Config.AuthorLicenses, Config.Pseudonyms]] = [
+        ({}, {}),
+        ({}, {}),
+        ({ALICE: "MIT"}, {}),
+    ]
+    service = AuthorshipService(Repo(repo.dir), cache_dir=tmp_path)
+    results: List[AuthorshipInfo] = []
+
+    def _sleep(seconds: float):
+        if len(results) == 2:
+            raise KeyboardInterrupt
+
+    watch(
+        Repo(repo.dir),
+        service,
+        lambda authorship: results.append(authorship[Path(".")][ALICE].copy()),
+        config=lambda: configs.pop(0) if len(configs) > 1 else configs[0],
+        sleep=_sleep,
+    )
+
+    assert results == [{"lines": 1}, {"lines": 1, "license": "MIT"}]